@@ -0,0 +1,191 @@
+# agents/backends.py
+"""
+LLM / 외부 도구 백엔드 선택
+- LLM: "gemini" (기본, ChatGoogleGenerativeAI) | "fake" (로컬 재생 모델, 네트워크 없음)
+- Tools: "live" (기본, Open-Meteo / Tavily / Pexels) | "offline" (tools/offline_stubs.py)
+
+환경변수 MARKETING_LLM_BACKEND, MARKETING_TOOLS_BACKEND 또는 set_backends()로 선택합니다.
+fake 모델은 프롬프트 유형별로 스키마에 맞는 고정 응답을 재생하며, 지연시간을 설정할 수 있어
+benchmark_offline.py에서 그래프/데이터 로드/파싱 오버헤드를 재현 가능하게 측정할 때 사용합니다.
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+from typing import Any, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+DEFAULT_MODEL_NAME = "gemini-2.5-flash"
+
+_BACKENDS = {
+    "llm": os.getenv("MARKETING_LLM_BACKEND", "gemini"),
+    "tools": os.getenv("MARKETING_TOOLS_BACKEND", "live"),
+}
+FAKE_LLM_LATENCY_MS = float(os.getenv("MARKETING_FAKE_LLM_LATENCY_MS", "0"))
+
+
+def set_backends(llm: Optional[str] = None, tools: Optional[str] = None, fake_latency_ms: Optional[float] = None):
+    """백엔드 전환 (프로세스 전역)"""
+    global FAKE_LLM_LATENCY_MS
+    if llm:
+        if llm not in ("gemini", "fake"):
+            raise ValueError(f"지원하지 않는 LLM 백엔드: {llm}")
+        _BACKENDS["llm"] = llm
+    if tools:
+        if tools not in ("live", "offline"):
+            raise ValueError(f"지원하지 않는 도구 백엔드: {tools}")
+        _BACKENDS["tools"] = tools
+    if fake_latency_ms is not None:
+        FAKE_LLM_LATENCY_MS = fake_latency_ms
+
+
+def get_llm_backend() -> str:
+    return _BACKENDS["llm"]
+
+
+def is_offline_tools() -> bool:
+    """외부 HTTP 도구 대신 로컬 스텁 사용 여부"""
+    return _BACKENDS["tools"] == "offline"
+
+
+# ============================================================================
+# Fake Replay Chat Model
+# ============================================================================
+
+_FAKE_CARD = {
+    "title": "점심 회전율 강화",
+    "positioning_concept": "빠르고 든든한 동네 점심 대표 매장",
+    "strategy_4p": {
+        "product": "점심 세트 3종 구성, 객단가 상위 메뉴 중심 재편",
+        "price": "세트 10% 할인으로 객단가 12,000원 유지",
+        "place": "포장 비중 20% → 30% 확대, 픽업 전용 동선",
+        "promotion": "재방문 고객 대상 스탬프 10회 적립 쿠폰",
+    },
+    "expected_outcome": "점심 매출 15% 증가, 재방문율 5%p 향상",
+    "priority": "High",
+}
+
+_FAKE_CONTENT_GUIDE = {
+    "target_store": "가맹점",
+    "target_audience": "2030 직장인",
+    "brand_tone": "친근한, 활기찬, 따뜻한",
+    "mood_board": ["따뜻한 조명", "신선한 식재료", "아늑한 분위기", "점심 풍경", "정갈한 플레이팅"],
+    "mood_board_en": ["warm lighting", "fresh ingredients", "cozy atmosphere", "lunch scene", "neat plating"],
+    "channels": [{
+        "channel_name": "인스타그램",
+        "post_format": "릴스 + 피드",
+        "visual_direction": ["음식 클로즈업", "매장 분위기"],
+        "copy_examples": ["오늘 점심은 여기서!", "이번 주 세트 할인", "여러분의 최애 메뉴는?"],
+        "hashtags": ["#점심", "#맛집", "#데일리", "#오늘의메뉴", "#직장인점심",
+                     "#동네맛집", "#맛스타그램", "#점심추천", "#세트메뉴", "#재방문"],
+        "posting_frequency": "주 3회",
+        "best_time": "평일 11시",
+        "content_tips": ["릴스는 15초 이내", "스토리로 당일 메뉴 공유"],
+    }],
+    "overall_strategy": "점심 세트 중심의 일상 콘텐츠로 재방문 유도",
+    "do_not_list": ["과장 광고", "경쟁사 언급"],
+}
+
+_FAKE_INTENT = {"task_type": "종합_전략_수립", "confidence": 0.9, "reasoning": "오프라인 고정 응답"}
+
+_FAKE_REPORT = """# 📊 전략 요약
+
+## 핵심 액션
+1. **점심 세트 재편** - 객단가 상위 메뉴 중심 3종 구성
+2. **포장 채널 확대** - 픽업 전용 동선 마련
+3. **재방문 쿠폰** - 스탬프 10회 적립
+
+## 💰 예상 예산
+- 총 예산: 80만원
+
+## 📊 예상 효과
+- 매출 증대율: 15%
+- 재방문율: 5%p
+"""
+
+
+def _prompt_text(messages: List[BaseMessage]) -> str:
+    return "\n".join(str(m.content) for m in messages)
+
+
+def fake_response_for(prompt: str) -> str:
+    """프롬프트 유형별 고정 응답 (스키마 유효)"""
+    if '"strategy_cards"' in prompt:
+        cards = []
+        for i, priority in enumerate(["High", "Medium", "Medium"], 1):
+            cards.append({**_FAKE_CARD, "title": f"{_FAKE_CARD['title']} {i}", "priority": priority})
+        return json.dumps({"strategy_cards": cards}, ensure_ascii=False)
+    if "전략 카드 1개" in prompt:
+        return json.dumps(_FAKE_CARD, ensure_ascii=False)
+    if '"mood_board_en"' in prompt:
+        return json.dumps(_FAKE_CONTENT_GUIDE, ensure_ascii=False)
+    if "사용자 요청을 3가지 중 분류" in prompt:
+        return json.dumps(_FAKE_INTENT, ensure_ascii=False)
+    return _FAKE_REPORT
+
+
+class FakeReplayChatModel(BaseChatModel):
+    """네트워크 없이 고정 응답을 재생하는 결정적 Chat 모델"""
+
+    model: str = "fake-replay"
+    temperature: float = 0.0
+    latency_ms: Optional[float] = None
+    chunk_size: int = 32
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-replay"
+
+    def _sleep(self):
+        latency = FAKE_LLM_LATENCY_MS if self.latency_ms is None else self.latency_ms
+        if latency > 0:
+            time.sleep(latency / 1000)
+
+    @staticmethod
+    def _usage(prompt: str, content: str) -> dict:
+        # 토큰 수 근사치 (한글 포함 4자 ≈ 1토큰)
+        input_tokens, output_tokens = len(prompt) // 4, len(content) // 4
+        return {"input_tokens": input_tokens, "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens}
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        prompt = _prompt_text(messages)
+        content = fake_response_for(prompt)
+        self._sleep()
+        message = AIMessage(content=content, usage_metadata=self._usage(prompt, content))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        prompt = _prompt_text(messages)
+        content = fake_response_for(prompt)
+        self._sleep()
+        for i in range(0, len(content), self.chunk_size):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=content[i:i + self.chunk_size]))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+def get_chat_model(temperature: float = 0.7, model: str = DEFAULT_MODEL_NAME, **kwargs) -> BaseChatModel:
+    """선택된 백엔드의 Chat 모델 생성"""
+    if _BACKENDS["llm"] == "fake":
+        return FakeReplayChatModel(temperature=temperature)
+
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(model=model, temperature=temperature, **kwargs)
+
+
+__all__ = [
+    "set_backends",
+    "get_llm_backend",
+    "is_offline_tools",
+    "get_chat_model",
+    "FakeReplayChatModel",
+    "fake_response_for",
+]
@@ -0,0 +1,285 @@
+# agents/checkpoint.py
+"""
+Pydantic 안전 체크포인터
+- PydanticJsonSerializer: STPOutput, StrategyCard 등 Pydantic 모델을 클래스 경로와 함께
+  JSON으로 직렬화하여 원래 타입으로 복원 (LangGraph SerializerProtocol 구현)
+- FileCheckpointSaver: MemorySaver 저장소를 로컬 디스크(SQLite)에 영속화
+  put/put_writes마다 바뀐 행만 기록 (파일 전체 재작성 없음), 여러 프로세스가 같은 파일을 써도 SQLite 잠금으로 안전
+  put/put_writes 인자를 그대로 저장하고 시작 시 같은 API로 재생 → MemorySaver 내부 구조(버전별로 다름)에 의존하지 않음
+
+사용 예:
+    saver = get_checkpointer()
+    app = create_super_graph(checkpointer=saver)
+"""
+from __future__ import annotations
+
+import base64
+import importlib
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from langgraph.checkpoint.base import WRITES_IDX_MAP
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from pydantic import BaseModel
+
+CHECKPOINT_PATH = os.getenv(
+    "MARKETING_CHECKPOINT_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache", "checkpoints.sqlite3"),
+)
+MAX_CHECKPOINTS_PER_THREAD = 5
+
+# 스키마가 바뀌면 올림 - 다른 버전 파일의 테이블은 지우고 다시 만듦 (재사용 캐시)
+CHECKPOINT_SCHEMA_VERSION = 2
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    ns TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    parent_id TEXT,
+    checkpoint_type TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    metadata_type TEXT NOT NULL,
+    metadata BLOB NOT NULL,
+    PRIMARY KEY (thread_id, ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    ns TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    value_type TEXT NOT NULL,
+    value BLOB NOT NULL,
+    task_path TEXT,
+    PRIMARY KEY (thread_id, ns, checkpoint_id, task_id, idx)
+);
+"""
+
+# ============================================================================
+# 1. Serializer
+# ============================================================================
+
+def _encode(obj: Any) -> Any:
+    """Pydantic 모델/튜플/셋을 타입 태그가 붙은 JSON 값으로 변환"""
+    if isinstance(obj, BaseModel):
+        cls = type(obj)
+        return {
+            "__model__": f"{cls.__module__}:{cls.__qualname__}",
+            "data": {k: _encode(v) for k, v in obj.__dict__.items()},
+        }
+    if isinstance(obj, dict):
+        if not all(isinstance(k, str) for k in obj):
+            return {"__dict_items__": [[_encode(k), _encode(v)] for k, v in obj.items()]}
+        return {k: _encode(v) for k, v in obj.items()}
+    if isinstance(obj, tuple):
+        return {"__tuple__": [_encode(v) for v in obj]}
+    if isinstance(obj, (set, frozenset)):
+        return {"__set__": [_encode(v) for v in obj]}
+    if isinstance(obj, list):
+        return [_encode(v) for v in obj]
+    if isinstance(obj, bytes):
+        return {"__bytes__": base64.b64encode(obj).decode("ascii")}
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    raise TypeError(f"JSON 직렬화 불가 타입: {type(obj).__name__}")
+
+
+def _resolve_model(path: str) -> type:
+    module_name, _, qualname = path.partition(":")
+    target: Any = importlib.import_module(module_name)
+    for part in qualname.split("."):
+        target = getattr(target, part)
+    if not (isinstance(target, type) and issubclass(target, BaseModel)):
+        raise TypeError(f"Pydantic 모델이 아님: {path}")
+    return target
+
+
+def _decode(obj: Any) -> Any:
+    if isinstance(obj, list):
+        return [_decode(v) for v in obj]
+    if not isinstance(obj, dict):
+        return obj
+    if "__model__" in obj:
+        cls = _resolve_model(obj["__model__"])
+        return cls.model_validate({k: _decode(v) for k, v in obj["data"].items()})
+    if "__tuple__" in obj:
+        return tuple(_decode(v) for v in obj["__tuple__"])
+    if "__set__" in obj:
+        return set(_decode(v) for v in obj["__set__"])
+    if "__bytes__" in obj:
+        return base64.b64decode(obj["__bytes__"])
+    if "__dict_items__" in obj:
+        return {_decode(k): _decode(v) for k, v in obj["__dict_items__"]}
+    return {k: _decode(v) for k, v in obj.items()}
+
+
+class PydanticJsonSerializer:
+    """
+    Pydantic 모델 왕복 직렬화 (LangGraph SerializerProtocol)
+
+    JSON으로 표현할 수 없는 값(Send 등 LangGraph 내부 타입)은 기본 JsonPlusSerializer로 위임합니다.
+    """
+
+    def __init__(self):
+        self._fallback = JsonPlusSerializer()
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(_encode(obj), ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return _decode(json.loads(data))
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        try:
+            return "pydantic_json", self.dumps(obj)
+        except TypeError:
+            return self._fallback.dumps_typed(obj)
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_ == "pydantic_json":
+            return self.loads(payload)
+        return self._fallback.loads_typed(data)
+
+
+# ============================================================================
+# 2. On-disk Checkpoint Saver
+# ============================================================================
+
+class FileCheckpointSaver(MemorySaver):
+    """MemorySaver + 로컬 SQLite 영속화 (스레드별 최근 체크포인트만 보관)"""
+
+    def __init__(self, path: str = CHECKPOINT_PATH, max_per_thread: int = MAX_CHECKPOINTS_PER_THREAD):
+        super().__init__(serde=PydanticJsonSerializer())
+        self.path = path
+        self.max_per_thread = max_per_thread
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != CHECKPOINT_SCHEMA_VERSION:
+                conn.executescript("DROP TABLE IF EXISTS checkpoints; DROP TABLE IF EXISTS writes;")
+                conn.execute(f"PRAGMA user_version = {CHECKPOINT_SCHEMA_VERSION}")
+            conn.executescript(_SCHEMA)
+        self._load()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """작업 단위 연결 (정상 종료 시 commit, 항상 close)"""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _load(self):
+        """저장된 put/put_writes를 부모 클래스 API로 재생"""
+        try:
+            with self._connect() as conn:
+                checkpoints = conn.execute("SELECT * FROM checkpoints ORDER BY thread_id, ns, checkpoint_id").fetchall()
+                writes = conn.execute("SELECT * FROM writes ORDER BY thread_id, ns, checkpoint_id, task_id, idx").fetchall()
+        except sqlite3.Error as e:
+            print(f"⚠️  체크포인트 로드 실패 ({self.path}): {e}")
+            return
+
+        for thread_id, ns, cid, parent, ckpt_type, ckpt, meta_type, meta in checkpoints:
+            config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": parent}}
+            checkpoint = self.serde.loads_typed((ckpt_type, ckpt))
+            # 이전 체크포인트가 정리됐을 수 있으므로 모든 채널 값을 이 체크포인트에 기록
+            super().put(config, checkpoint, self.serde.loads_typed((meta_type, meta)),
+                        dict(checkpoint.get("channel_versions", {})))
+
+        # 일반 쓰기는 (체크포인트, 태스크)별로 idx 순서대로 한 번에, 특수 채널(오류/인터럽트 등)은 하나씩
+        groups: Dict[Tuple[str, str, str, str, Optional[str]], List[Tuple[str, Any]]] = {}
+        for thread_id, ns, cid, task_id, idx, channel, value_type, value, task_path in writes:
+            write = (channel, self.serde.loads_typed((value_type, value)))
+            key = (thread_id, ns, cid, task_id, task_path)
+            if idx < 0:
+                self._replay_writes(key, [write])
+            else:
+                groups.setdefault(key, []).append(write)
+        for key, group in groups.items():
+            self._replay_writes(key, group)
+
+    def _replay_writes(self, key: Tuple[str, str, str, str, Optional[str]], writes: List[Tuple[str, Any]]):
+        thread_id, ns, cid, task_id, task_path = key
+        config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": cid}}
+        super().put_writes(config, writes, task_id, *(() if task_path is None else (task_path,)))
+
+    def _prune(self, thread_id: str) -> List[Tuple[str, str]]:
+        """보관 한도를 넘은 체크포인트 제거 → 제거한 [(ns, checkpoint_id)]"""
+        removed = []
+        namespaces = self.storage[thread_id]
+        for ns, checkpoints in namespaces.items():
+            stale = sorted(checkpoints)[:-self.max_per_thread]
+            for cid in stale:
+                del checkpoints[cid]
+                self.writes.pop((thread_id, ns, cid), None)
+                removed.append((ns, cid))
+
+        # 서브그래프 네임스페이스는 팀 실행마다 새로 생기므로, 보관 중인 루트 체크포인트보다 오래되면 제거
+        root = namespaces.get("")
+        if not root:
+            return removed
+        oldest = min(root)
+        for ns in [ns for ns, checkpoints in namespaces.items() if ns and (not checkpoints or max(checkpoints) < oldest)]:
+            for cid in namespaces[ns]:
+                self.writes.pop((thread_id, ns, cid), None)
+                removed.append((ns, cid))
+            del namespaces[ns]
+        return removed
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        with self._lock:
+            result = super().put(config, checkpoint, metadata, new_versions)
+            thread_id = result["configurable"]["thread_id"]
+            ns, cid = result["configurable"]["checkpoint_ns"], result["configurable"]["checkpoint_id"]
+            removed = self._prune(thread_id)
+            with self._connect() as conn:
+                if (ns, cid) not in removed:
+                    conn.execute("INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                 (thread_id, ns, cid, config["configurable"].get("checkpoint_id"),
+                                  *self.serde.dumps_typed(checkpoint), *self.serde.dumps_typed(metadata)))
+                for table in ("checkpoints", "writes"):
+                    conn.executemany(f"DELETE FROM {table} WHERE thread_id = ? AND ns = ? AND checkpoint_id = ?",
+                                     [(thread_id, r_ns, r_cid) for r_ns, r_cid in removed])
+        return result
+
+    def put_writes(self, config, writes, task_id, *args):
+        with self._lock:
+            super().put_writes(config, writes, task_id, *args)
+            configurable = config["configurable"]
+            outer = (configurable["thread_id"], configurable.get("checkpoint_ns", ""), configurable["checkpoint_id"])
+            task_path = args[0] if args else None
+            rows = [(*outer, task_id, WRITES_IDX_MAP.get(channel, idx), channel, *self.serde.dumps_typed(value), task_path)
+                    for idx, (channel, value) in enumerate(writes)]
+            with self._connect() as conn:
+                # 일반 쓰기는 먼저 기록된 값 유지, 특수 채널은 덮어씀 (MemorySaver와 같은 규칙)
+                conn.executemany("INSERT OR IGNORE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                 [row for row in rows if row[4] >= 0])
+                conn.executemany("INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                 [row for row in rows if row[4] < 0])
+
+_CHECKPOINTER: Optional[FileCheckpointSaver] = None
+_CHECKPOINTER_LOCK = threading.Lock()
+
+
+def get_checkpointer(path: Optional[str] = None) -> FileCheckpointSaver:
+    """프로세스 공용 체크포인터 (기본 경로 사용 시 싱글턴)"""
+    global _CHECKPOINTER
+    if path:
+        return FileCheckpointSaver(path)
+    with _CHECKPOINTER_LOCK:
+        if _CHECKPOINTER is None:
+            _CHECKPOINTER = FileCheckpointSaver()
+        return _CHECKPOINTER
+
+
+__all__ = ["PydanticJsonSerializer", "FileCheckpointSaver", "get_checkpointer", "CHECKPOINT_PATH"]
@@ -6,10 +6,15 @@ Content Agent (콘텐츠 크리에이터)
 """
 from typing import Dict, Any, List, Optional
 from pydantic import BaseModel, Field
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage
 from pathlib import Path
 from dotenv import load_dotenv
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+from agents.deadline import DeadlineExceeded, invoke_with_budget, mark_degraded
+from agents.streaming import token_forwarder
+from agents.backends import get_chat_model
 
 # .env 파일 로드
 env_path = Path(__file__).parent.parent / '.env'
@@ -296,13 +301,14 @@ def content_agent_node(state: Dict[str, Any]) -> Dict[str, Any]:
     # ========================================
     # Step 3: LLM 호출
     # ========================================
-    llm = ChatGoogleGenerativeAI(model=MODEL_NAME, temperature=0.7)
+    llm = get_chat_model(temperature=0.7, model=MODEL_NAME)
     
     try:
-        response = llm.invoke([
+        response = invoke_with_budget(llm, [
             SystemMessage(content=system_prompt),
             HumanMessage(content=user_prompt)
-        ])
+        ], "content_agent.llm", node="generate_content_guide",
+            on_token=token_forwarder("generate_content_guide"))
         
         # JSON 파싱
         import json
@@ -326,6 +332,8 @@ def content_agent_node(state: Dict[str, Any]) -> Dict[str, Any]:
         
     except Exception as e:
         logs.append(f"[content] 생성 실패: {e}")
+        if isinstance(e, DeadlineExceeded):
+            mark_degraded("generate_content_guide", str(e))
         
         # Fallback: 기본 가이드
         fallback_guide = ContentGuide(
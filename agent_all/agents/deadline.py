@@ -0,0 +1,198 @@
+# agents/deadline.py
+"""
+요청 단위 Deadline / 노드별 시간 예산
+- 전체 deadline(초)을 노드별 비율(NODE_BUDGET_SHARES)로 나눠 LLM 호출 예산으로 사용
+- 노드 예산은 노드의 모든 LLM 호출이 함께 씀 (골격+개인화처럼 여러 번 호출하는 노드도 합계가 비율 이내)
+  동시 호출(카드 병렬 생성)은 겹친 구간을 한 번만 계산
+- call_with_budget(): LLM 호출이 아닌 대기(캐시 골격 생성 등)도 같은 노드 예산 안에서 기다림
+- 예산 초과 시 DeadlineExceeded → 각 노드가 결정적 폴백(폴백 카드 / 템플릿 보고서)으로 전환
+- 폴백으로 전환된 노드는 degraded로 기록 → result['degraded'], result['degraded_nodes']
+- 모든 LLM 호출은 공유 쿼터(agents.llm_quota)를 거치며, 쿼터 대기 시간도 노드 예산에 포함
+
+사용 예:
+    deadline = Deadline(60)
+    with use_deadline(deadline):
+        response = invoke_with_budget(llm, prompt, "strategy_4p_agent.llm", node="strategy_4p_agent")
+
+Deadline이 활성화되지 않은 요청에서는 invoke_with_budget이 traced_invoke와 동일하게 동작합니다.
+"""
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from agents.llm_quota import quota_slot
+from agents.tracing import annotate, traced_invoke, traced_stream
+
+_CURRENT_DEADLINE: contextvars.ContextVar[Optional["Deadline"]] = contextvars.ContextVar("marketing_deadline", default=None)
+
+# 전체 deadline 대비 노드별 LLM 예산 비율 (task_type별로 실행되는 노드가 다르므로 합계 1 초과 가능)
+NODE_BUDGET_SHARES = {
+    "strategy_4p_agent": 0.45,
+    "generate_comprehensive_report": 0.35,
+    "generate_tactical_card": 0.45,
+    "generate_content_guide": 0.45,
+}
+DEFAULT_NODE_SHARE = 0.25
+
+
+class DeadlineExceeded(TimeoutError):
+    """노드 예산 초과"""
+
+
+class Deadline:
+    """요청 1건의 전체 deadline과 degraded 기록"""
+
+    def __init__(self, total_s: float, shares: Optional[Dict[str, float]] = None):
+        self.total_s = total_s
+        self.shares = {**NODE_BUDGET_SHARES, **(shares or {})}
+        self.started_at = time.monotonic()
+        self.degraded: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        # 노드별 LLM 호출 사용 시간 (끝난 구간 합계 + 진행 중인 호출 수/시작 시각)
+        self._spent: Dict[str, float] = {}
+        self._active: Dict[str, int] = {}
+        self._busy_since: Dict[str, float] = {}
+
+    def remaining(self) -> float:
+        return max(0.0, self.total_s - (time.monotonic() - self.started_at))
+
+    def spent(self, node: str) -> float:
+        """노드가 LLM 호출에 쓴 시간(초) - 진행 중인 호출 포함"""
+        with self._lock:
+            spent = self._spent.get(node, 0.0)
+            if self._active.get(node):
+                spent += time.monotonic() - self._busy_since[node]
+            return spent
+
+    def budget(self, node: str) -> float:
+        """노드 남은 예산(초) = min(비율 × 전체 - 노드 사용 시간, 남은 시간)"""
+        share = self.shares.get(node, DEFAULT_NODE_SHARE) * self.total_s
+        return min(max(0.0, share - self.spent(node)), self.remaining())
+
+    @contextmanager
+    def charge(self, node: str) -> Iterator[None]:
+        """블록 실행 시간을 노드 사용 시간에 합산 (같은 노드의 동시 블록은 겹친 구간을 한 번만)"""
+        with self._lock:
+            if not self._active.get(node):
+                self._busy_since[node] = time.monotonic()
+            self._active[node] = self._active.get(node, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active[node] -= 1
+                if not self._active[node]:
+                    self._spent[node] = self._spent.get(node, 0.0) + time.monotonic() - self._busy_since.pop(node)
+
+    def mark_degraded(self, node: str, reason: str):
+        with self._lock:
+            if not any(d["node"] == node for d in self.degraded):
+                self.degraded.append({"node": node, "reason": reason})
+        annotate(degraded=True, degraded_reason=reason)
+
+    @property
+    def is_degraded(self) -> bool:
+        return bool(self.degraded)
+
+
+def get_deadline() -> Optional[Deadline]:
+    return _CURRENT_DEADLINE.get()
+
+
+@contextmanager
+def use_deadline(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """현재 컨텍스트에 deadline 활성화"""
+    token = _CURRENT_DEADLINE.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _CURRENT_DEADLINE.reset(token)
+
+
+def mark_degraded(node: str, reason: str):
+    """현재 요청의 노드를 degraded로 기록 (deadline 비활성화 시 무시)"""
+    deadline = _CURRENT_DEADLINE.get()
+    if deadline is not None:
+        deadline.mark_degraded(node, reason)
+
+
+def call_with_budget(fn: Callable[[], Any], node: str, what: str = "LLM 응답",
+                     on_timeout: Optional[Callable[[], None]] = None) -> Any:
+    """
+    노드 남은 예산 안에서 fn() 실행 (기다린 시간은 노드 사용 시간에 합산)
+
+    예산 초과 시 on_timeout() 후 DeadlineExceeded를 발생시킵니다. fn은 백그라운드(daemon) 스레드에서
+    끝까지 실행되므로, 결과를 캐시에 저장하는 작업(골격 생성 등)은 다음 요청이 그 결과를 씁니다.
+    Deadline이 활성화되지 않은 요청에서는 fn()을 바로 호출합니다.
+    """
+    deadline = _CURRENT_DEADLINE.get()
+    if deadline is None:
+        return fn()
+
+    budget = deadline.budget(node)
+    if budget <= 0:
+        raise DeadlineExceeded(f"{node}: 남은 시간 없음")
+
+    outcome: Dict[str, Any] = {}
+
+    def run():
+        try:
+            outcome["response"] = fn()
+        except BaseException as e:
+            outcome["error"] = e
+
+    worker = threading.Thread(target=contextvars.copy_context().run, args=(run,), daemon=True, name=f"llm-{node}")
+    with deadline.charge(node):
+        worker.start()
+        worker.join(budget)
+    if worker.is_alive():
+        if on_timeout is not None:
+            on_timeout()
+        raise DeadlineExceeded(f"{node}: {what}이 예산 {budget:.1f}초 초과")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["response"]
+
+
+def invoke_with_budget(llm: Any, prompt: Any, name: str, node: str,
+                       on_token: Optional[Callable[[str], None]] = None, **invoke_kwargs) -> Any:
+    """
+    노드 예산 안에서 LLM invoke (공유 쿼터 확보 후 호출)
+
+    on_token 지정 시 토큰 스트리밍으로 호출하여 청크를 전달하고, 합쳐진 응답을 반환합니다.
+
+    예산은 같은 노드의 이전/동시 호출과 공유합니다. 예산 초과 시 DeadlineExceeded를 발생시킵니다. 진행 중인 HTTP 호출은 중단할 수 없으므로
+    백그라운드(daemon) 스레드에서 끝날 때까지 실행되고 결과는 버려집니다.
+    """
+    cancelled = threading.Event()
+
+    def forward(text: str):
+        # 예산 초과로 폴백한 뒤에는 늦게 도착한 토큰을 전달하지 않음
+        if not cancelled.is_set():
+            on_token(text)
+
+    def call():
+        with quota_slot(prompt, name, cancel=cancelled) as slot:
+            if on_token is not None:
+                response = traced_stream(llm, prompt, name, forward, **invoke_kwargs)
+            else:
+                response = traced_invoke(llm, prompt, name, **invoke_kwargs)
+            slot.settle(response)
+            return response
+
+    return call_with_budget(call, node, on_timeout=cancelled.set)
+
+__all__ = [
+    "Deadline",
+    "DeadlineExceeded",
+    "NODE_BUDGET_SHARES",
+    "get_deadline",
+    "use_deadline",
+    "mark_degraded",
+    "call_with_budget",
+    "invoke_with_budget",
+]
@@ -0,0 +1,220 @@
+# agents/intent_classifier.py
+"""
+로컬 Intent 분류기 (LLM 앞단 fast-path)
+- 특징: 문자 n-gram (1~3, 공백 경계 포함)
+- 모델: 다항 나이브 베이즈 (로그 공간 선형 모델), 라벨 파일로 메모리 내 학습
+- 학습 데이터: data/intent_labeled_queries.csv (query, task_type)
+- 보정: 나이브 베이즈 점수는 n-gram 수만큼 커져 사후확률이 0/1로 쏠리므로
+  n-gram당 평균 로그우도 × scale로 길이 정규화, scale은 교차검증(held-out) 로그손실 최소값
+- 임계값: 교차검증 held-out 예측에서 정밀도 ≥ LOCAL_TARGET_PRECISION이 되는 최소 confidence
+- OOV 가드: 학습 어휘에 있는 2~3-gram 비율이 MIN_KNOWN_NGRAM_RATIO 미만이면 ("asdf", "안녕하세요")
+  confidence 0 → LLM 분류
+
+예측 1건은 1ms 미만이며, confidence(보정 사후확률)가 임계값 미만일 때만 LLM 분류를 사용합니다.
+
+사용 예:
+    clf = get_intent_classifier()
+    task_type, confidence = clf.predict("내일 비 온다는데 프로모션 추천")
+    if confidence >= clf.threshold: ...
+"""
+from __future__ import annotations
+
+import csv
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data")
+LABELED_QUERIES_PATH = os.getenv(
+    "MARKETING_INTENT_DATA", os.path.join(DATA_DIR, "intent_labeled_queries.csv")
+)
+# 지정하면 보정 임계값 대신 이 값 이상일 때 LLM 호출 없이 로컬 결과 사용
+LOCAL_CONFIDENCE_THRESHOLD: Optional[float] = (
+    float(os.environ["MARKETING_INTENT_THRESHOLD"]) if os.getenv("MARKETING_INTENT_THRESHOLD") else None
+)
+# 임계값 선택 기준: held-out 예측 중 임계값 이상인 것의 정밀도
+LOCAL_TARGET_PRECISION = float(os.getenv("MARKETING_INTENT_PRECISION", "0.95"))
+MIN_KNOWN_NGRAM_RATIO = float(os.getenv("MARKETING_INTENT_MIN_KNOWN", "0.25"))
+CALIBRATION_FOLDS = 6
+CALIBRATION_SCALES = (1, 2, 3, 4, 5, 6, 8, 10, 12, 15, 20, 30)
+NGRAM_RANGE = (1, 3)
+SMOOTHING = 0.5
+
+
+def normalize_query(text: str) -> str:
+    """소문자 + 공백 정리 (캐시 키 / 특징 추출 공용)"""
+    return re.sub(r"\s+", " ", (text or "").strip().lower())
+
+
+def char_ngrams(text: str, ngram_range: Tuple[int, int] = NGRAM_RANGE) -> Counter:
+    """단어별 문자 n-gram (앞뒤 공백 경계 포함, sklearn char_wb 방식)"""
+    counts: Counter = Counter()
+    lo, hi = ngram_range
+    for word in normalize_query(text).split():
+        padded = f" {word} "
+        for n in range(lo, hi + 1):
+            for i in range(len(padded) - n + 1):
+                gram = padded[i:i + n]
+                if gram.strip():
+                    counts[gram] += 1
+    return counts
+
+
+class CharNgramIntentClassifier:
+    """문자 n-gram 다항 나이브 베이즈 분류기"""
+
+    def __init__(self, alpha: float = SMOOTHING):
+        self.alpha = alpha
+        self.labels: List[str] = []
+        self.log_prior: Dict[str, float] = {}
+        self.log_likelihood: Dict[str, Dict[str, float]] = {}
+        self.log_unseen: Dict[str, float] = {}
+        self.vocab: set = set()
+        self.scale = 1.0
+        self.threshold = LOCAL_CONFIDENCE_THRESHOLD if LOCAL_CONFIDENCE_THRESHOLD is not None else 1.0
+
+    def fit(self, queries: List[str], labels: List[str]) -> "CharNgramIntentClassifier":
+        gram_counts: Dict[str, Counter] = defaultdict(Counter)
+        label_counts = Counter(labels)
+        for query, label in zip(queries, labels):
+            gram_counts[label].update(char_ngrams(query))
+
+        vocab = set()
+        for counts in gram_counts.values():
+            vocab.update(counts)
+
+        self.vocab = vocab
+        self.labels = sorted(label_counts)
+        total = sum(label_counts.values())
+        for label in self.labels:
+            counts = gram_counts[label]
+            denom = sum(counts.values()) + self.alpha * len(vocab)
+            self.log_prior[label] = math.log(label_counts[label] / total)
+            self.log_likelihood[label] = {g: math.log((c + self.alpha) / denom) for g, c in counts.items()}
+            self.log_unseen[label] = math.log(self.alpha / denom)
+        return self
+
+    def _mean_log_likelihood(self, grams: Counter) -> Dict[str, float]:
+        """라벨별 n-gram당 평균 로그우도 (길이 정규화)"""
+        n = sum(grams.values())
+        return {
+            label: sum(c * self.log_likelihood[label].get(g, self.log_unseen[label]) for g, c in grams.items()) / n
+            for label in self.labels
+        }
+
+    def _softmax(self, mean_ll: Dict[str, float], scale: float) -> Dict[str, float]:
+        scores = {label: self.log_prior[label] + scale * ll for label, ll in mean_ll.items()}
+        top = max(scores.values())
+        exp = {label: math.exp(s - top) for label, s in scores.items()}
+        z = sum(exp.values())
+        return {label: v / z for label, v in exp.items()}
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        grams = char_ngrams(text)
+        if not grams or not self.labels:
+            return {label: 1 / max(len(self.labels), 1) for label in self.labels}
+        return self._softmax(self._mean_log_likelihood(grams), self.scale)
+
+    def known_ratio(self, text: str) -> float:
+        """학습 어휘에 있는 2글자 이상 n-gram 비율 (1글자 n-gram은 거의 항상 알려져 있어 제외)"""
+        grams = {g: c for g, c in char_ngrams(text).items() if len(g.strip()) >= 2}
+        total = sum(grams.values())
+        if not total:
+            return 0.0
+        return sum(c for g, c in grams.items() if g in self.vocab) / total
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """(task_type, confidence) - 모르는 n-gram 위주의 입력은 confidence 0"""
+        proba = self.predict_proba(text)
+        label = max(proba, key=proba.get)
+        if self.known_ratio(text) < MIN_KNOWN_NGRAM_RATIO:
+            return label, 0.0
+        return label, round(proba[label], 4)
+
+    def calibrate(self, queries: List[str], labels: List[str], folds: int = CALIBRATION_FOLDS,
+                  target_precision: float = LOCAL_TARGET_PRECISION) -> "CharNgramIntentClassifier":
+        """
+        층화 k-fold held-out 예측으로 scale(로그손실 최소)과 임계값(정밀도 ≥ target_precision인 최소 confidence) 선택
+
+        각 fold는 나머지로 학습한 모델로만 예측하므로 임계값이 학습 행에 과적합되지 않습니다.
+        MARKETING_INTENT_THRESHOLD를 지정했으면 임계값은 그 값을 그대로 사용합니다.
+        """
+        seen: Counter = Counter()
+        fold_of = []
+        for label in labels:
+            fold_of.append(seen[label] % folds)
+            seen[label] += 1
+
+        held_out = []  # (라벨별 평균 로그우도, OOV 가드 통과 여부, 정답)
+        for k in range(folds):
+            train = [i for i in range(len(queries)) if fold_of[i] != k]
+            model = CharNgramIntentClassifier(self.alpha).fit([queries[i] for i in train], [labels[i] for i in train])
+            for i in range(len(queries)):
+                if fold_of[i] == k and char_ngrams(queries[i]):
+                    held_out.append((model._mean_log_likelihood(char_ngrams(queries[i])),
+                                     model.known_ratio(queries[i]) >= MIN_KNOWN_NGRAM_RATIO, labels[i]))
+        if not held_out:
+            return self
+
+        def log_loss(scale: float) -> float:
+            return -sum(math.log(max(self._softmax(ll, scale)[y], 1e-12)) for ll, _, y in held_out)
+
+        self.scale = float(min(CALIBRATION_SCALES, key=log_loss))
+
+        # confidence 내림차순으로 누적 정밀도를 보며 목표를 만족하는 가장 낮은 confidence
+        predictions = []
+        for ll, known, y in held_out:
+            if known:
+                proba = self._softmax(ll, self.scale)
+                label = max(proba, key=proba.get)
+                predictions.append((proba[label], label == y))
+        predictions.sort(key=lambda p: -p[0])
+        threshold, correct = 1.0, 0
+        for n, (confidence, ok) in enumerate(predictions, 1):
+            correct += ok
+            if correct / n >= target_precision:
+                threshold = confidence
+        if LOCAL_CONFIDENCE_THRESHOLD is None:
+            self.threshold = round(threshold, 4)
+        return self
+
+
+def load_labeled_queries(path: str = LABELED_QUERIES_PATH) -> Tuple[List[str], List[str]]:
+    queries, labels = [], []
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            if row.get("query") and row.get("task_type"):
+                queries.append(row["query"])
+                labels.append(row["task_type"].strip())
+    return queries, labels
+
+
+_CLASSIFIER: Optional[CharNgramIntentClassifier] = None
+_CLASSIFIER_LOCK = threading.Lock()
+
+
+def get_intent_classifier() -> Optional[CharNgramIntentClassifier]:
+    """프로세스 공용 분류기 (최초 호출 시 학습, 라벨 파일이 없으면 None)"""
+    global _CLASSIFIER
+    with _CLASSIFIER_LOCK:
+        if _CLASSIFIER is None:
+            try:
+                queries, labels = load_labeled_queries()
+            except FileNotFoundError:
+                print(f"⚠️  Intent 라벨 파일 없음: {LABELED_QUERIES_PATH}")
+                return None
+            _CLASSIFIER = CharNgramIntentClassifier().fit(queries, labels).calibrate(queries, labels)
+        return _CLASSIFIER
+
+
+__all__ = [
+    "CharNgramIntentClassifier",
+    "get_intent_classifier",
+    "load_labeled_queries",
+    "normalize_query",
+    "LOCAL_CONFIDENCE_THRESHOLD",
+    "LOCAL_TARGET_PRECISION",
+]
@@ -0,0 +1,361 @@
+# agents/llm_quota.py
+"""
+공유 LLM 쿼터 관리 (토큰 버킷)
+- 분당 요청 수(RPM) / 분당 토큰 수(TPM) 두 개의 토큰 버킷으로 Gemini 키 호출량 제한
+- 대기열은 우선순위 순 (interactive → batch, 같은 우선순위는 도착 순)
+- MARKETING_LLM_QUOTA_LOCK 지정 시 버킷 상태를 파일 + 파일 잠금(fcntl)으로 공유하여
+  여러 워커 프로세스(Streamlit 세션 / 배치 작업)가 같은 쿼터를 나눠 씀
+- 호출 전 토큰은 프롬프트 추정치 + 출력 예약분으로 차감하고, 응답 후 실제 사용량으로 정산
+- 대기 시간은 "queue" span + 우선순위별 누적 통계(get_quota_stats)로 기록
+
+사용 예:
+    with use_llm_priority("batch"):
+        prebuild_cluster_templates()        # 배치 작업은 대화형 요청 뒤로
+
+    with quota_slot(prompt, "strategy_4p_agent.llm") as slot:
+        response = traced_invoke(llm, prompt, "strategy_4p_agent.llm")
+        slot.settle(response)
+
+fake 백엔드는 기본적으로 쿼터를 적용하지 않습니다 (MARKETING_LLM_QUOTA_FAKE=1로 적용).
+"""
+from __future__ import annotations
+
+import contextvars
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from agents.backends import get_llm_backend
+from agents.prompt_budget import estimate_tokens
+from agents.tracing import span
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:  # Windows - 프로세스 내부 쿼터만 사용
+    HAS_FCNTL = False
+
+QUOTA_RPM = float(os.getenv("MARKETING_LLM_RPM", "60"))  # 0이면 제한 없음
+QUOTA_TPM = float(os.getenv("MARKETING_LLM_TPM", "250000"))  # 0이면 제한 없음
+QUOTA_LOCK_PATH = os.getenv("MARKETING_LLM_QUOTA_LOCK") or None
+OUTPUT_TOKEN_RESERVE = int(os.getenv("MARKETING_LLM_OUTPUT_RESERVE", "1000"))
+APPLY_TO_FAKE = os.getenv("MARKETING_LLM_QUOTA_FAKE", "0") == "1"
+
+PRIORITIES = {"interactive": 0, "batch": 1}
+DEFAULT_PRIORITY = "interactive"
+# 파일 공유 모드에서 다른 프로세스의 소비/반환을 확인하는 최대 간격
+MAX_POLL_S = 0.25
+WAIT_SAMPLES = 1000
+
+_CURRENT_PRIORITY: contextvars.ContextVar[str] = contextvars.ContextVar("marketing_llm_priority", default=DEFAULT_PRIORITY)
+
+
+class QuotaCancelled(RuntimeError):
+    """대기 중 호출 측이 취소 (예: 노드 예산 초과)"""
+
+
+# ============================================================================
+# 1. Token Buckets
+# ============================================================================
+
+class _Buckets(ABC):
+    """RPM / TPM 버킷 공통 계산 (상태 저장소는 하위 클래스: LocalBuckets / FileBuckets)"""
+
+    def __init__(self, rpm: float, tpm: float):
+        self.rpm = rpm
+        self.tpm = tpm
+
+    def _initial(self) -> Dict[str, float]:
+        return {"requests": self.rpm, "tokens": self.tpm, "updated_at": time.time()}
+
+    def _refill(self, state: Dict[str, float], now: float) -> Dict[str, float]:
+        elapsed = max(0.0, now - state["updated_at"])
+        return {
+            "requests": min(self.rpm, state["requests"] + elapsed * self.rpm / 60),
+            "tokens": min(self.tpm, state["tokens"] + elapsed * self.tpm / 60),
+            "updated_at": now,
+        }
+
+    def _take(self, state: Dict[str, float], tokens: float) -> Tuple[Dict[str, float], float]:
+        """(새 상태, 대기 필요 시간) - 대기 시간이 0이면 차감 완료"""
+        # 1건이 TPM 전체보다 크면 버킷이 가득 찼을 때 통과시킴 (무한 대기 방지)
+        tokens = min(tokens, self.tpm) if self.tpm else 0
+        waits = []
+        if self.rpm and state["requests"] < 1:
+            waits.append((1 - state["requests"]) * 60 / self.rpm)
+        if self.tpm and state["tokens"] < tokens:
+            waits.append((tokens - state["tokens"]) * 60 / self.tpm)
+        if waits:
+            return state, max(waits)
+        return {**state, "requests": state["requests"] - (1 if self.rpm else 0),
+                "tokens": state["tokens"] - tokens}, 0.0
+
+    # 저장소별 구현 ---------------------------------------------------------
+
+    @abstractmethod
+    def try_take(self, tokens: float) -> float:
+        """요청 1건 + tokens 차감 시도 → 대기 필요 시간 (0이면 차감 완료)"""
+
+    @abstractmethod
+    def adjust_tokens(self, delta: float):
+        """토큰 버킷에 delta만큼 반환(+) / 추가 차감(-)"""
+
+
+class LocalBuckets(_Buckets):
+    """버킷 상태를 프로세스 메모리에 보관"""
+
+    def __init__(self, rpm: float, tpm: float):
+        super().__init__(rpm, tpm)
+        self._state = self._initial()
+
+    def try_take(self, tokens: float) -> float:
+        self._state, wait = self._take(self._refill(self._state, time.time()), tokens)
+        return wait
+
+    def adjust_tokens(self, delta: float):
+        state = self._refill(self._state, time.time())
+        state["tokens"] = min(self.tpm, state["tokens"] + delta)
+        self._state = state
+
+
+class FileBuckets(_Buckets):
+    """버킷 상태를 JSON 파일에 두고 flock으로 프로세스 간 원자적으로 갱신"""
+
+    def __init__(self, rpm: float, tpm: float, path: str):
+        super().__init__(rpm, tpm)
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    @contextmanager
+    def _locked_state(self) -> Iterator[Dict[str, Any]]:
+        with open(f"{self.path}.lock", "a+") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        state = json.load(f)
+                except (FileNotFoundError, ValueError):
+                    state = self._initial()
+                holder = {"state": self._refill(state, time.time())}
+                yield holder
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(holder["state"], f)
+                os.replace(tmp_path, self.path)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def try_take(self, tokens: float) -> float:
+        with self._locked_state() as holder:
+            holder["state"], wait = self._take(holder["state"], tokens)
+        return wait
+
+    def adjust_tokens(self, delta: float):
+        with self._locked_state() as holder:
+            holder["state"]["tokens"] = min(self.tpm, holder["state"]["tokens"] + delta)
+
+
+# ============================================================================
+# 2. Quota Manager
+# ============================================================================
+
+class QuotaManager:
+    """우선순위 대기열 + 토큰 버킷 (스레드 안전)"""
+
+    def __init__(self, rpm: float = QUOTA_RPM, tpm: float = QUOTA_TPM, lock_path: Optional[str] = QUOTA_LOCK_PATH):
+        self.rpm = rpm
+        self.tpm = tpm
+        if lock_path and not HAS_FCNTL:
+            print("⚠️  fcntl 미지원 환경 - LLM 쿼터를 프로세스 내부에서만 적용합니다")
+            lock_path = None
+        self.shared = bool(lock_path)
+        self._buckets = FileBuckets(rpm, tpm, lock_path) if lock_path else LocalBuckets(rpm, tpm)
+        self._cond = threading.Condition()
+        self._queue: List[Tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._waits: Dict[str, Deque[float]] = {p: deque(maxlen=WAIT_SAMPLES) for p in PRIORITIES}
+        self._counts: Dict[str, Dict[str, float]] = {
+            p: {"requests": 0, "waited": 0, "total_wait_ms": 0.0, "max_wait_ms": 0.0} for p in PRIORITIES
+        }
+
+    def acquire(self, tokens: float, priority: str = DEFAULT_PRIORITY,
+                cancel: Optional[threading.Event] = None) -> float:
+        """
+        요청 1건 + tokens만큼 쿼터 확보 (필요하면 대기)
+
+        Returns:
+            대기 시간(초)
+        Raises:
+            QuotaCancelled: 대기 중 cancel 이벤트 설정
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"알 수 없는 LLM 우선순위: {priority}")
+        started = time.perf_counter()
+        ticket = (PRIORITIES[priority], next(self._seq))
+
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            try:
+                while True:
+                    if cancel is not None and cancel.is_set():
+                        raise QuotaCancelled("LLM 쿼터 대기 중 취소")
+                    if self._queue[0] == ticket:
+                        wait = self._buckets.try_take(tokens)
+                        if wait <= 0:
+                            break
+                        timeout = min(wait, MAX_POLL_S) if (self.shared or cancel is not None) else wait
+                    else:
+                        timeout = MAX_POLL_S  # 앞선 요청이 확보하면 notify
+                    self._cond.wait(timeout)
+            finally:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+
+        waited = time.perf_counter() - started
+        self._record(priority, waited)
+        return waited
+
+    def settle(self, reserved: float, actual: Optional[float]):
+        """예약 토큰과 실제 사용량 차이 정산 (남으면 반환, 모자라면 추가 차감)"""
+        if actual is None or not self.tpm:
+            return
+        with self._cond:
+            self._buckets.adjust_tokens(min(reserved, self.tpm) - actual)
+            self._cond.notify_all()
+
+    def _record(self, priority: str, waited: float):
+        wait_ms = waited * 1000
+        with self._cond:
+            self._waits[priority].append(wait_ms)
+            counts = self._counts[priority]
+            counts["requests"] += 1
+            counts["total_wait_ms"] += wait_ms
+            counts["max_wait_ms"] = max(counts["max_wait_ms"], wait_ms)
+            if wait_ms >= 1:
+                counts["waited"] += 1
+
+    def queue_depth(self) -> int:
+        with self._cond:
+            return len(self._queue)
+
+    def stats(self) -> Dict[str, Any]:
+        """우선순위별 요청 수 / 대기 발생 수 / 평균·p95·최대 대기(ms) + 현재 대기열 길이"""
+        with self._cond:
+            out: Dict[str, Any] = {"rpm": self.rpm, "tpm": self.tpm, "shared": self.shared,
+                                   "queue_depth": len(self._queue)}
+            for priority, counts in self._counts.items():
+                samples = sorted(self._waits[priority])
+                out[priority] = {
+                    "requests": int(counts["requests"]),
+                    "waited": int(counts["waited"]),
+                    "avg_wait_ms": round(counts["total_wait_ms"] / counts["requests"], 1) if counts["requests"] else 0.0,
+                    "p95_wait_ms": round(samples[int(0.95 * (len(samples) - 1))], 1) if samples else 0.0,
+                    "max_wait_ms": round(counts["max_wait_ms"], 1),
+                }
+            return out
+
+
+_QUOTA_MANAGER: Optional[QuotaManager] = None
+_QUOTA_LOCK = threading.Lock()
+
+
+def configure_quota(rpm: float = QUOTA_RPM, tpm: float = QUOTA_TPM,
+                    lock_path: Optional[str] = QUOTA_LOCK_PATH) -> QuotaManager:
+    """프로세스 공용 쿼터 재설정 (통계 초기화)"""
+    global _QUOTA_MANAGER
+    with _QUOTA_LOCK:
+        _QUOTA_MANAGER = QuotaManager(rpm, tpm, lock_path)
+        return _QUOTA_MANAGER
+
+
+def get_quota_manager() -> Optional[QuotaManager]:
+    """현재 백엔드에 적용할 쿼터 (제한 없음 / fake 백엔드면 None)"""
+    global _QUOTA_MANAGER
+    if get_llm_backend() == "fake" and not APPLY_TO_FAKE:
+        return None
+    with _QUOTA_LOCK:
+        if _QUOTA_MANAGER is None:
+            _QUOTA_MANAGER = QuotaManager()
+        manager = _QUOTA_MANAGER
+    return manager if (manager.rpm or manager.tpm) else None
+
+
+def get_quota_stats() -> Dict[str, Any]:
+    with _QUOTA_LOCK:
+        manager = _QUOTA_MANAGER
+    return manager.stats() if manager else {}
+
+
+# ============================================================================
+# 3. 호출 측 API
+# ============================================================================
+
+@contextmanager
+def use_llm_priority(priority: str) -> Iterator[str]:
+    """현재 컨텍스트의 LLM 호출 우선순위 ("interactive" | "batch")"""
+    if priority not in PRIORITIES:
+        raise ValueError(f"알 수 없는 LLM 우선순위: {priority}")
+    token = _CURRENT_PRIORITY.set(priority)
+    try:
+        yield priority
+    finally:
+        _CURRENT_PRIORITY.reset(token)
+
+
+def _prompt_text(prompt: Any) -> str:
+    if isinstance(prompt, str):
+        return prompt
+    if isinstance(prompt, (list, tuple)):
+        return "\n".join(str(getattr(m, "content", m)) for m in prompt)
+    return str(getattr(prompt, "content", prompt))
+
+
+class QuotaSlot:
+    """확보한 쿼터 1건 - 응답 후 settle()로 실제 토큰 사용량 정산"""
+
+    def __init__(self, manager: Optional[QuotaManager], reserved: float):
+        self.manager = manager
+        self.reserved = reserved
+
+    def settle(self, response: Any):
+        if self.manager is None:
+            return
+        usage = getattr(response, "usage_metadata", None) or {}
+        self.manager.settle(self.reserved, usage.get("total_tokens"))
+
+
+@contextmanager
+def quota_slot(prompt: Any, name: str = "llm", cancel: Optional[threading.Event] = None) -> Iterator[QuotaSlot]:
+    """LLM 호출 1건의 쿼터 확보 (대기 시간은 "queue" span으로 기록)"""
+    manager = get_quota_manager()
+    if manager is None:
+        yield QuotaSlot(None, 0)
+        return
+
+    reserved = estimate_tokens(_prompt_text(prompt)) + OUTPUT_TOKEN_RESERVE
+    priority = _CURRENT_PRIORITY.get()
+    with span(f"{name}.quota", cat="queue", priority=priority, reserved_tokens=reserved) as attrs:
+        waited = manager.acquire(reserved, priority, cancel)
+        attrs["wait_ms"] = round(waited * 1000, 3)
+    yield QuotaSlot(manager, reserved)
+
+
+__all__ = [
+    "QuotaManager",
+    "QuotaSlot",
+    "QuotaCancelled",
+    "PRIORITIES",
+    "configure_quota",
+    "get_quota_manager",
+    "get_quota_stats",
+    "use_llm_priority",
+    "quota_slot",
+]
@@ -64,6 +64,16 @@ MARKET_COORDINATES = {
     # 기타
     "금남시장": (37.5150, 126.8950, "금남시장"),
     "마장동": (37.5660, 127.0380, "마장동"),
+
+    # 성동구 (가맹점 데이터 상권명)
+    "성수": (37.5446, 127.0559, "성수"),
+    "왕십리": (37.5612, 127.0371, "왕십리"),
+    "한양대": (37.5557, 127.0436, "한양대"),
+    "답십리": (37.5667, 127.0526, "답십리"),
+    "행당": (37.5573, 127.0295, "행당"),
+    "신금호": (37.5544, 127.0207, "신금호"),
+    "옥수": (37.5407, 127.0179, "옥수"),
+    "장한평자동차": (37.5614, 127.0646, "장한평자동차"),
 }
 
 def get_coordinates(market_id: str):
@@ -15,14 +15,22 @@ os.environ['GLOG_minloglevel'] = '3'
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
 
 import json
+import sys
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any, Optional, TypedDict, Annotated, Sequence, Literal
+from typing import List, Dict, Any, Optional, TypedDict, Annotated, Sequence, Literal, Callable, Iterator
 from pathlib import Path
+import contextvars
 import operator
+import re
+import textwrap
+import threading
+import queue
 import warnings
 import time
+import hashlib
 from datetime import datetime, date, timedelta
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -32,7 +40,6 @@ logging.getLogger('absl').setLevel(logging.ERROR)
 
 # Langchain & Langgraph
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.graph import StateGraph, START, END
 from langgraph.checkpoint.memory import MemorySaver
 from pydantic import BaseModel, Field
@@ -42,8 +49,30 @@ from pydantic import BaseModel, Field
 # ============================================================================
 
 MODEL_NAME = "gemini-2.5-flash"
+# 요청 전체 deadline(초) 기본값 - 미설정 시 무제한
+DEFAULT_DEADLINE_S = float(os.getenv("MARKETING_DEADLINE_S", "0")) or None
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data")
 
+# agents/ 디렉토리에서 직접 실행 시에도 agents 패키지 임포트 가능하도록
+_PARENT_DIR = str(Path(__file__).parent.parent)
+if _PARENT_DIR not in sys.path:
+    sys.path.insert(0, _PARENT_DIR)
+
+from agents.tracing import Tracer, use_tracer, span, annotate, traced_node, traced_invoke
+from agents.backends import get_chat_model
+from agents.singleflight import SingleFlight
+from agents.deadline import (Deadline, DeadlineExceeded, get_deadline, use_deadline, mark_degraded, call_with_budget,
+                             invoke_with_budget)
+from agents.llm_quota import use_llm_priority
+from agents.prompt_budget import PromptSection, fit_sections, fit_section_texts, collapse_4p_summary, estimate_tokens
+from agents.strategy_templates import PERSONALIZE_CONTEXT_BUDGET, template_key, get_template_cache
+from agents.report_sections import ReportSection, build_report
+from agents.report_templates import (
+    render_store_position, render_cluster_stats, render_pc_factors, render_competitor_table,
+    render_4p_metrics, render_strategy_cards_table, render_situation_tables, format_expected_impact,
+)
+from agents.streaming import StreamEvent, TokenCallback, emit_event, stream_graph, use_token_callback, token_forwarder
+
 # ============================================================================
 # 1. Data Models
 # ============================================================================
@@ -115,6 +144,14 @@ class StrategyCard(BaseModel):
     priority: str
     data_evidence: List[str]
 
+class StrategyCardDraft(BaseModel):
+    """LLM JSON 응답용 전략 카드 (card_id/data_evidence는 로컬에서 채움)"""
+    title: str
+    positioning_concept: str
+    strategy_4p: Dict[str, str]
+    expected_outcome: str
+    priority: Literal["High", "Medium", "Low"] = "Medium"
+
 # ============================================================================
 # 2. State Definitions
 # ============================================================================
@@ -143,7 +180,11 @@ class StrategyPlanningState(TypedDict):
     current_agent: str
     stp_validation_result: Optional[Dict]
     data_4p_mapped: Optional[Dict]  # 🔥 4P 매핑 데이터
+    data_4p_summary: Optional[Dict]  # 4P 지표 요약 (보고서 데이터 섹션 렌더링용)
     llm_raw_strategy_output: Optional[str]  # 🔥 LLM 원본 응답 (디버깅용)
+    strategy_parse_status: Optional[str]  # "json" | "repaired" | "markdown" | "failed" | "timeout"
+    strategy_generation_mode: Optional[str]  # "single" | "parallel" (카드별 동시 호출) | "template" (군집 골격 + 개인화)
+    data_version: Optional[str]  # 군집 골격 캐시 키
     strategy_cards: List[StrategyCard]
     selected_strategy: Optional[StrategyCard]
     execution_plan: str
@@ -162,14 +203,21 @@ class SupervisorState(TypedDict):
     period_start: Optional[str]
     period_end: Optional[str]
     situation_context: Optional[Dict]
+    # 상황 수집 모드 ("weather_only" | "event_only" | "both")
+    collect_mode: Optional[str]
 
     # 콘텐츠 생성용
     content_channels: Optional[List[str]]
 
+    # 전략 카드 생성 방식 ("single" | "parallel" | "template")
+    strategy_generation_mode: Optional[str]
+
     # 공통
     stp_output: Optional[STPOutput]
     store_raw_data: Optional[StoreRawData]
-    strategy_cards: List[StrategyCard]
+    data_4p_summary: Optional[Dict]
+    base_strategy_cards: List[StrategyCard]  # 사용자 요청 반영 전 카드 (strategy phase 산출물)
+    strategy_cards: List[StrategyCard]  # 사용자 요청 반영 카드 (query phase 산출물)
     selected_strategy: Optional[StrategyCard]
     execution_plan: str
 
@@ -178,6 +226,10 @@ class SupervisorState(TypedDict):
     tactical_card: Optional[str]
     content_guide: Optional[Dict]
 
+    # 체크포인트 재사용용 (phase → 입력 키)
+    data_version: Optional[str]
+    phase_keys: Optional[Dict[str, str]]
+
     next: str
 
 # ============================================================================
@@ -195,6 +247,11 @@ class PrecomputedPositioningLoader:
 
     def load_all_data(self):
         """데이터 로드"""
+        with span("PrecomputedPositioningLoader.load_all_data", cat="data") as attrs:
+            self._load_all_data()
+            attrs["rows"] = len(self.store_positioning)
+
+    def _load_all_data(self):
         try:
             self.pca_loadings = pd.read_csv(
                 self.data_dir / "pca_components_by_industry.csv",
@@ -783,6 +840,248 @@ def _parse_strategy_cards_from_llm(content: str, base_evidence: List[str]) -> Li
 
     return cards
 
+# ============================================================================
+# Helper Functions for Strategy Card JSON Parsing
+# ============================================================================
+
+# 🔥 LLM에 요청하는 JSON 출력 형식 (StrategyCardDraft 스키마)
+STRATEGY_CARD_JSON_FORMAT = """{
+  "title": "구체적인 전략 제목 - 10자 이내",
+  "positioning_concept": "타겟 고객에게 전달할 핵심 차별화 메시지 1문장",
+  "strategy_4p": {
+    "product": "제품/메뉴 전략 - Product 데이터의 수치와 인사이트를 구체적으로 인용",
+    "price": "가격 책정 전략 - Price 데이터의 객단가, 결제 패턴 등 수치 포함",
+    "place": "유통/채널 전략 - Place 데이터의 배달/포장/내점 비율 등 명시",
+    "promotion": "프로모션/마케팅 전략 - Promotion 데이터의 고객 행동 패턴 반영"
+  },
+  "expected_outcome": "매출/고객수/객단가 등 정량적 목표 포함한 기대 효과",
+  "priority": "High"
+}"""
+
+STRATEGY_CARDS_JSON_FORMAT = (
+    '{\n  "strategy_cards": [\n'
+    + textwrap.indent(STRATEGY_CARD_JSON_FORMAT, "    ")
+    + '\n  ]\n}'
+)
+
+# 카드별 전략 방향 (단일 호출의 차별화 지침 / 병렬 호출의 카드별 지시에 공통 사용)
+STRATEGY_CARD_ANGLES = [
+    {"title": "공격적 성장 전략", "focus": "시장 확대, 신규 고객 유치", "priority": "High"},
+    {"title": "고객 경험 최적화 전략", "focus": "충성도 향상, 재방문율 증대", "priority": "Medium"},
+    {"title": "수익성 개선 전략", "focus": "객단가 상승, 비용 효율화", "priority": "Medium"},
+]
+
+# 전략 카드 파싱 결과 통계 (프로세스 단위)
+STRATEGY_PARSE_STATS: Dict[str, int] = {"json": 0, "repaired": 0, "markdown": 0, "failed": 0, "timeout": 0}
+_PARSE_STATS_LOCK = threading.Lock()
+
+def _record_strategy_parse(status: str):
+    """전략 카드 파싱 결과 집계"""
+    with _PARSE_STATS_LOCK:
+        STRATEGY_PARSE_STATS[status] = STRATEGY_PARSE_STATS.get(status, 0) + 1
+
+def get_strategy_parse_stats() -> Dict[str, int]:
+    """전략 카드 파싱 통계 조회 (failed = 폴백 카드 사용 횟수)"""
+    with _PARSE_STATS_LOCK:
+        return dict(STRATEGY_PARSE_STATS)
+
+def _strip_code_fence(text: str) -> str:
+    """```json ... ``` 코드 블록 제거"""
+    text = text.strip()
+    match = re.search(r'```(?:json)?\s*(.*?)```', text, re.DOTALL)
+    return match.group(1).strip() if match else text
+
+# 문자열을 닫는 따옴표 뒤에 오는 구조 문자 (스마트 따옴표가 구조 위치인지 판별)
+_JSON_AFTER_STRING = re.compile(r'\s*([:,}\]]|$)')
+
+def _repair_json_text(text: str) -> str:
+    """
+    거의 유효한 JSON 로컬 보정 (LLM 재호출 없이)
+
+    - 앞뒤 설명문 제거 (첫 '{' 또는 '['부터)
+    - 구조 위치의 스마트 따옴표(“키”: “값”) → 일반 따옴표
+      (일반 따옴표 문자열 안의 “인용”은 내용이므로 그대로 둠)
+    - 후행 쉼표 제거
+    - 출력이 잘린 경우 열린 문자열/괄호 닫기
+    """
+    text = _strip_code_fence(text)
+    starts = [i for i in (text.find('{'), text.find('[')) if i >= 0]
+    if starts:
+        text = text[min(starts):]
+
+    out = []
+    stack = []
+    in_string = False
+    smart = False  # 스마트 따옴표로 열린 문자열
+    escape = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"' or (smart and ch in '“”'):
+                if not smart or _JSON_AFTER_STRING.match(text, i + 1):
+                    in_string = False
+                    ch = '"'
+                elif ch == '"':
+                    ch = '\\"'  # 스마트 따옴표 문자열 안의 일반 따옴표는 내용
+            out.append(ch)
+            continue
+        if ch == '"' or ch in '“”':
+            in_string, smart, ch = True, ch != '"', '"'
+        elif ch in '{[':
+            stack.append('}' if ch == '{' else ']')
+        elif ch in '}]':
+            if stack:
+                stack.pop()
+            if not stack:
+                out.append(ch)
+                break
+        out.append(ch)
+
+    text = ''.join(out)
+    if in_string:
+        text += '"'
+    text = re.sub(r',\s*$', '', text.rstrip())
+    text += ''.join(reversed(stack))
+    return re.sub(r',\s*([}\]])', r'\1', text)
+
+def _cards_from_json_data(data: Any, base_evidence: List[str]) -> List[StrategyCard]:
+    """JSON 데이터 → StrategyCard 리스트 (스키마 검증)"""
+    if isinstance(data, dict) and 'strategy_cards' not in data and 'title' in data:
+        items = [data]  # 카드 1장 단독 응답 (병렬 생성 모드)
+    else:
+        items = data.get('strategy_cards', []) if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return []
+
+    cards = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        try:
+            item = dict(item)
+            item['strategy_4p'] = {
+                str(k).lower(): str(v) for k, v in (item.get('strategy_4p') or {}).items()
+            }
+            if isinstance(item.get('priority'), str):
+                item['priority'] = item['priority'].strip().capitalize()
+            draft = StrategyCardDraft(**item)
+        except Exception as e:
+            print(f"   ⚠️  카드 {len(cards) + 1} 스키마 검증 실패: {e}")
+            continue
+
+        cards.append(StrategyCard(
+            card_id=len(cards) + 1,
+            title=draft.title,
+            positioning_concept=draft.positioning_concept,
+            strategy_4p={
+                "product": draft.strategy_4p.get('product', "제품 전략"),
+                "price": draft.strategy_4p.get('price', "가격 전략"),
+                "place": draft.strategy_4p.get('place', "유통 전략"),
+                "promotion": draft.strategy_4p.get('promotion', "프로모션 전략")
+            },
+            expected_outcome=draft.expected_outcome,
+            priority=draft.priority,
+            data_evidence=base_evidence
+        ))
+
+    return cards
+
+def _parse_strategy_cards_json(content: str, base_evidence: List[str]) -> tuple:
+    """
+    LLM JSON 응답에서 전략 카드 파싱
+
+    Returns:
+        (cards, status) - status: "json" | "repaired" | "failed"
+    """
+    try:
+        cards = _cards_from_json_data(json.loads(_strip_code_fence(content)), base_evidence)
+        if cards:
+            return cards, "json"
+    except json.JSONDecodeError:
+        pass
+
+    try:
+        cards = _cards_from_json_data(json.loads(_repair_json_text(content)), base_evidence)
+        if cards:
+            return cards, "repaired"
+    except json.JSONDecodeError as e:
+        print(f"   ⚠️  JSON 보정 실패: {e}")
+
+    return [], "failed"
+
+# 병렬 모드 파싱 상태 우선순위 (가장 나쁜 상태를 대표값으로)
+_PARSE_STATUS_RANK = {"json": 0, "repaired": 1, "markdown": 2, "failed": 3, "timeout": 4}
+
+def _generate_cards_parallel(llm, context_section: str, principles: str, evidence: List[str]) -> tuple:
+    """
+    🔥 카드별 병렬 생성 - 공유 컨텍스트 + 카드별 포지셔닝 방향으로 동시 호출
+
+    Returns:
+        (cards, status, raw_output) - 파싱 실패한 슬롯은 None
+    """
+    def generate_one(index: int, angle: Dict[str, str]):
+        prompt = f"""
+당신은 마케팅 전략가입니다. 다음 **실제 가맹점 데이터**와 STP 분석 결과를 바탕으로 **전략 카드 1개**를 생성하세요.
+{context_section}
+# 📝 작성 지침
+
+## 이 카드의 전략 방향 (필수)
+**{angle['title']}** - {angle['focus']}
+다른 전략 방향의 카드는 별도로 작성되므로, 위 방향에만 집중하세요.
+
+## 출력 형식 (반드시 준수)
+
+아래 JSON 스키마를 따르는 **JSON 객체 1개만** 출력하세요. 마크다운, 코드 블록, 설명 문장은 출력하지 마세요.
+priority는 "{angle['priority']}"로 지정하세요.
+
+{STRATEGY_CARD_JSON_FORMAT}
+
+## 작성 원칙
+
+{principles}"""
+        response = invoke_with_budget(llm, prompt, f"strategy_4p_agent.card_{index}.llm", node="strategy_4p_agent")
+        content = response.content.strip()
+        with span("strategy_4p_agent.parse", cat="parse") as attrs:
+            cards, status = _parse_strategy_cards_json(content, evidence)
+            if not cards:
+                cards = _parse_strategy_cards_from_llm(content, evidence)
+                status = "markdown" if cards else "failed"
+            attrs["status"] = status
+        _record_strategy_parse(status)
+        if not cards:
+            return None, status, content
+        card = cards[0].model_copy(update={"card_id": index, "priority": angle["priority"]})
+        emit_event("card_done", data=card, index=index)  # 🔥 카드 완료 즉시 스트리밍
+        return card, status, content
+
+    with ThreadPoolExecutor(max_workers=len(STRATEGY_CARD_ANGLES)) as executor:
+        futures = [
+            executor.submit(contextvars.copy_context().run, generate_one, i, angle)
+            for i, angle in enumerate(STRATEGY_CARD_ANGLES, 1)
+        ]
+        results = []
+        for i, future in enumerate(futures, 1):
+            try:
+                results.append(future.result())
+            except DeadlineExceeded as e:
+                print(f"   ⏱️  카드 {i} 시간 초과: {e}")
+                mark_degraded("strategy_4p_agent", str(e))
+                _record_strategy_parse("timeout")
+                results.append((None, "timeout", ""))
+            except Exception as e:
+                print(f"   ⚠️  카드 {i} 생성 실패: {e}")
+                _record_strategy_parse("failed")
+                results.append((None, "failed", ""))
+
+    cards = [card for card, _, _ in results]
+
+    status = max((r[1] for r in results), key=lambda x: _PARSE_STATUS_RANK[x])
+    raw_output = "\n\n".join(r[2] for r in results)
+    return cards, status, raw_output
+
 def _generate_fallback_cards(stp: STPOutput, data_4p_summary: Dict, evidence: List[str]) -> List[StrategyCard]:
     """파싱 실패 시 폴백 전략 카드 생성"""
     cards = []
@@ -869,6 +1168,197 @@ def _generate_fallback_cards(stp: STPOutput, data_4p_summary: Dict, evidence: Li
 
     return cards
 
+# ============================================================================
+# Cluster Template Mode (군집 골격 캐시 + 가맹점 개인화)
+# ============================================================================
+
+def _build_cluster_skeleton(llm, industry: str, cluster_name: str, cluster: Optional[ClusterProfile],
+                            pc_axis: Dict[str, PCAxisInterpretation]) -> Optional[List[Dict[str, Any]]]:
+    """
+    업종·군집 공통 전략 카드 골격 3장 생성 (가맹점 수치 없이 군집 특성 + PC축만 사용)
+
+    Returns:
+        StrategyCardDraft 형태의 dict 리스트 (파싱 실패 시 None → 캐시하지 않음)
+    """
+    pc_lines = "\n".join(
+        f"- {axis}: {info.interpretation}\n  주요 요인: "
+        + ", ".join(f"{f['속성']}({f['가중치']})" for f in info.top_features)
+        for axis, info in pc_axis.items()
+    )
+    cluster_lines = f"- 군집: {cluster_name}"
+    if cluster:
+        cluster_lines += f""" (가맹점 {cluster.store_count}개)
+- 군집 특성: {cluster.characteristics}
+- 군집 중심: PC1={cluster.pc1_mean:.2f}, PC2={cluster.pc2_mean:.2f}"""
+    angles_text = "\n".join(
+        f"- 카드 {i}: {angle['title']} ({angle['focus']})"
+        for i, angle in enumerate(STRATEGY_CARD_ANGLES, 1)
+    )
+
+    prompt = f"""
+당신은 마케팅 전략가입니다. 아래 **업종·군집 공통 특성**을 바탕으로, 이 군집에 속한 가맹점들이 공통으로 활용할 **전략 카드 골격 3개**를 생성하세요.
+
+# 군집 정보
+- 업종: {industry}
+{cluster_lines}
+
+# 포지셔닝 축 분석
+{pc_lines}
+
+---
+# 📝 작성 지침
+
+## 전략 차별화 (필수)
+{angles_text}
+
+## 작성 원칙
+- 가맹점별 수치는 이후 개인화 단계에서 채워지므로, strategy_4p에는 군집 특성과 PC축 요인에 근거한 **구체적 실행 방향**을 작성하세요
+- 추상적 표현 금지 ("브랜드 강화" 등), 예상 효과에는 정량 목표 포함
+- 카드 1의 priority는 "High", 카드 2·3은 "Medium"
+
+## 출력 형식 (반드시 준수)
+
+아래 JSON 스키마를 따르는 **JSON 객체만** 출력하세요. 마크다운, 코드 블록, 설명 문장은 출력하지 마세요.
+
+{STRATEGY_CARDS_JSON_FORMAT}"""
+
+    response = invoke_with_budget(llm, prompt, "strategy_4p_agent.skeleton.llm", node="strategy_4p_agent")
+    with span("strategy_4p_agent.skeleton_parse", cat="parse") as attrs:
+        cards, status = _parse_strategy_cards_json(response.content.strip(), [])
+        attrs["status"] = status
+    if not cards:
+        print(f"   ⚠️  [{industry}/{cluster_name}] 골격 파싱 실패 - 캐시하지 않음")
+        return None
+    return [card.model_dump(exclude={"card_id", "data_evidence"}) for card in cards[:len(STRATEGY_CARD_ANGLES)]]
+
+def _generate_cards_from_template(llm, stp: STPOutput, data_version: str, data_4p_summary: Dict,
+                                  data_4p_json: str, evidence: List[str]) -> tuple:
+    """
+    🔥 군집 골격(캐시) + 가맹점 델타로 짧은 개인화 호출 1회
+
+    - 골격 캐시 미스 시 이 요청에서 골격 생성 후 저장 (동시 요청은 1회 생성으로 합침)
+    - 골격 대기와 개인화 호출은 strategy_4p_agent 노드 예산을 함께 씀 (Deadline 노드별 사용 시간)
+      예산을 넘겨도 골격 생성은 요청 deadline과 분리되어 끝까지 실행 → 캐시되어 다음 요청이 사용
+      합류한 요청은 각자의 예산만큼 기다림 (선행 요청의 시간 초과를 받지 않음)
+    - 개인화 실패/시간 초과 시 골격 카드를 그대로 사용
+
+    Returns:
+        (cards, status, raw_output) - 골격도 없으면 cards는 빈 리스트 (호출 측 폴백 카드)
+    """
+    pos = stp.store_current_position
+    cluster = next((c for c in stp.cluster_profiles if c.cluster_id == pos.cluster_id), None)
+    key = template_key(pos.industry, pos.cluster_id, data_version)
+
+    def build_skeleton():
+        with use_deadline(None):
+            return _build_cluster_skeleton(llm, pos.industry, pos.cluster_name, cluster, stp.pc_axis_interpretation)
+
+    try:
+        skeleton, hit = call_with_budget(
+            lambda: get_template_cache().get_or_build(
+                key, build_skeleton, industry=pos.industry, cluster_id=pos.cluster_id, cluster_name=pos.cluster_name,
+            ),
+            "strategy_4p_agent", what="골격 생성",
+        )
+    except DeadlineExceeded as e:
+        print(f"   ⏱️  골격 생성 {e}")
+        mark_degraded("strategy_4p_agent", str(e))
+        return [], "timeout", ""
+    except Exception as e:
+        print(f"   ⚠️  골격 생성 실패: {e}")
+        return [], "failed", ""
+
+    annotate(template_cache_hit=hit, template_key=key)
+    if not skeleton:
+        return [], "failed", ""
+    print(f"   🧩 군집 골격 {'캐시 사용' if hit else '생성'}: {pos.industry} / {pos.cluster_name}")
+
+    skeleton_cards, _ = _parse_strategy_cards_json(json.dumps({"strategy_cards": skeleton}, ensure_ascii=False), evidence)
+
+    # 가맹점 델타: 군집 중심 대비 위치 + 4P 요약
+    delta_line = ""
+    if cluster:
+        delta_line = f"\n- 군집 중심 대비: PC1 {pos.pc1_score - cluster.pc1_mean:+.2f}, PC2 {pos.pc2_score - cluster.pc2_mean:+.2f}"
+    context = fit_sections("strategy_4p_agent", [
+        PromptSection(name="store", priority=0, required=True, text=f"""# 가맹점 정보
+- 이름: {pos.store_name} (근접 경쟁자 {len(stp.nearby_competitors)}개)
+- 현재 위치: PC1={pos.pc1_score:.2f}, PC2={pos.pc2_score:.2f}{delta_line}"""),
+        PromptSection(
+            name="data_4p", priority=1,
+            text=f"# 가맹점 4P 데이터\n{collapse_4p_summary(data_4p_summary)}",
+            original_tokens=estimate_tokens(data_4p_json),
+        ),
+    ], budget=PERSONALIZE_CONTEXT_BUDGET)
+
+    prompt = f"""
+당신은 마케팅 전략가입니다. 아래 **군집 공통 전략 카드 골격**을 이 가맹점의 데이터에 맞게 개인화하세요.
+
+{context}
+
+# 군집 공통 카드 골격
+{json.dumps({"strategy_cards": skeleton}, ensure_ascii=False, separators=(",", ":"))}
+
+# 📝 작성 지침
+- 카드 순서, 전략 방향, priority는 유지
+- strategy_4p 4개 항목과 expected_outcome에 위 가맹점 데이터의 수치를 구체적으로 인용
+- 골격과 같은 구조의 **JSON 객체만** 출력 (마크다운, 코드 블록, 설명 금지)"""
+    annotate(personalize_prompt_tokens=estimate_tokens(prompt))
+
+    try:
+        response = invoke_with_budget(llm, prompt, "strategy_4p_agent.personalize.llm", node="strategy_4p_agent")
+        content = response.content.strip()
+    except DeadlineExceeded as e:
+        print(f"   ⏱️  개인화 {e} - 군집 골격 카드 사용")
+        mark_degraded("strategy_4p_agent", str(e))
+        return skeleton_cards, "timeout", ""
+
+    with span("strategy_4p_agent.parse", cat="parse") as attrs:
+        cards, status = _parse_strategy_cards_json(content, evidence)
+        attrs["status"] = status
+    if not cards:
+        print("   ⚠️  개인화 응답 파싱 실패 - 군집 골격 카드 사용")
+        return skeleton_cards, "failed", content
+
+    # 개인화 응답이 카드를 덜 돌려준 경우 남은 슬롯은 골격으로 채움
+    for card in skeleton_cards[len(cards):]:
+        cards.append(card.model_copy(update={"card_id": len(cards) + 1}))
+    return cards, status, content
+
+def prebuild_cluster_templates(industries: Optional[List[str]] = None, force: bool = False) -> Dict[str, int]:
+    """
+    🌙 야간 배치: 업종 × 군집별 전략 카드 골격 미리 생성 (LLM 쿼터는 batch 우선순위)
+
+    Returns:
+        {"built": 새로 생성, "cached": 기존 골격 사용, "failed": 생성 실패}
+    """
+    loader = PrecomputedPositioningLoader()
+    loader.load_all_data()
+    data_version = get_data_version()
+    cache = get_template_cache()
+    llm = get_chat_model(temperature=0.7, model=MODEL_NAME)
+
+    summary = {"built": 0, "cached": 0, "failed": 0}
+    targets = [
+        (industry, cluster, loader.get_pc_axis_interpretation(industry))
+        for industry in industries or sorted(loader.cluster_profiles['업종'].dropna().unique())
+        for cluster in loader.get_cluster_profiles(industry)
+    ]
+    with use_llm_priority("batch"):
+        for industry, cluster, pc_axis in targets:
+            key = template_key(industry, cluster.cluster_id, data_version)
+            try:
+                cards, hit = cache.get_or_build(
+                    key,
+                    lambda: _build_cluster_skeleton(llm, industry, cluster.cluster_name, cluster, pc_axis),
+                    force=force, industry=industry, cluster_id=cluster.cluster_id, cluster_name=cluster.cluster_name,
+                )
+            except Exception as e:
+                print(f"   ⚠️  [{industry}/{cluster.cluster_name}] 골격 생성 실패: {e}")
+                cards, hit = None, False
+            summary["cached" if hit else "built" if cards else "failed"] += 1
+            print(f"   {'💾' if hit else '🧩' if cards else '❌'} {industry} / {cluster.cluster_name}")
+    return summary
+
 def strategy_4p_agent(state: StrategyPlanningState) -> StrategyPlanningState:
     """🔥 4P Strategy Agent - 실제 데이터 기반 전략 생성"""
     print("[4P Strategy] 데이터 기반 3개 전략 카드 생성 중...")
@@ -876,9 +1366,10 @@ def strategy_4p_agent(state: StrategyPlanningState) -> StrategyPlanningState:
     task_type = state['task_type']
     stp = state['stp_output']
     data_4p = state.get('data_4p_mapped', {})  # 🔥 4P 매핑 데이터
-    user_query = state.get('user_query', '')  # 🔥 사용자 요청 가져오기
+    # 기본 카드는 가맹점/데이터로만 생성 (체크포인트 재사용 대상)
+    # 사용자 요청은 personalize_strategy_cards 노드가 기본 카드 위에 반영
 
-    llm = ChatGoogleGenerativeAI(model=MODEL_NAME, temperature=0.7)
+    llm = get_chat_model(temperature=0.7, model=MODEL_NAME)
 
     # PC축 해석 정보
     pc1_info = stp.pc_axis_interpretation['PC1']
@@ -910,157 +1401,173 @@ def strategy_4p_agent(state: StrategyPlanningState) -> StrategyPlanningState:
                 data_4p_summary[p_type] = summary
 
     data_4p_json = json.dumps(data_4p_summary, ensure_ascii=False, indent=2)
+    state['data_4p_summary'] = data_4p_summary
 
-    # 🔥 사용자 요청이 있으면 추가
-    user_query_section = ""
-    print(f"[DEBUG] user_query 체크: '{user_query}' (타입: {type(user_query)})")
-    print(f"[DEBUG] 기본 쿼리: 'Analyze {stp.store_current_position.store_name}'")
-
-    if user_query and user_query.strip() and user_query != f"Analyze {stp.store_current_position.store_name}":
-        print(f"[DEBUG] ✅ user_query 프롬프트에 추가됨: '{user_query}'")
-        user_query_section = f"""
-# 사용자 요청 사항
-**"{user_query}"**
-
-위 사용자 요청을 전략 카드에 최우선으로 반영하세요.
-- 특정 타겟층 언급 시 → 해당 타겟에 집중
-- 특정 방향성 언급 시 → 해당 방향으로 전략 수립
-- 키워드 언급 시 → 전략 카드 제목 및 내용에 포함
-
----
-"""
-    else:
-        print(f"[DEBUG] ❌ user_query 미적용 (조건 불충족)")
+    # 🔥 데이터 근거 수집
+    evidence = [
+        f"PC1: {pc1_info.interpretation}",
+        f"PC2: {pc2_info.interpretation}",
+        f"근접 경쟁자: {len(stp.nearby_competitors)}개"
+    ]
 
-    prompt = f"""
-당신은 마케팅 전략가입니다. 다음 **실제 가맹점 데이터**와 STP 분석 결과를 바탕으로 **3가지 대안 전략 카드**를 생성하세요.
+    # 4P 데이터에서 주요 인사이트 추가
+    if data_4p_summary:
+        for p_type in ['Product', 'Price', 'Place', 'Promotion']:
+            if p_type in data_4p_summary and data_4p_summary[p_type].get('insights'):
+                first_insight = data_4p_summary[p_type]['insights'][0]
+                # 마지막 키 값 추출 (전략 방향 등)
+                insight_keys = [k for k in first_insight.keys() if k != 'source']
+                if insight_keys:
+                    key = insight_keys[-1]
+                    evidence.append(f"{p_type}: {first_insight[key]}")
 
-# 가맹점 정보
+    # 🔥 카드 공통 컨텍스트 (단일 호출 / 카드별 병렬 호출 공유) - 노드 토큰 예산에 맞춰 압축
+    context_body = fit_sections("strategy_4p_agent", [
+        PromptSection(name="store", priority=0, required=True, text=f"""# 가맹점 정보
 - 이름: {stp.store_current_position.store_name}
 - 업종: {stp.store_current_position.industry}
 - 타겟 군집: {stp.target_cluster_name}
-- 근접 경쟁자: {len(stp.nearby_competitors)}개
-
-# 포지셔닝 축 분석
+- 근접 경쟁자: {len(stp.nearby_competitors)}개"""),
+        PromptSection(name="axes", priority=2, text=f"""# 포지셔닝 축 분석
 - PC1: {pc1_info.interpretation}
   주요 요인: {pc1_features_str}
 
 - PC2: {pc2_info.interpretation}
-  주요 요인: {pc2_features_str}
-
-# 현재 위치
+  주요 요인: {pc2_features_str}"""),
+        PromptSection(name="position", priority=0, required=True, text=f"""# 현재 위치
 - PC1 Score: {stp.store_current_position.pc1_score:.2f}
-- PC2 Score: {stp.store_current_position.pc2_score:.2f}
-
-{user_query_section}
-
-# 🔥 가맹점 실제 운영 데이터 (4P 매핑)
-
-{data_4p_json if data_4p_json else "데이터 없음"}
-
----
-
-# 📝 작성 지침
-
-## 목표
-위에 제공된 **실제 가맹점 데이터**를 기반으로 **3가지 차별화된 전략 카드**를 작성하세요.
-각 전략 카드는 서로 다른 전략적 방향성을 가져야 하며, 데이터 기반 근거가 명확해야 합니다.
-
-## 출력 형식 (반드시 준수)
-
-**전략 카드 1: [구체적인 전략 제목 - 10자 이내]**
-- Product: [제품/메뉴 전략 - Product 데이터의 수치와 인사이트를 구체적으로 인용]
-- Price: [가격 책정 전략 - Price 데이터의 객단가, 결제 패턴 등 수치 포함]
-- Place: [유통/채널 전략 - Place 데이터의 배달/포장/내점 비율 등 명시]
-- Promotion: [프로모션/마케팅 전략 - Promotion 데이터의 고객 행동 패턴 반영]
-- 포지셔닝 컨셉: [타겟 고객에게 전달할 핵심 차별화 메시지 1문장]
-- 예상 효과: [매출/고객수/객단가 등 정량적 목표 포함한 기대 효과]
-- 우선순위: High
-
-**전략 카드 2: [구체적인 전략 제목 - 10자 이내]**
-- Product: [첫 번째 카드와 다른 관점의 제품 전략]
-- Price: [다른 가격 전략 접근법]
-- Place: [다른 채널 최적화 방향]
-- Promotion: [다른 타겟/메시지 전략]
-- 포지셔닝 컨셉: [차별화된 포지셔닝 메시지]
-- 예상 효과: [정량적 목표 포함]
-- 우선순위: Medium
-
-**전략 카드 3: [구체적인 전략 제목 - 10자 이내]**
-- Product: [세 번째 차별화 관점]
-- Price: [또 다른 가격 전략]
-- Place: [세 번째 채널 전략]
-- Promotion: [세 번째 프로모션 방향]
-- 포지셔닝 컨셉: [세 번째 포지셔닝]
-- 예상 효과: [정량적 목표]
-- 우선순위: Medium
-
-## 작성 원칙
-
-### 1. 데이터 기반 작성 (필수)
+- PC2 Score: {stp.store_current_position.pc2_score:.2f}"""),
+        PromptSection(
+            name="data_4p", priority=1,
+            text=f"# 🔥 가맹점 실제 운영 데이터 (4P 매핑)\n\n{collapse_4p_summary(data_4p_summary)}",
+            original_tokens=estimate_tokens(data_4p_json),
+        ),
+    ])
+    context_section = f"\n{context_body}\n\n---\n"
+
+    common_principles = f"""### 1. 데이터 기반 작성 (필수)
 - 각 4P 항목마다 위에 제공된 실제 데이터의 **수치를 구체적으로 인용**하세요
 - 좋은 예시: "배달 매출 비중 65%, 포장 20%, 내점 15%이므로 배달 전용 메뉴 3종 신규 개발"
 - 나쁜 예시: "배달 매출이 높으므로 배달 메뉴 개발" (수치 누락)
 
-### 2. 전략 차별화 (필수)
-- 카드 1: 공격적 성장 전략 (시장 확대, 신규 고객 유치)
-- 카드 2: 고객 경험 최적화 전략 (충성도 향상, 재방문율 증대)
-- 카드 3: 수익성 개선 전략 (객단가 상승, 비용 효율화)
-
-### 3. 포지셔닝 축 반영 (필수)
+### 2. 포지셔닝 축 반영 (필수)
 - PC1 점수({stp.store_current_position.pc1_score:.2f})와 PC2 점수({stp.store_current_position.pc2_score:.2f})의 의미를 전략에 반영
 - 타겟 군집({stp.target_cluster_name})의 특성을 고려
 - 근접 경쟁자({len(stp.nearby_competitors)}개)와의 차별화 방안 명시
 
-### 4. 실행 가능성 (필수)
+### 3. 실행 가능성 (필수)
 - 추상적 표현 금지 ("브랜드 강화", "고객 만족도 향상" 등)
 - 구체적 액션 명시 ("신메뉴 3종 출시", "객단가 15% 인상", "배달앱 프로모션 월 2회" 등)
 
-### 5. 정량적 목표 (필수)
+### 4. 정량적 목표 (필수)
 - 예상 효과에는 반드시 숫자 포함 ("매출 20% 증가", "재방문율 15%p 향상" 등)
 
 ---
 
 **⚠️ 주의사항:**
-- 위 형식을 정확히 따르지 않으면 파싱 오류가 발생합니다
-- 각 항목은 반드시 "- Product:", "- Price:" 등으로 시작해야 합니다
-- 우선순위는 반드시 "High", "Medium", "Low" 중 하나여야 합니다
+- 유효한 JSON이 아니면 파싱 오류가 발생합니다 (후행 쉼표, 주석 금지)
+- strategy_4p의 키는 반드시 "product", "price", "place", "promotion"이어야 합니다
+- priority는 반드시 "High", "Medium", "Low" 중 하나여야 합니다
 - 데이터가 없는 경우에도 PC축 해석과 경쟁자 정보를 활용하여 전략을 작성하세요
 """
 
-    response = llm.invoke(prompt)
-    content = response.content.strip()
+    if state.get('strategy_generation_mode') == "parallel":
+        # 🔥 카드별 병렬 생성: 공유 컨텍스트 + 카드별 포지셔닝 방향
+        print(f"   ⚡ 카드별 병렬 생성 ({len(STRATEGY_CARD_ANGLES)}개 동시 호출)")
+        strategy_cards, parse_status, content = _generate_cards_parallel(
+            llm, context_section, common_principles, evidence
+        )
+        state['llm_raw_strategy_output'] = content
+
+        # 실패한 카드 슬롯만 폴백 카드로 대체
+        if any(card is None for card in strategy_cards):
+            print(f"   ⚠️  {sum(card is None for card in strategy_cards)}개 카드 파싱 실패 - 해당 슬롯 폴백 카드 사용")
+            fallback = _generate_fallback_cards(stp, data_4p_summary, evidence)
+            for i, card in enumerate(strategy_cards):
+                if card is None:
+                    strategy_cards[i] = fallback[i]
+                    emit_event("card_done", data=fallback[i], index=i + 1)
+    elif state.get('strategy_generation_mode') == "template":
+        # 🔥 군집 골격(캐시) + 가맹점 델타 개인화 호출 1회
+        strategy_cards, parse_status, content = _generate_cards_from_template(
+            llm, stp, state.get('data_version') or get_data_version(),
+            data_4p_summary, data_4p_json, evidence
+        )
+        state['llm_raw_strategy_output'] = content
+        _record_strategy_parse(parse_status)
 
-    # 🔥 LLM 응답 저장 (디버깅용)
-    state['llm_raw_strategy_output'] = content
+        # 골격도 없으면 폴백 카드
+        if not strategy_cards:
+            strategy_cards = _generate_fallback_cards(stp, data_4p_summary, evidence)
 
-    # 🔥 데이터 근거 수집
-    evidence = [
-        f"PC1: {pc1_info.interpretation}",
-        f"PC2: {pc2_info.interpretation}",
-        f"근접 경쟁자: {len(stp.nearby_competitors)}개"
-    ]
+        for i, card in enumerate(strategy_cards, 1):
+            emit_event("card_done", data=card, index=i)
+    else:
+        angles_text = "\n".join(
+            f"- 카드 {i}: {angle['title']} ({angle['focus']})"
+            for i, angle in enumerate(STRATEGY_CARD_ANGLES, 1)
+        )
+        prompt = f"""
+당신은 마케팅 전략가입니다. 다음 **실제 가맹점 데이터**와 STP 분석 결과를 바탕으로 **3가지 대안 전략 카드**를 생성하세요.
+{context_section}
+# 📝 작성 지침
 
-    # 4P 데이터에서 주요 인사이트 추가
-    if data_4p_summary:
-        for p_type in ['Product', 'Price', 'Place', 'Promotion']:
-            if p_type in data_4p_summary and data_4p_summary[p_type].get('insights'):
-                first_insight = data_4p_summary[p_type]['insights'][0]
-                # 마지막 키 값 추출 (전략 방향 등)
-                insight_keys = [k for k in first_insight.keys() if k != 'source']
-                if insight_keys:
-                    key = insight_keys[-1]
-                    evidence.append(f"{p_type}: {first_insight[key]}")
+## 목표
+위에 제공된 **실제 가맹점 데이터**를 기반으로 **3가지 차별화된 전략 카드**를 작성하세요.
+각 전략 카드는 서로 다른 전략적 방향성을 가져야 하며, 데이터 기반 근거가 명확해야 합니다.
 
-    # 🔥 LLM 응답 파싱
-    strategy_cards = _parse_strategy_cards_from_llm(content, evidence)
+## 출력 형식 (반드시 준수)
+
+아래 JSON 스키마를 따르는 **JSON 객체만** 출력하세요. 마크다운, 코드 블록, 설명 문장은 출력하지 마세요.
+`strategy_cards` 배열에는 정확히 3개의 카드를 담고, 카드 1의 priority는 "High", 카드 2·3은 "Medium"으로 지정하세요.
+
+{STRATEGY_CARDS_JSON_FORMAT}
+
+## 작성 원칙
+
+### 전략 차별화 (필수)
+{angles_text}
+
+{common_principles}"""
+
+        try:
+            response = invoke_with_budget(llm, prompt, "strategy_4p_agent.llm", node="strategy_4p_agent")
+            content = response.content.strip()
+        except DeadlineExceeded as e:
+            # ⏱️ 예산 초과 → 결정적 폴백 카드
+            print(f"   ⏱️  {e} - 폴백 전략 생성")
+            mark_degraded("strategy_4p_agent", str(e))
+            content = None
+
+        # 🔥 LLM 응답 저장 (디버깅용)
+        state['llm_raw_strategy_output'] = content or ""
+
+        if content is None:
+            strategy_cards, parse_status = [], "timeout"
+        else:
+            # 🔥 LLM 응답 파싱 (JSON → 로컬 보정 → 마크다운 호환 파서 순)
+            with span("strategy_4p_agent.parse", cat="parse") as attrs:
+                strategy_cards, parse_status = _parse_strategy_cards_json(content, evidence)
+                if not strategy_cards:
+                    strategy_cards = _parse_strategy_cards_from_llm(content, evidence)
+                    if strategy_cards:
+                        parse_status = "markdown"
+                attrs["status"] = parse_status
+
+        _record_strategy_parse(parse_status)
+
+        # 파싱 실패 시 폴백 전략 생성
+        if not strategy_cards:
+            if parse_status == "failed":
+                print(f"   ⚠️  LLM 응답 파싱 실패 - 폴백 전략 생성 (누적 실패: {get_strategy_parse_stats()['failed']}회)")
+            strategy_cards = _generate_fallback_cards(stp, data_4p_summary, evidence)
 
-    # 파싱 실패 시 폴백 전략 생성
-    if not strategy_cards:
-        print("   ⚠️  LLM 응답 파싱 실패 - 폴백 전략 생성")
-        strategy_cards = _generate_fallback_cards(stp, data_4p_summary, evidence)
-    else:
-        print(f"   ✓ {len(strategy_cards)}개 전략 카드 생성 완료")
+        for i, card in enumerate(strategy_cards, 1):
+            emit_event("card_done", data=card, index=i)
+
+    state['strategy_parse_status'] = parse_status
+    if parse_status not in ("failed", "timeout"):
+        print(f"   ✓ {len(strategy_cards)}개 전략 카드 생성 완료 (파싱: {parse_status})")
         for i, card in enumerate(strategy_cards, 1):
             print(f"      {i}. {card.title} (우선순위: {card.priority})")
 
@@ -1071,27 +1578,161 @@ def strategy_4p_agent(state: StrategyPlanningState) -> StrategyPlanningState:
     state['next'] = END
     return state
 
+def personalize_strategy_cards_node(state: SupervisorState) -> Dict:
+    """
+    🔥 기본 전략 카드(체크포인트 재사용) 위에 사용자 요청 반영 - 짧은 LLM 호출 1회
+
+    기본 카드는 가맹점/데이터로만 생성되므로 같은 가맹점의 후속 질문은 이 노드만 다시 실행됩니다.
+    사용자 요청이 없거나 호출/파싱에 실패하면 기본 카드를 그대로 사용합니다.
+    """
+    base_cards = state.get('base_strategy_cards') or state['strategy_cards']
+    has_user_query = _has_user_query(state)
+    annotate(user_query_applied=has_user_query)
+
+    cards = list(base_cards)
+    if has_user_query:
+        print(f"[Personalize] 사용자 요청 반영: '{state['user_query']}'")
+        user_query_section = f"""
+# 사용자 요청 사항
+**"{state['user_query']}"**
+
+위 사용자 요청을 전략 카드에 최우선으로 반영하세요.
+- 특정 타겟층 언급 시 → 해당 타겟에 집중
+- 특정 방향성 언급 시 → 해당 방향으로 전략 수립
+- 키워드 언급 시 → 전략 카드 제목 및 내용에 포함
+
+---
+"""
+        base_json = json.dumps(
+            {"strategy_cards": [card.model_dump(exclude={"card_id", "data_evidence"}) for card in base_cards]},
+            ensure_ascii=False, separators=(",", ":")
+        )
+        prompt = f"""
+당신은 마케팅 전략가입니다. '{state['target_store_name']}'의 기존 전략 카드 {len(base_cards)}개를 사용자 요청에 맞게 다듬으세요.
+{user_query_section}
+# 기존 전략 카드 (가맹점 데이터 기반)
+{base_json}
+
+# 📝 작성 지침
+- 카드 수, 순서, priority는 유지
+- 기존 카드의 데이터 수치와 근거는 유지하고, 사용자 요청을 제목과 4P 내용에 반영
+- 기존 카드와 같은 구조의 **JSON 객체만** 출력 (마크다운, 코드 블록, 설명 금지)"""
+        annotate(personalize_prompt_tokens=estimate_tokens(prompt))
+
+        llm = get_chat_model(temperature=0.7, model=MODEL_NAME)
+        try:
+            response = invoke_with_budget(llm, prompt, "personalize_strategy_cards.llm", node="personalize_strategy_cards")
+            parsed, parse_status = _parse_strategy_cards_json(response.content.strip(), base_cards[0].data_evidence)
+        except DeadlineExceeded as e:
+            # ⏱️ 예산 초과 → 기본 카드 사용
+            print(f"   ⏱️  {e} - 기본 카드 사용")
+            mark_degraded("personalize_strategy_cards", str(e))
+            parsed, parse_status = [], "timeout"
+
+        if parsed:
+            # 누락된 슬롯은 기본 카드로 채움
+            cards = parsed[:len(base_cards)] + cards[len(parsed):]
+            print(f"   ✓ 사용자 요청 반영 완료 (파싱: {parse_status})")
+        else:
+            print(f"   ⚠️  사용자 요청 반영 실패 ({parse_status}) - 기본 카드 사용")
+
+        for i, card in enumerate(cards, 1):
+            emit_event("card_done", data=card, index=i)
+
+    return {
+        "strategy_cards": cards,
+        "selected_strategy": cards[0],
+        "phase_keys": _completed_phase_keys(state, "query"),
+    }
+
 # ============================================================================
 # 6. Supervisor
 # ============================================================================
 
+DATA_VERSION_FILES = [
+    "pca_components_by_industry.csv",
+    "kmeans_clusters_by_industry.csv",
+    "store_segmentation_final_re.csv",
+    "df_final.csv",
+]
+
+def get_data_version(data_dir: str = DATA_DIR) -> str:
+    """STP/4P 입력 데이터 버전 (파일 크기 + 수정시각 해시)"""
+    h = hashlib.sha1()
+    for name in DATA_VERSION_FILES:
+        path = Path(data_dir) / name
+        if path.exists():
+            stat = path.stat()
+            h.update(f"{name}:{stat.st_size}:{int(stat.st_mtime)}".encode())
+    return h.hexdigest()[:12]
+
+# phase별 산출물을 만드는 노드 (이 노드가 폴백(degraded)이면 산출물을 재사용 대상으로 기록하지 않음)
+PHASE_NODES = {
+    "stp": ("segmentation_agent", "targeting_agent", "positioning_agent"),
+    "strategy": ("stp_validation_agent", "strategy_4p_agent"),
+    "query": ("personalize_strategy_cards",),
+}
+DEGRADED_PHASE_SUFFIX = "|degraded"
+
+def _phase_key(state: SupervisorState, phase: str) -> str:
+    """phase 산출물이 의존하는 입력 키 (가맹점 + 데이터 버전 [+ 카드 생성 모드 [+ 사용자 요청]])"""
+    stp_key = f"{state['target_store_id']}|{state.get('data_version') or ''}"
+    if phase == "stp":
+        return stp_key
+    strategy_key = f"{stp_key}|{state.get('strategy_generation_mode') or 'single'}"
+    if phase == "strategy":
+        return strategy_key
+    query = state['user_query'].strip() if _has_user_query(state) else ''
+    query_hash = hashlib.sha1(query.encode('utf-8')).hexdigest()[:12]
+    return f"{strategy_key}|{query_hash}"
+
+def _phase_degraded(phase: str) -> bool:
+    """이번 요청에서 phase 노드가 시간 제한 폴백을 사용했는지"""
+    deadline = get_deadline()
+    return bool(deadline and any(d["node"] in PHASE_NODES[phase] for d in deadline.degraded))
+
+def _phase_is_current(state: SupervisorState, phase: str) -> bool:
+    recorded = (state.get('phase_keys') or {}).get(phase)
+    key = _phase_key(state, phase)
+    # 폴백 산출물은 만든 요청 안에서만 유효 (다음 요청은 다시 생성)
+    return recorded == key or (recorded == f"{key}{DEGRADED_PHASE_SUFFIX}" and _phase_degraded(phase))
+
+def _completed_phase_keys(state: SupervisorState, phase: str) -> Dict[str, str]:
+    """
+    phase 완료 후 phase_keys
+
+    시간 제한 폴백 산출물은 유효한 키 대신 폴백 표시 키로 기록 → 체크포인트를 재사용하는
+    이후 실행(제한 없음/다른 생성 모드 포함)은 폴백 카드를 재사용하지 않고 다시 생성합니다.
+    """
+    key = _phase_key(state, phase)
+    if _phase_degraded(phase):
+        print(f"[Supervisor] {phase} 산출물은 폴백이므로 체크포인트 재사용 대상에서 제외")
+        key += DEGRADED_PHASE_SUFFIX
+    return {**(state.get('phase_keys') or {}), phase: key}
+
 def top_supervisor_node(state: SupervisorState) -> SupervisorState:
-    """Top Supervisor - 작업 유형별 라우팅"""
+    """Top Supervisor - 작업 유형별 라우팅 (체크포인트에 동일 입력 산출물이 있으면 재사용)"""
     task_type = state['task_type']
     print(f"\n[Supervisor] 작업 유형: {task_type}")
 
     # 1단계: Market Analysis Team (모든 경우 필수)
-    if not state.get('stp_output'):
+    if not state.get('stp_output') or not _phase_is_current(state, "stp"):
         print("[Supervisor] → Market Analysis Team")
         state['next'] = "market_analysis_team"
         return state
 
     # 2단계: Strategy Planning Team (모든 경우 필수)
-    if not state.get('strategy_cards'):
+    if not state.get('base_strategy_cards') or not _phase_is_current(state, "strategy"):
         print(f"[Supervisor] → Strategy Planning Team ({task_type})")
         state['next'] = "strategy_planning_team"
         return state
 
+    # 2-1단계: 사용자 요청을 기본 카드에 반영 (같은 요청이면 재사용)
+    if not state.get('strategy_cards') or not _phase_is_current(state, "query"):
+        print("[Supervisor] → 전략 카드 사용자 요청 반영")
+        state['next'] = "personalize_strategy_cards"
+        return state
+
     # 3단계: 최종 보고서 생성 (작업 유형별 분기)
     if task_type == "종합_전략_수립":
         print("[Supervisor] → 종합 보고서 생성")
@@ -1108,52 +1749,181 @@ def top_supervisor_node(state: SupervisorState) -> SupervisorState:
 
     return state
 
-def generate_comprehensive_report_node(state: SupervisorState) -> SupervisorState:
-    """📊 종합 전략 수립 보고서"""
-    print("\n[Report] 종합 전략 보고서 생성 중...")
-
-    llm = ChatGoogleGenerativeAI(model=MODEL_NAME, temperature=0.3)
+def _render_fallback_report(state: SupervisorState) -> str:
+    """⏱️ LLM 예산 초과 시 템플릿 보고서 (STP + 선택 전략 카드 데이터만 사용)"""
     stp = state['stp_output']
     selected = state['selected_strategy']
+    pos = stp.store_current_position
+    cards = state.get('strategy_cards') or [selected]
 
-    pc1 = stp.pc_axis_interpretation['PC1']
-    pc2 = stp.pc_axis_interpretation['PC2']
+    card_lines = "\n".join(
+        f"{i}. **{card.title}** ({card.priority}) - {card.positioning_concept}"
+        for i, card in enumerate(cards, 1)
+    )
+    p4_lines = "\n".join(f"- **{k.capitalize()}**: {v}" for k, v in selected.strategy_4p.items())
 
-    prompt = f"""
-# 📊 마케팅 종합 전략 보고서
+    return f"""# 📊 {state['target_store_name']} 마케팅 전략 요약
+
+> ⏱️ 응답 시간 제한으로 데이터 기반 요약 보고서를 제공합니다.
 
 ## 1. 가맹점 개요
-- **이름**: {state['target_store_name']}
-- **업종**: {stp.store_current_position.industry}
-- **현재 위치**: PC1={stp.store_current_position.pc1_score:.2f}, PC2={stp.store_current_position.pc2_score:.2f}
+- **업종**: {pos.industry}
+- **소속 군집**: {pos.cluster_name}
+- **현재 위치**: PC1={pos.pc1_score:.2f}, PC2={pos.pc2_score:.2f}
 
 ## 2. STP 분석
-### Segmentation (시장 세분화)
-- PC1 축: {pc1.interpretation}
-- PC2 축: {pc2.interpretation}
-
-### Targeting (타겟 선정)
+- **PC1 축**: {stp.pc_axis_interpretation['PC1'].interpretation}
+- **PC2 축**: {stp.pc_axis_interpretation['PC2'].interpretation}
 - **타겟 군집**: {stp.target_cluster_name}
 - **근접 경쟁자**: {len(stp.nearby_competitors)}개
 
-### Positioning (포지셔닝)
-- **전략**: {selected.positioning_concept}
+## 3. 전략 카드
+{card_lines}
+
+## 4. 추천 전략: {selected.title}
+- **포지셔닝**: {selected.positioning_concept}
+- **예상 효과**: {selected.expected_outcome}
 
-## 3. 4P 전략
-{json.dumps(selected.strategy_4p, ensure_ascii=False, indent=2)}
+{p4_lines}
 
-## 4. 데이터 근거
+## 5. 데이터 근거
 {chr(10).join(f"- {e}" for e in selected.data_evidence)}
+"""
+
+def _has_user_query(state: SupervisorState) -> bool:
+    query = (state.get('user_query') or '').strip()
+    return bool(query) and query != f"Analyze {state['target_store_name']}"
+
+def _report_section_prompt(state: SupervisorState, title: str, context: str, guide: str) -> str:
+    """종합 보고서 섹션 1개 작성 프롬프트 (섹션별 의존 데이터만 포함)"""
+    return f"""
+당신은 마케팅 컨설턴트입니다. '{state['target_store_name']}' 마케팅 종합 전략 보고서의 **{title}** 섹션 본문을 작성하세요.
+
+{context}
 
 ---
-**보고서 작성 가이드**:
-- 경영진에게 제출할 수 있는 수준의 전문적인 보고서로 작성하세요.
-- 각 전략 카드의 구체적인 실행 방안을 포함하세요.
-- 정량적 목표와 기대 효과를 명확히 제시하세요.
+**작성 가이드**:
+- 섹션 제목은 쓰지 말고 본문만 마크다운으로 작성하세요.
+- 경영진에게 제출할 수 있는 수준의 전문적인 문체로 작성하세요.
+- {guide}
 """
 
-    response = llm.invoke(prompt)
-    state['final_report'] = response.content.strip()
+def _positioning_section_prompt(state: SupervisorState) -> str:
+    stp = state['stp_output']
+    pos = stp.store_current_position
+    cluster = next((c for c in stp.cluster_profiles if c.cluster_id == pos.cluster_id), None)
+    pc1, pc2 = stp.pc_axis_interpretation['PC1'], stp.pc_axis_interpretation['PC2']
+    return _report_section_prompt(state, "시장 포지션 해석", f"""# STP 분석 결과
+- 업종: {pos.industry}
+- PC1 축: {pc1.interpretation} / 가맹점 {pos.pc1_score:.2f}{f" (군집 평균 {cluster.pc1_mean:.2f})" if cluster else ""}
+- PC2 축: {pc2.interpretation} / 가맹점 {pos.pc2_score:.2f}{f" (군집 평균 {cluster.pc2_mean:.2f})" if cluster else ""}
+- 타겟 군집: {stp.target_cluster_name} ({cluster.characteristics if cluster else 'N/A'})
+- 근접 경쟁자: {len(stp.nearby_competitors)}개""",
+        "수치 표는 보고서에 이미 포함되어 있으므로 수치를 다시 나열하지 말고, "
+        "Segmentation / Targeting / Positioning 관점의 의미와 시사점만 4~6문장으로 서술하세요.")
+
+def _strategy_section_prompt(state: SupervisorState) -> str:
+    selected = state['selected_strategy']
+    # 🔥 가변 섹션 토큰 예산 적용 (4P는 빈 값 제거, 근거는 중복 제거 후 필요 시 절삭)
+    fitted = fit_section_texts("generate_comprehensive_report", [
+        PromptSection(name="strategy_4p", priority=0, required=True,
+                      text=chr(10).join(f"- {k}: {v}" for k, v in selected.strategy_4p.items()),
+                      original_tokens=estimate_tokens(json.dumps(selected.strategy_4p, ensure_ascii=False, indent=2))),
+        PromptSection(name="evidence", priority=2,
+                      text=chr(10).join(f"- {e}" for e in selected.data_evidence)),
+    ])
+    return _report_section_prompt(state, "추천 전략 및 4P 실행 방안", f"""# 추천 전략: {selected.title}
+- **포지셔닝**: {selected.positioning_concept}
+- **예상 효과**: {selected.expected_outcome}
+
+# 4P 전략
+{fitted["strategy_4p"]}
+
+# 데이터 근거
+{fitted["evidence"] or "- 데이터 근거 없음"}""",
+        "4P 지표 표는 보고서에 이미 포함되어 있으므로 수치 나열 대신 4P 각각의 구체적인 실행 방안과 정량적 목표를 제시하세요.")
+
+def _user_request_section_prompt(state: SupervisorState) -> str:
+    selected = state['selected_strategy']
+    return _report_section_prompt(state, "사용자 요청 대응", f"""# 사용자 요청
+**"{state['user_query']}"**
+
+# 추천 전략
+- {selected.title}: {selected.positioning_concept}""",
+        "사용자 요청에 직접 답하고, 추천 전략으로 요청을 어떻게 해결하는지 설명하세요.")
+
+def _situation_section_prompt(state: SupervisorState) -> str:
+    situation = state.get('situation_context') or {}
+    signals = "\n".join(
+        f"- **{sig.get('signal_type', 'N/A')}**: {sig.get('description', 'N/A')}"
+        for sig in (situation.get('signals') or [])[:5]
+    ) or "- 수집된 시그널 없음"
+    return _report_section_prompt(state, "현재 상황 반영", f"""# 상황 정보
+- 상권: {state.get('target_market_id') or 'N/A'}
+- 기간: {state.get('period_start') or ''} ~ {state.get('period_end') or ''}
+- 요약: {situation.get('summary', '')}
+
+# 시그널
+{signals}
+
+# 추천 전략
+- {state['selected_strategy'].title}""",
+        "시그널 표는 보고서에 이미 포함되어 있으므로, 해당 기간의 상황이 추천 전략 실행에 주는 영향과 조정 방안만 제시하세요.")
+
+def _roadmap_section_prompt(state: SupervisorState) -> str:
+    selected = state['selected_strategy']
+    return _report_section_prompt(state, "실행 로드맵 및 KPI", f"""# 추천 전략: {selected.title}
+- **포지셔닝**: {selected.positioning_concept}
+- **예상 효과**: {selected.expected_outcome}
+{chr(10).join(f"- {k}: {v}" for k, v in selected.strategy_4p.items())}""",
+        "1개월 / 3개월 / 6개월 단계별 액션과 측정 가능한 KPI를 표로 정리하세요.")
+
+# 🔥 종합 보고서 섹션 정의
+# - render: STP/4P/상황 수치를 옮기는 데이터 섹션 (로컬 템플릿, LLM 미사용)
+# - prompt: 해석·권고 서술 섹션 (deps가 바뀐 섹션만 재생성)
+COMPREHENSIVE_REPORT_SECTIONS = [
+    ReportSection("overview", "가맹점 개요", deps=("store", "stp"),
+                  render=lambda s: render_store_position(s['stp_output'], s['target_store_name'])),
+    ReportSection("clusters", "군집 현황", deps=("stp",),
+                  render=lambda s: render_cluster_stats(s['stp_output']) + "\n\n" + render_pc_factors(s['stp_output'])),
+    ReportSection("competitors", "경쟁 환경", deps=("stp",),
+                  render=lambda s: render_competitor_table(s['stp_output'])),
+    ReportSection("metrics_4p", "4P 운영 지표", deps=("data_4p",),
+                  render=lambda s: render_4p_metrics(s.get('data_4p_summary')),
+                  when=lambda s: bool(s.get('data_4p_summary'))),
+    ReportSection("positioning", "시장 포지션 해석", deps=("store", "stp"), prompt=_positioning_section_prompt),
+    ReportSection("strategy", "추천 전략 및 4P 실행 방안", deps=("store", "selected_strategy"),
+                  prompt=_strategy_section_prompt),
+    ReportSection("alternatives", "전략 카드 비교", deps=("strategy_cards",),
+                  render=lambda s: render_strategy_cards_table(s.get('strategy_cards') or [])),
+    ReportSection("user_request", "사용자 요청 대응", deps=("store", "user_query", "selected_strategy"),
+                  prompt=_user_request_section_prompt, when=_has_user_query),
+    ReportSection("signals", "상황 시그널", deps=("situation",),
+                  render=lambda s: render_situation_tables(s.get('situation_context'), s.get('target_market_id'),
+                                                           s.get('period_start'), s.get('period_end')),
+                  when=lambda s: bool(s.get('situation_context'))),
+    ReportSection("situation", "현재 상황 반영", deps=("store", "situation", "selected_strategy"),
+                  prompt=_situation_section_prompt, when=lambda s: bool(s.get('situation_context'))),
+    ReportSection("roadmap", "실행 로드맵 및 KPI", deps=("store", "selected_strategy"),
+                  prompt=_roadmap_section_prompt),
+]
+
+def generate_comprehensive_report_node(state: SupervisorState) -> SupervisorState:
+    """📊 종합 전략 수립 보고서 (섹션 단위 증분 생성)"""
+    print("\n[Report] 종합 전략 보고서 생성 중...")
+
+    llm = get_chat_model(temperature=0.3, model=MODEL_NAME)
+    header = f"# 📊 {state['target_store_name']} 마케팅 종합 전략 보고서"
+
+    try:
+        state['final_report'] = build_report(
+            "generate_comprehensive_report", header, COMPREHENSIVE_REPORT_SECTIONS, state, llm,
+            on_token=token_forwarder("generate_comprehensive_report")
+        )
+    except DeadlineExceeded as e:
+        print(f"   ⏱️  {e} - 템플릿 보고서 사용")
+        mark_degraded("generate_comprehensive_report", str(e))
+        state['final_report'] = _render_fallback_report(state)
     state['next'] = END
     return state
 
@@ -1165,6 +1935,18 @@ def generate_comprehensive_report_node(state: SupervisorState) -> SupervisorStat
 
 
 
+def _weather_facts(signals: List[Dict[str, Any]]) -> str:
+    """첫 날씨 신호의 기온/강수 수치 요약 (예: "최고기온 31.2°C, 강수확률 70%") - 없으면 "" """
+    weather = next((sig for sig in signals or [] if sig.get('signal_type') == 'weather'), None)
+    details = (weather or {}).get('details') or {}
+    facts = []
+    for key, label, unit in (("temp_mean", "평균기온", "°C"), ("tmax_overall", "최고기온", "°C"),
+                             ("tmin_overall", "최저기온", "°C"), ("pop_mean", "강수확률", "%"),
+                             ("rain_mm", "강수량", "mm")):
+        if details.get(key) is not None:
+            facts.append(f"{label} {details[key]:g}{unit}")
+    return ", ".join(facts)
+
 def generate_tactical_card_node(state: SupervisorState) -> SupervisorState:
     """ 상황 전술 카드 생성 (날씨 + 행사 정보 반영)"""
     print("\n[Tactical Card] 상황 전술 카드 생성 중...")
@@ -1179,15 +1961,12 @@ def generate_tactical_card_node(state: SupervisorState) -> SupervisorState:
             # state에서 사용자가 선택한 collect_mode 가져오기 (기본값: weather_only)
             collect_mode = state.get('collect_mode', 'weather_only')
 
-            # 🔍 디버깅: 상황 수집 파라미터 확인
-            print(f"   🔍 상황 수집 파라미터:")
-            print(f"      - market_id: {state.get('target_market_id')}")
-            print(f"      - period_start: {state.get('period_start')}")
-            print(f"      - period_end: {state.get('period_end')}")
-            print(f"      - user_query: '{user_query}'")
-            print(f"      - collect_mode: {collect_mode}")
-
-            print(f"   📊 상황 정보 수집 중...")
+            annotate(
+                market_id=state.get('target_market_id'),
+                period_start=state.get('period_start'),
+                period_end=state.get('period_end'),
+                collect_mode=collect_mode
+            )
 
             situation_info = collect_situation_info(
                 market_id=state['target_market_id'],
@@ -1197,48 +1976,42 @@ def generate_tactical_card_node(state: SupervisorState) -> SupervisorState:
                 collect_mode=collect_mode  # 사용자 선택 모드 전달
             )
 
-            # 🔍 디버깅: 상황 수집 결과 확인
-            print(f"   🔍 situation_info 상세:")
-            print(f"      - 타입: {type(situation_info)}")
             if isinstance(situation_info, dict):
-                print(f"      - 키 목록: {list(situation_info.keys())}")
-                print(f"      - 이벤트 수: {situation_info.get('event_count', 0)}")
-                print(f"      - 날씨 수: {situation_info.get('weather_count', 0)}")
-                print(f"      - has_valid_signal: {situation_info.get('has_valid_signal')}")
-                print(f"      - summary: {situation_info.get('summary', 'N/A')}")
-
-                # signals 상세 출력
-                signals = situation_info.get('signals', [])
-                print(f"      - signals 개수: {len(signals)}")
-                for i, sig in enumerate(signals[:3], 1):  # 상위 3개만
-                    print(f"        [{i}] type={sig.get('type')}, signal_type={sig.get('signal_type')}")
-                    print(f"            description={sig.get('description', 'N/A')[:80]}...")
-                    print(f"            relevance={sig.get('relevance')}, reason={sig.get('reason', 'N/A')[:60]}...")
-
-                # citations 출력
-                citations = situation_info.get('citations', [])
-                print(f"      - citations 개수: {len(citations)}")
-                for i, cite in enumerate(citations[:2], 1):  # 상위 2개만
-                    print(f"        [{i}] {cite}")
-
-                # 원본 데이터 샘플
-                print(f"      - events 원본 데이터 (키만): {list(situation_info.get('events', {}).keys())}")
-                print(f"      - weather 원본 데이터 (키만): {list(situation_info.get('weather', {}).keys())}")
+                annotate(
+                    event_count=situation_info.get('event_count', 0),
+                    weather_count=situation_info.get('weather_count', 0),
+                    failed_sources=situation_info.get('failed_sources', []),
+                    signal_count=len(situation_info.get('signals', [])),
+                    citation_count=len(situation_info.get('citations', [])),
+                    has_valid_signal=situation_info.get('has_valid_signal')
+                )
 
             print(f"   ✓ 상황 시그널: 이벤트={situation_info.get('event_count', 0)}, 날씨={situation_info.get('weather_count', 0)}")
         except Exception as e:
-            import traceback
             print(f"   ⚠️  상황 수집 실패: {e}")
-            print(f"   🔍 전체 에러 스택:")
-            print(traceback.format_exc())
+            annotate(situation_error=f"{type(e).__name__}: {e}")
             situation_info = None
     else:
-        print("[DEBUG] 상황 정보 수집 조건 불충족 - target_market_id, period_start, period_end 중 하나 이상 누락")
+        print("   ℹ️  상황 정보 수집 생략 - target_market_id, period_start, period_end 중 하나 이상 누락")
 
-    llm = ChatGoogleGenerativeAI(model=MODEL_NAME, temperature=0.7)
+    llm = get_chat_model(temperature=0.7, model=MODEL_NAME)
     stp = state['stp_output']
     selected = state['selected_strategy']
 
+    # 날씨 신호에 날씨 영향 표(업종+상권 → 상권 → 업종)의 예상 변화율/차이 부착
+    # → LLM이 영향을 추정하지 않고 수치를 그대로 사용 (가맹점 상권 우선, 없으면 입력 상권)
+    try:
+        from tools.weather_impact import attach_weather_impact
+        raw = stp.store_raw_data
+        impact_market = raw.commercial_area if raw and raw.commercial_area not in (None, "", "N/A") else None
+        situation_info = attach_weather_impact(
+            situation_info,
+            market=impact_market or state.get('target_market_id'),
+            industry=stp.store_current_position.industry,
+        )
+    except ImportError as e:
+        print(f"   ⚠️  날씨 영향 표 미사용: {e}")
+
     # 🔥 사용자 요청 분석
     user_query = state.get('user_query', '')
     has_user_query = user_query and user_query.strip() and user_query != f"Analyze {state.get('target_store_name', '')}"
@@ -1252,8 +2025,10 @@ def generate_tactical_card_node(state: SupervisorState) -> SupervisorState:
     if has_situation:
         situation_summary = situation_info['summary']
         signals_text = "\n".join([
-            f"  - **{sig.get('type', 'N/A')}**: {sig.get('description', 'N/A')}"
+            f"  - **{sig.get('signal_type', 'N/A')}**: {sig.get('description', 'N/A')}"
+            + (f"\n    - 예상 영향({impact[0]['level']} 과거 데이터): {format_expected_impact(impact)}" if impact else "")
             for sig in situation_info.get('signals', [])[:5]
+            for impact in [(sig.get('details') or {}).get('expected_impact')]
         ])
         citations_text = "\n".join([
             f"  - {cite}"
@@ -1281,6 +2056,25 @@ def generate_tactical_card_node(state: SupervisorState) -> SupervisorState:
 - **군집 매장 수**: {store_cluster.store_count if store_cluster else 'N/A'}개
 """
 
+    # 🔥 데이터 섹션은 로컬 템플릿으로 렌더링 → LLM은 전술(액션/예산/효과)만 작성
+    data_block = f"""# ⚡ 상황 전술 카드
+
+## 🏪 가맹점 현황
+{render_store_position(stp, state['target_store_name'])}
+
+## 📍 상황 시그널
+{render_situation_tables(situation_info, state.get('target_market_id'), state.get('period_start'), state.get('period_end'))}"""
+
+    # 🔥 가변 섹션 토큰 예산 적용 (중복 제거, 예산 초과 시 출처 → 시그널 순으로 절삭)
+    fitted = fit_section_texts("generate_tactical_card", [
+        PromptSection(name="store", text=store_detail, priority=0, required=True),
+        PromptSection(name="situation", text=situation_summary, priority=0, required=True),
+        PromptSection(name="signals", text=signals_text, priority=1),
+        PromptSection(name="citations", text=citations_text, priority=3),
+    ])
+    store_detail, situation_summary = fitted["store"], fitted["situation"]
+    signals_text, citations_text = fitted["signals"] or "N/A", fitted["citations"] or "N/A"
+
     # 🔥 상황별 특화 지침 (날씨/이벤트 구분)
     situation_guide = ""
 
@@ -1329,6 +2123,7 @@ def generate_tactical_card_node(state: SupervisorState) -> SupervisorState:
 - 평균 기온 → 메뉴/상품 선택
 - 강수 확률 → 실내외 운영 전략
 - 날씨 추세 → 프로모션 타이밍
+- 시그널의 예상 영향(과거 데이터 변화율) → 예상 효과 수치의 근거로 그대로 인용
 """
     else:
         situation_guide = """
@@ -1362,6 +2157,8 @@ def generate_tactical_card_node(state: SupervisorState) -> SupervisorState:
 
 ## 💡 요청사항
 
+> 가맹점 현황과 상황 시그널(날씨·이벤트) 표는 카드 상단에 이미 표시됩니다. 데이터를 다시 나열하지 말고 **아래 항목(핵심 액션, 예상 예산, 예상 효과)만** 작성하세요.
+
 **우선순위:**
 {'1. **🎯 사용자 요청 최우선 반영** - 위 사용자 요청사항을 전술의 핵심으로 삼으세요\n2. **가맹점 특성 활용** - 가맹점 정보를 구체적으로 반영\n3. **상황 시그널 참고** - ' + ('날씨 정보를 부가적으로 활용' if has_weather else '이벤트 정보를 부가적으로 활용' if has_events else '가맹점 데이터 중심') if has_user_query else '1. **가맹점 특성 활용** - 위 가맹점 정보를 구체적으로 반영\n2. **상황 시그널 반영** - ' + ('날씨 조건을 활용' if has_weather else '이벤트 정보를 활용' if has_events else '가맹점 데이터에 집중')}
 
@@ -1390,11 +2187,39 @@ def generate_tactical_card_node(state: SupervisorState) -> SupervisorState:
 - ✅ 가맹점 특성 최우선 반영
 - ✅ 업종({store_position.industry}) 특성 고려
 - ✅ 군집({store_position.cluster_name}) 특성 활용
-- {'✅ 날씨 정보(기온 ' + str(situation_info.get('signals', [{}])[0].get('details', {}).get('temp_mean', 'N/A')) + '°C, 강수확률 ' + str(situation_info.get('signals', [{}])[0].get('details', {}).get('pop_mean', 'N/A')) + '%)를 구체적으로 활용' if has_weather else '✅ 이벤트 정보를 구체적으로 활용' if has_events else '⚠️ 가맹점 데이터 중심'}
+- {'✅ 날씨 정보(' + (_weather_facts(situation_info.get('signals')) or '날씨 신호') + ')를 구체적으로 활용' if has_weather else '✅ 이벤트 정보를 구체적으로 활용' if has_events else '⚠️ 가맹점 데이터 중심'}
 """
 
-    response = llm.invoke(prompt)
-    state['tactical_card'] = response.content.strip()
+    forward = token_forwarder("generate_tactical_card")
+    if forward:
+        forward(data_block + "\n\n## 💡 실행 전술\n\n")
+
+    try:
+        response = invoke_with_budget(
+            llm, prompt, "generate_tactical_card.llm", node="generate_tactical_card", on_token=forward
+        )
+        state['tactical_card'] = f"{data_block}\n\n## 💡 실행 전술\n\n{response.content.strip()}"
+    except DeadlineExceeded as e:
+        # ⏱️ 예산 초과 → 선택 전략의 4P를 액션으로 하는 템플릿 전술 카드
+        print(f"   ⏱️  {e} - 템플릿 전술 카드 사용")
+        mark_degraded("generate_tactical_card", str(e))
+        actions = "\n".join(
+            f"{i}. **{k.capitalize()}**: {v}"
+            for i, (k, v) in enumerate(list(selected.strategy_4p.items())[:3], 1)
+        )
+        state['tactical_card'] = f"""{data_block}
+
+> ⏱️ 응답 시간 제한으로 데이터 기반 요약 전술을 제공합니다.
+
+## 🎯 기본 전략: {selected.title}
+- 포지셔닝: {selected.positioning_concept}
+
+### 핵심 액션 (Top 3)
+{actions}
+
+### 📊 예상 효과
+- {selected.expected_outcome}
+"""
     state['next'] = END
     return state
 
@@ -1503,7 +2328,7 @@ def generate_content_guide_node(state: SupervisorState) -> SupervisorState:
         print(f"   ⚠️  Content Agent 실패, 폴백 모드: {e}")
 
         # 폴백: 기본 프롬프트
-        llm = ChatGoogleGenerativeAI(model=MODEL_NAME, temperature=0.8)
+        llm = get_chat_model(temperature=0.8, model=MODEL_NAME)
         selected = state.get('selected_strategy')
 
         # 포지셔닝 추출
@@ -1569,15 +2394,37 @@ def generate_content_guide_node(state: SupervisorState) -> SupervisorState:
 3. 시각적 방향성은 구체적인 촬영 지침 포함
 """
 
-        response = llm.invoke(prompt)
+        try:
+            response = invoke_with_budget(
+                llm, prompt, "generate_content_guide.fallback_llm", node="generate_content_guide",
+                on_token=token_forwarder("generate_content_guide")
+            )
+            summary = response.content.strip()
+        except DeadlineExceeded as e:
+            print(f"   ⏱️  {e} - 템플릿 가이드 사용")
+            mark_degraded("generate_content_guide", str(e))
+            summary = f"""# 📱 SNS 콘텐츠 생성 가이드
+
+> ⏱️ 응답 시간 제한으로 기본 가이드를 제공합니다.
+
+## 가맹점: {store_name}
+## 포지셔닝: {positioning}
+## 타겟 정보: {target_info}
+
+### 인스타그램
+- 피드 + 스토리, 주 3회, 점심(12-14시)/저녁(18-20시)
+
+### 네이버 블로그
+- 후기 / 정보 제공, 주 1-2회
+"""
 
         state['content_guide'] = {
-            "summary": response.content.strip(),
+            "summary": summary,
             "mood_board": ["밝고 경쾌한", "세련된", "친근한"],
             "brand_tone": "친근하고 활기찬",
             "channels": []
         }
-        state['final_report'] = response.content.strip()
+        state['final_report'] = summary
         state['next'] = END
         return state
 
@@ -1589,9 +2436,9 @@ def create_market_analysis_team() -> StateGraph:
     """Market Analysis Team 서브그래프"""
     workflow = StateGraph(MarketAnalysisState)
 
-    workflow.add_node("segmentation_agent", segmentation_agent)
-    workflow.add_node("targeting_agent", targeting_agent)
-    workflow.add_node("positioning_agent", positioning_agent)
+    workflow.add_node("segmentation_agent", traced_node("segmentation_agent")(segmentation_agent))
+    workflow.add_node("targeting_agent", traced_node("targeting_agent")(targeting_agent))
+    workflow.add_node("positioning_agent", traced_node("positioning_agent")(positioning_agent))
 
     workflow.add_edge(START, "segmentation_agent")
     workflow.add_edge("segmentation_agent", "targeting_agent")
@@ -1604,8 +2451,8 @@ def create_strategy_planning_team() -> StateGraph:
     """Strategy Planning Team 서브그래프 (실행 계획 제거)"""
     workflow = StateGraph(StrategyPlanningState)
 
-    workflow.add_node("stp_validation_agent", stp_validation_agent)
-    workflow.add_node("strategy_4p_agent", strategy_4p_agent)
+    workflow.add_node("stp_validation_agent", traced_node("stp_validation_agent")(stp_validation_agent))
+    workflow.add_node("strategy_4p_agent", traced_node("strategy_4p_agent")(strategy_4p_agent))
 
     workflow.add_edge(START, "stp_validation_agent")
     workflow.add_edge("stp_validation_agent", "strategy_4p_agent")
@@ -1613,8 +2460,23 @@ def create_strategy_planning_team() -> StateGraph:
 
     return workflow.compile()
 
-def create_super_graph() -> StateGraph:
-    """Top-Level 그래프"""
+def _drop_unchanged_messages(fn: Callable[[SupervisorState], Any]) -> Callable[[SupervisorState], Any]:
+    """
+    노드가 입력 state를 그대로 반환할 때 messages 제거
+
+    messages는 operator.add 누적 채널이라 그대로 반환하면 단계마다 목록이 두 배가 되고,
+    체크포인트 재사용 시 실행마다 누적되어 체크포인트 파일이 급격히 커짐
+    """
+    def wrapper(s: SupervisorState):
+        update = fn(s)
+        if isinstance(update, dict) and update.get("messages") is s.get("messages"):
+            update = {k: v for k, v in update.items() if k != "messages"}
+        return update
+    wrapper.__name__ = getattr(fn, "__name__", "node")
+    return wrapper
+
+def create_super_graph(checkpointer=None) -> StateGraph:
+    """Top-Level 그래프 (checkpointer: agents.checkpoint.FileCheckpointSaver 등)"""
     workflow = StateGraph(SupervisorState)
 
     market_team = create_market_analysis_team()
@@ -1634,19 +2496,22 @@ def create_super_graph() -> StateGraph:
         print(f"[Market Team] 완료")
         return {
             "stp_output": result.get('stp_output'),
-            "store_raw_data": result.get('store_raw_data')
+            "store_raw_data": result.get('store_raw_data'),
+            "phase_keys": _completed_phase_keys(s, "stp")
         }
 
     def run_strategy_team(s: SupervisorState) -> Dict:
         strategy_input = {
             "messages": s.get("messages", []),
-            "user_query": s.get("user_query", ""),  # 🔥 user_query 전달
+            "user_query": s.get("user_query", ""),  # 기본 카드 생성에는 쓰지 않음 (personalize_strategy_cards에서 반영)
             "task_type": s["task_type"],
             "stp_output": s["stp_output"],
             "store_raw_data": s.get("store_raw_data"),
             "target_market_id": s.get("target_market_id"),
             "period_start": s.get("period_start"),
             "period_end": s.get("period_end"),
+            "strategy_generation_mode": s.get("strategy_generation_mode") or "single",
+            "data_version": s.get("data_version"),
             "current_agent": "",
             "stp_validation_result": None,
             "strategy_cards": [],
@@ -1657,19 +2522,23 @@ def create_super_graph() -> StateGraph:
         result = strategy_team.invoke(strategy_input)
         print(f"[Strategy Team] 완료 - 카드 {len(result.get('strategy_cards', []))}개")
         return {
+            "base_strategy_cards": result.get('strategy_cards', []),
             "strategy_cards": result.get('strategy_cards', []),
             "selected_strategy": result.get('selected_strategy'),
-            "execution_plan": result.get('execution_plan', '')
+            "data_4p_summary": result.get('data_4p_summary'),
+            "execution_plan": result.get('execution_plan', ''),
+            "phase_keys": _completed_phase_keys(s, "strategy")
         }
 
-    workflow.add_node("supervisor", top_supervisor_node)
-    workflow.add_node("market_analysis_team", run_market_team)
-    workflow.add_node("strategy_planning_team", run_strategy_team)
+    workflow.add_node("supervisor", traced_node("supervisor")(_drop_unchanged_messages(top_supervisor_node)))
+    workflow.add_node("market_analysis_team", traced_node("market_analysis_team")(run_market_team))
+    workflow.add_node("strategy_planning_team", traced_node("strategy_planning_team")(run_strategy_team))
+    workflow.add_node("personalize_strategy_cards", traced_node("personalize_strategy_cards")(personalize_strategy_cards_node))
 
     # 🔥 3가지 보고서 생성 노드 추가
-    workflow.add_node("generate_comprehensive_report", generate_comprehensive_report_node)
-    workflow.add_node("generate_tactical_card", generate_tactical_card_node)
-    workflow.add_node("generate_content_guide", generate_content_guide_node)
+    workflow.add_node("generate_comprehensive_report", traced_node("generate_comprehensive_report")(_drop_unchanged_messages(generate_comprehensive_report_node)))
+    workflow.add_node("generate_tactical_card", traced_node("generate_tactical_card")(_drop_unchanged_messages(generate_tactical_card_node)))
+    workflow.add_node("generate_content_guide", traced_node("generate_content_guide")(_drop_unchanged_messages(generate_content_guide_node)))
 
     workflow.add_edge(START, "supervisor")
 
@@ -1682,6 +2551,7 @@ def create_super_graph() -> StateGraph:
         {
             "market_analysis_team": "market_analysis_team",
             "strategy_planning_team": "strategy_planning_team",
+            "personalize_strategy_cards": "personalize_strategy_cards",
             "generate_comprehensive_report": "generate_comprehensive_report",
             "generate_tactical_card": "generate_tactical_card",
             "generate_content_guide": "generate_content_guide",
@@ -1691,19 +2561,28 @@ def create_super_graph() -> StateGraph:
 
     workflow.add_edge("market_analysis_team", "supervisor")
     workflow.add_edge("strategy_planning_team", "supervisor")
+    workflow.add_edge("personalize_strategy_cards", "supervisor")
 
     # 모든 보고서 노드는 END로
     workflow.add_edge("generate_comprehensive_report", END)
     workflow.add_edge("generate_tactical_card", END)
     workflow.add_edge("generate_content_guide", END)
 
-    # MemorySaver 제거 - Pydantic 모델 직렬화 문제 방지
-    return workflow.compile()
+    # 기본 MemorySaver는 Pydantic 모델 직렬화 문제 → PydanticJsonSerializer 기반 체크포인터만 허용
+    return workflow.compile(checkpointer=checkpointer)
 
 # ============================================================================
 # 8. Main Execution
 # ============================================================================
 
+_REQUEST_FLIGHT = SingleFlight()
+
+
+def get_coalesce_stats() -> Dict[str, int]:
+    """동일 요청 합치기 통계 (executions: 실제 실행 수, coalesced: 합류한 호출 수)"""
+    return _REQUEST_FLIGHT.stats()
+
+
 def run_marketing_system(
     target_store_id: str,
     target_store_name: str,
@@ -1713,11 +2592,99 @@ def run_marketing_system(
     period_start: Optional[str] = None,
     period_end: Optional[str] = None,
     content_channels: Optional[List[str]] = None,
-    collect_mode: str = "weather_only",  # "weather_only" 또는 "event_only"
-    progress_callback: Optional[callable] = None  # 🔥 진행 상황 콜백
+    collect_mode: str = "weather_only",  # "weather_only" / "event_only" / "both"
+    progress_callback: Optional[callable] = None,  # 🔥 진행 상황 콜백
+    trace: bool = False,  # 🔥 요청 단위 span 트레이싱
+    trace_dir: Optional[str] = None,  # 지정 시 JSONL + Chrome trace 파일 저장
+    reuse_checkpoint: bool = False,  # 🔥 동일 가맹점/데이터 버전의 STP·4P 산출물 재사용
+    strategy_generation_mode: str = "single",  # "single" | "parallel" (카드 3개 동시 생성) | "template" (군집 골격 캐시 + 개인화)
+    coalesce: bool = True,  # 🔥 진행 중인 동일 요청에 합류 (single-flight)
+    deadline_s: Optional[float] = DEFAULT_DEADLINE_S,  # 🔥 전체 응답 시간 제한(초), None이면 무제한
+    event_callback: Optional[Callable[[StreamEvent], None]] = None,  # 🔥 스트리밍 이벤트 수신 (합류 시 선행 실행 이벤트 재생)
+    token_callback: Optional[TokenCallback] = None  # 🔥 보고서/전술/콘텐츠 노드 토큰 수신 callback(node, text)
+) -> Dict:
+    """
+    마케팅 시스템 실행
+
+    trace=True (또는 trace_dir 지정) 시 노드/LLM/HTTP/데이터 로드 span을 수집하여
+    result['trace'] (Tracer)로 반환합니다.
+
+    reuse_checkpoint=True 시 가맹점별 thread로 디스크 체크포인트를 사용하여,
+    이전 요청에서 같은 데이터 버전으로 계산된 STP와 기본 전략 카드(같은 생성 모드)를 건너뜁니다.
+    같은 가맹점의 후속 질문은 기본 카드 위에 user_query만 반영하는 짧은 호출 1회로 카드를 만듭니다
+    (같은 user_query면 이 호출도 건너뜀).
+
+    coalesce=True 시 같은 (store_id, task_type, user_query, 기간, 채널/모드, 체크포인트 재사용) 요청이
+    이미 실행 중이면 새로 실행하지 않고 그 결과를 함께 받습니다 (result['coalesced'] = True).
+    합류한 호출의 progress_callback에는 대기 메시지만 전달됩니다. trace/trace_dir 요청은 합류하지 않습니다.
+
+    deadline_s 지정 시 노드별 예산(agents.deadline.NODE_BUDGET_SHARES)을 넘긴 LLM 호출은
+    폴백 카드 / 템플릿 보고서로 대체되고 result['degraded'] = True,
+    result['degraded_nodes']에 해당 노드와 사유가 기록됩니다.
+
+    event_callback 지정 시 그래프를 스트리밍 실행하며 agents.streaming.StreamEvent를 전달합니다
+    (UI에서는 stream_marketing_system 사용). 진행 중인 동일 스트리밍 실행에 합류하면 그 실행의
+    이벤트를 처음부터 재생받고, 스트리밍이 아닌 실행에 합류하면 최종 결과만 받습니다.
+    event_callback은 실행 스레드(잠금 안)에서 호출되므로 막히지 않아야 합니다 (예: queue.Queue.put).
+
+    token_callback 지정 시 보고서/전술 카드/콘텐츠 가이드 노드가 LLM을 토큰 스트리밍으로 호출하고
+    청크를 callback(node, text)로 전달합니다. 최종 state 값은 동일하게 조립됩니다.
+    """
+    def execute(emit: Optional[Callable[[StreamEvent], None]] = event_callback) -> Dict:
+        return _execute_marketing_system(
+            target_store_id, target_store_name, task_type, user_query,
+            target_market_id, period_start, period_end, content_channels, collect_mode,
+            progress_callback, trace, trace_dir, reuse_checkpoint, strategy_generation_mode,
+            deadline_s, emit, token_callback,
+        )
+
+    # 토큰 콜백 요청은 자신의 실행 토큰이, 트레이스 요청은 자신의 span 기록이 필요하므로 합류하지 않음
+    if not coalesce or token_callback or trace or trace_dir:
+        return {**execute(), "coalesced": False}
+
+    key = (
+        target_store_id, task_type, (user_query or "").strip(),
+        target_market_id, period_start, period_end,
+        tuple(content_channels or ()), collect_mode, strategy_generation_mode, deadline_s,
+        reuse_checkpoint,
+    )
+    if progress_callback and _REQUEST_FLIGHT.in_flight(key):
+        progress_callback("♻️ 동일한 분석이 진행 중이어서 결과를 공유합니다...")
+
+    if event_callback:
+        # 스트리밍 요청도 같은 key로 합류 - 선행 실행의 이벤트를 (합류 전 것부터) 재생받음
+        result, coalesced = _REQUEST_FLIGHT.do_stream(key, execute, event_callback)
+    else:
+        result, coalesced = _REQUEST_FLIGHT.do(key, lambda: execute())
+    if coalesced:
+        print(f"♻️  동일 요청 합류 - 누적 {_REQUEST_FLIGHT.stats()['coalesced']}건 절약")
+    # 호출자별로 dict를 분리 (내부 객체는 공유)
+    return {**result, "coalesced": coalesced}
+
+
+def _execute_marketing_system(
+    target_store_id: str,
+    target_store_name: str,
+    task_type: str,
+    user_query: Optional[str],
+    target_market_id: Optional[str],
+    period_start: Optional[str],
+    period_end: Optional[str],
+    content_channels: Optional[List[str]],
+    collect_mode: str,
+    progress_callback: Optional[callable],
+    trace: bool,
+    trace_dir: Optional[str],
+    reuse_checkpoint: bool,
+    strategy_generation_mode: str,
+    deadline_s: Optional[float],
+    event_callback: Optional[Callable[[StreamEvent], None]] = None,
+    token_callback: Optional[TokenCallback] = None
 ) -> Dict:
-    """마케팅 시스템 실행"""
+    """run_marketing_system 실제 실행부 (그래프 1회 실행)"""
     start_time = time.time()
+    tracer = Tracer() if (trace or trace_dir) else None
+    deadline = Deadline(deadline_s) if deadline_s else None
 
     def log_progress(message: str):
         """진행 상황 로그 (콜백 + 콘솔)"""
@@ -1751,9 +2718,13 @@ def run_marketing_system(
         # 콘텐츠 생성용
         "content_channels": content_channels or ['instagram', 'naver_blog', 'facebook'],
 
+        "strategy_generation_mode": strategy_generation_mode,
+
         # 공통
         "stp_output": None,
         "store_raw_data": None,
+        "data_4p_summary": None,
+        "base_strategy_cards": [],
         "strategy_cards": [],
         "selected_strategy": None,
         "execution_plan": "",
@@ -1763,16 +2734,41 @@ def run_marketing_system(
         "tactical_card": None,
         "content_guide": None,
 
+        "data_version": get_data_version(),
+        "phase_keys": {},
+
         "next": ""
     }
 
-    app = create_super_graph()
-    config = {
-        "configurable": {"thread_id": f"v2_integrated_{int(time.time())}"},
-        "recursion_limit": 50
-    }
+    if reuse_checkpoint:
+        from agents.checkpoint import get_checkpointer
+        app = create_super_graph(checkpointer=get_checkpointer())
+        config = {
+            "configurable": {"thread_id": f"store_{target_store_id}"},
+            "recursion_limit": 50
+        }
 
-    final_state = app.invoke(initial_state, config=config)
+        # 이전 실행 산출물 시드 → top_supervisor_node가 phase_keys로 재사용 여부 판단
+        previous = app.get_state(config).values or {}
+        for key in ["stp_output", "store_raw_data", "data_4p_summary", "base_strategy_cards", "strategy_cards",
+                    "selected_strategy", "execution_plan", "phase_keys"]:
+            if previous.get(key):
+                initial_state[key] = previous[key]
+        if previous.get("phase_keys"):
+            log_progress(f"♻️  체크포인트 발견: {', '.join(previous['phase_keys'])}")
+    else:
+        app = create_super_graph()
+        config = {
+            "configurable": {"thread_id": f"v2_integrated_{int(time.time())}"},
+            "recursion_limit": 50
+        }
+
+    with use_tracer(tracer), use_deadline(deadline), use_token_callback(token_callback):
+        with span("run_marketing_system", cat="request", task_type=task_type, store_id=target_store_id):
+            if event_callback:
+                final_state = stream_graph(app, initial_state, config, event_callback)
+            else:
+                final_state = app.invoke(initial_state, config=config)
 
     elapsed = time.time() - start_time
     print("\n" + "=" * 80)
@@ -1788,12 +2784,55 @@ def run_marketing_system(
         "final_report": final_state.get('final_report', ''),
         "tactical_card": final_state.get('tactical_card'),
         "content_guide": final_state.get('content_guide'),
+        "trace": tracer,
+        "degraded": bool(deadline and deadline.is_degraded),
+        "degraded_nodes": list(deadline.degraded) if deadline else [],
     }
 
-    print(f"[DEBUG] 🔥 return할 result 키: {list(result.keys())}")
+    if result["degraded"]:
+        print(f"   ⏱️  시간 제한 폴백 사용: {', '.join(d['node'] for d in result['degraded_nodes'])}")
+
+    if tracer:
+        for cat, stats in tracer.summary().items():
+            print(f"   ⏱️  [{cat}] {stats['count']}회, {stats['total_ms']:.0f}ms, "
+                  f"토큰 {stats['prompt_tokens']}/{stats['completion_tokens']}")
+        if trace_dir:
+            jsonl_path = tracer.export_jsonl(os.path.join(trace_dir, f"trace_{tracer.trace_id}.jsonl"))
+            chrome_path = tracer.export_chrome_trace(os.path.join(trace_dir, f"trace_{tracer.trace_id}.json"))
+            print(f"   📁 트레이스 저장: {jsonl_path}, {chrome_path}")
 
     return result
 
+
+def stream_marketing_system(target_store_id: str, target_store_name: str, **kwargs) -> Iterator[StreamEvent]:
+    """
+    run_marketing_system 스트리밍 버전 - 단계별 이벤트를 완료되는 대로 yield
+
+    마지막 이벤트는 {"type": "done", "data": result} 또는 {"type": "error", "data": 예외}입니다.
+    진행 중인 동일 요청이 있으면 그 실행에 합류하여 같은 이벤트를 받습니다 (result['coalesced'] = True).
+
+    사용 예:
+        for event in stream_marketing_system(store_id, store_name, task_type="종합_전략_수립"):
+            if event["type"] == "card_done":
+                render(event["data"])
+    """
+    events: "queue.Queue[StreamEvent]" = queue.Queue()
+
+    def worker():
+        try:
+            result = run_marketing_system(target_store_id, target_store_name, event_callback=events.put, **kwargs)
+            events.put(StreamEvent(type="done", data=result))
+        except Exception as e:
+            events.put(StreamEvent(type="error", data=e))
+
+    thread = threading.Thread(target=contextvars.copy_context().run, args=(worker,), daemon=True)
+    thread.start()
+    while True:
+        event = events.get()
+        yield event
+        if event["type"] in ("done", "error"):
+            break
+
 # ============================================================================
 # 9. CLI
 # ============================================================================
@@ -1847,11 +2886,13 @@ if __name__ == "__main__":
         print("=" * 60)
         print("1. 날씨 기반 (weather_only)")
         print("2. 이벤트 기반 (event_only)")
+        print("3. 날씨 + 이벤트 (both)")
         print("=" * 60)
 
-        mode_choice = input("\n선택 (1-2, 기본값=1): ").strip() or "1"
-        collect_mode = "weather_only" if mode_choice == "1" else "event_only"
-        mode_display = "🌤️ 날씨 기반" if collect_mode == "weather_only" else "📅 이벤트 기반"
+        mode_choice = input("\n선택 (1-3, 기본값=1): ").strip() or "1"
+        collect_mode = {"2": "event_only", "3": "both"}.get(mode_choice, "weather_only")
+        mode_display = {"weather_only": "🌤️ 날씨 기반", "event_only": "📅 이벤트 기반",
+                        "both": "🌤️📅 날씨 + 이벤트"}[collect_mode]
         print(f"\n✅ 선택된 모드: {mode_display}\n")
 
         target_market_id = input("📍 상권 ID (예: 강남, 기본값=성수동): ").strip() or "성수동"
@@ -0,0 +1,217 @@
+# agents/prompt_budget.py
+"""
+프롬프트 토큰 예산 관리 (Context Compressor)
+- 프롬프트의 가변 데이터 섹션(4P 요약, PC축 요인, 상황 시그널, 출처 등)별 토큰 수 추정
+- 1단계(무손실): 중복 줄 제거, 공백 정리, 4P JSON → 한 줄 요약, 소수점 축약
+- 2단계(예산 초과 시): 중요도가 낮은 섹션부터 뒤쪽 줄을 잘라내거나 생략
+- 노드별 절감 토큰을 로그 + span 속성 + 누적 통계로 기록
+
+사용 예:
+    context = fit_sections("generate_tactical_card", [
+        PromptSection(name="store", text=store_detail, priority=0, required=True),
+        PromptSection(name="signals", text=signals_text, priority=2),
+    ])
+
+토큰 수는 모델 토크나이저 없이 문자 종류별 근사치로 계산합니다.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from agents.tracing import annotate
+
+# 노드별 가변 컨텍스트 예산 (토큰, 고정 지시문 제외)
+NODE_CONTEXT_BUDGETS: Dict[str, int] = {
+    "strategy_4p_agent": int(os.getenv("MARKETING_PROMPT_BUDGET_STRATEGY", "1800")),
+    "generate_comprehensive_report": int(os.getenv("MARKETING_PROMPT_BUDGET_REPORT", "1200")),
+    "generate_tactical_card": int(os.getenv("MARKETING_PROMPT_BUDGET_TACTICAL", "1500")),
+}
+DEFAULT_CONTEXT_BUDGET = 1500
+
+PROMPT_BUDGET_STATS: Dict[str, Dict[str, int]] = {}
+_STATS_LOCK = threading.Lock()
+
+_HANGUL = re.compile(r"[가-힣]")
+_NUMBER = re.compile(r"(-?\d+\.\d{3,})")
+
+
+class PromptSection(BaseModel):
+    """프롬프트 가변 섹션 (priority가 작을수록 중요)"""
+    name: str
+    text: str
+    priority: int = 1
+    required: bool = False  # True면 잘라내지 않음 (무손실 압축만)
+    original_tokens: Optional[int] = None  # 호출 측에서 미리 요약한 경우 원본 토큰 수 (절감량 계산용)
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 근사 (한글 1자 ≈ 1토큰, 그 외 4자 ≈ 1토큰)"""
+    if not text:
+        return 0
+    hangul = len(_HANGUL.findall(text))
+    return hangul + (len(text) - hangul + 3) // 4
+
+
+# ============================================================================
+# 1. 무손실 압축
+# ============================================================================
+
+def dedupe_lines(text: str) -> str:
+    """
+    연속 중복 줄 제거 (공백 무시 비교) + 연속 빈 줄 축약
+
+    떨어져 있는 같은 줄(시그널별 "- 예상 영향(...)" 등)은 각 항목의 내용이므로 유지
+    """
+    out, prev = [], None
+    for line in text.splitlines():
+        key = re.sub(r"\s+", " ", line).strip()
+        if key == prev:
+            continue
+        prev = key
+        out.append(line.rstrip())
+    return "\n".join(out).strip("\n")
+
+
+def round_numbers(text: str, digits: int = 2) -> str:
+    """긴 소수 축약 (0.123456 → 0.12)"""
+    return _NUMBER.sub(lambda m: f"{float(m.group(1)):.{digits}f}", text)
+
+
+def _prune_empty(value: Any) -> Any:
+    if isinstance(value, dict):
+        pruned = {k: _prune_empty(v) for k, v in value.items()}
+        return {k: v for k, v in pruned.items() if v not in (None, "", [], {})}
+    if isinstance(value, list):
+        pruned = [_prune_empty(v) for v in value]
+        return [v for v in pruned if v not in (None, "", [], {})]
+    return value
+
+
+def collapse_4p_summary(data_4p_summary: Dict[str, Any]) -> str:
+    """
+    4P 요약 JSON → P별 한 줄 요약 (빈 항목 제거, 수치 축약)
+
+    {"Price": {"insights": [{"source": "가격 안정성 데이터", "가격_안정성": "안정"}]}}
+    → "- Price [가격 안정성 데이터] 가격_안정성=안정"
+    """
+    lines = []
+    for p_type, summary in (_prune_empty(data_4p_summary) or {}).items():
+        for insight in (summary or {}).get("insights", []):
+            source = insight.get("source", "")
+            fields = " · ".join(
+                f"{k}={round(v, 2) if isinstance(v, float) else v}" for k, v in insight.items() if k != "source"
+            )
+            lines.append(f"- {p_type}" + (f" [{source}]" if source else "") + (f" {fields}" if fields else ""))
+    return "\n".join(lines) if lines else "데이터 없음"
+
+
+def compact_json(text: str) -> str:
+    """JSON 텍스트를 빈 값 제거 + 한 줄로 (JSON이 아니면 그대로)"""
+    try:
+        return json.dumps(_prune_empty(json.loads(text)), ensure_ascii=False, separators=(",", ":"))
+    except (TypeError, ValueError):
+        return text
+
+
+def compress_text(text: str) -> str:
+    return round_numbers(dedupe_lines(text or ""))
+
+
+# ============================================================================
+# 2. 예산 맞추기
+# ============================================================================
+
+def _trim_to(text: str, max_tokens: int) -> str:
+    """뒤쪽 줄부터 잘라 max_tokens 이하로 (잘린 줄 수 표시 포함)"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    lines = text.splitlines()
+    # 생략 표시 자리를 먼저 확보한 뒤 남은 예산만큼 줄 유지
+    kept, used = [], estimate_tokens(f"(이하 {len(lines)}줄 생략)") + 1
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(line)
+        used += cost
+    if not kept:
+        return ""
+    kept.append(f"(이하 {len(lines) - len(kept)}줄 생략)")
+    return "\n".join(kept)
+
+
+def fit_section_texts(node: str, sections: List[PromptSection], budget: Optional[int] = None) -> Dict[str, str]:
+    """
+    섹션들을 노드 예산에 맞춰 압축/절삭
+
+    Returns:
+        {섹션명: 예산 안에 맞춘 텍스트} - 프롬프트 템플릿의 서로 다른 위치에 넣을 때 사용
+    """
+    budget = budget or NODE_CONTEXT_BUDGETS.get(node, DEFAULT_CONTEXT_BUDGET)
+    before = sum(s.original_tokens or estimate_tokens(s.text) for s in sections)
+
+    texts = {s.name: compress_text(s.text) for s in sections}
+    total = sum(estimate_tokens(t) for t in texts.values())
+
+    # 중요도 낮은 섹션부터 절삭 (priority 내림차순)
+    trimmed = []
+    for section in sorted((s for s in sections if not s.required), key=lambda s: -s.priority):
+        if total <= budget:
+            break
+        current = estimate_tokens(texts[section.name])
+        allowed = max(0, current - (total - budget))
+        texts[section.name] = _trim_to(texts[section.name], allowed) if allowed else ""
+        total += estimate_tokens(texts[section.name]) - current
+        trimmed.append(section.name)
+
+    after = sum(estimate_tokens(t) for t in texts.values())
+    _record(node, before, after)
+    annotate(prompt_tokens_before=before, prompt_tokens_after=after, prompt_sections_trimmed=trimmed)
+    if before - after > 0:
+        print(f"   ✂️  [{node}] 프롬프트 컨텍스트 {before} → {after} 토큰 (-{before - after})"
+              + (f", 절삭: {', '.join(trimmed)}" if trimmed else ""))
+
+    return texts
+
+
+def fit_sections(node: str, sections: List[PromptSection], budget: Optional[int] = None,
+                 separator: str = "\n\n") -> str:
+    """섹션들을 노드 예산에 맞춰 압축/절삭 후 순서대로 연결"""
+    texts = fit_section_texts(node, sections, budget)
+    return separator.join(texts[s.name] for s in sections if texts[s.name])
+
+
+def _record(node: str, before: int, after: int):
+    with _STATS_LOCK:
+        stats = PROMPT_BUDGET_STATS.setdefault(node, {"calls": 0, "tokens_before": 0, "tokens_after": 0})
+        stats["calls"] += 1
+        stats["tokens_before"] += before
+        stats["tokens_after"] += after
+
+
+def get_prompt_budget_stats() -> Dict[str, Dict[str, int]]:
+    """노드별 누적 토큰 (압축 전/후) 및 절감량"""
+    with _STATS_LOCK:
+        return {
+            node: {**stats, "tokens_saved": stats["tokens_before"] - stats["tokens_after"]}
+            for node, stats in PROMPT_BUDGET_STATS.items()
+        }
+
+
+__all__ = [
+    "PromptSection",
+    "NODE_CONTEXT_BUDGETS",
+    "estimate_tokens",
+    "dedupe_lines",
+    "collapse_4p_summary",
+    "compact_json",
+    "fit_sections",
+    "fit_section_texts",
+    "get_prompt_budget_stats",
+]
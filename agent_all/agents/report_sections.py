@@ -0,0 +1,298 @@
+# agents/report_sections.py
+"""
+섹션 단위 증분 보고서 생성
+- 보고서를 섹션(ReportSection) 목록으로 정의하고, 섹션마다 의존 입력(deps)을 선언
+- 섹션 출력은 의존 입력 해시로 캐시 → 입력이 바뀐 섹션만 LLM으로 재생성 (서로 독립이므로 동시 생성)
+  (예: user_query만 바뀐 후속 질문은 STP 기반 섹션을 그대로 재사용)
+- 캐시는 메모리 LRU + 로컬 JSON 파일 (.cache/report_sections.json), MARKETING_REPORT_SECTION_CACHE=0이면 미사용
+- 수치만 옮기는 데이터 섹션은 render(로컬 템플릿, agents.report_templates)로 즉시 생성 (LLM/캐시 미사용)
+
+의존 입력 종류 (DEPENDENCY_GETTERS):
+    store, stp, data_4p, selected_strategy, strategy_cards, situation, user_query
+
+사용 예:
+    sections = [
+        ReportSection("overview", "가맹점 개요", deps=("store", "stp"), render=render_overview),
+        ReportSection("strategy", "추천 전략", deps=("stp", "selected_strategy"), prompt=build_strategy_prompt),
+    ]
+    report = build_report("generate_comprehensive_report", header, sections, state, llm, on_token=forward)
+"""
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from pydantic import BaseModel
+
+from agents.backends import get_llm_backend
+from agents.deadline import invoke_with_budget
+from agents.tracing import annotate
+
+SECTION_CACHE_PATH = os.getenv(
+    "MARKETING_REPORT_SECTION_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache", "report_sections.json"),
+)
+SECTION_CACHE_SIZE = int(os.getenv("MARKETING_REPORT_SECTION_CACHE_SIZE", "500"))
+# 캐시에 없는 서술 섹션 동시 생성 수
+REPORT_SECTION_PARALLEL = int(os.getenv("MARKETING_REPORT_SECTION_PARALLEL", "5"))
+# "0"이면 섹션 캐시를 읽지도 쓰지도 않음 (매번 전체 섹션 생성 - 벤치마크 등)
+SECTION_CACHE_ENABLED = os.getenv("MARKETING_REPORT_SECTION_CACHE", "1") != "0"
+# 섹션 프롬프트가 바뀌면 올려서 기존 캐시 무효화
+REPORT_SECTION_VERSION = "v2"
+
+# 의존 입력 이름 → state에서 해당 값을 꺼내는 함수
+DEPENDENCY_GETTERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "store": lambda s: [s.get("target_store_id"), s.get("target_store_name")],
+    "stp": lambda s: s.get("stp_output"),
+    "data_4p": lambda s: s.get("data_4p_summary"),
+    "selected_strategy": lambda s: s.get("selected_strategy"),
+    "strategy_cards": lambda s: s.get("strategy_cards"),
+    "situation": lambda s: [s.get("target_market_id"), s.get("period_start"), s.get("period_end"),
+                            s.get("situation_context")],
+    "user_query": lambda s: " ".join((s.get("user_query") or "").split()),
+}
+
+
+class ReportSection:
+    """
+    보고서 섹션 정의
+
+    Args:
+        name: 캐시 키용 섹션 ID
+        title: 보고서에 표시할 제목 (번호는 렌더링 시 부여)
+        deps: 의존 입력 (DEPENDENCY_GETTERS 키)
+        prompt: state → LLM 프롬프트 (서술 섹션)
+        render: state → 마크다운 (데이터 섹션, LLM 미사용) - prompt와 둘 중 하나만 지정
+        when: state → 포함 여부 (None이면 항상 포함)
+    """
+
+    def __init__(self, name: str, title: str, deps: Sequence[str],
+                 prompt: Optional[Callable[[Dict[str, Any]], str]] = None,
+                 render: Optional[Callable[[Dict[str, Any]], str]] = None,
+                 when: Optional[Callable[[Dict[str, Any]], bool]] = None):
+        unknown = set(deps) - set(DEPENDENCY_GETTERS)
+        if unknown:
+            raise ValueError(f"알 수 없는 섹션 의존 입력: {sorted(unknown)}")
+        if (prompt is None) == (render is None):
+            raise ValueError(f"섹션 '{name}': prompt와 render 중 하나만 지정해야 합니다")
+        self.name = name
+        self.title = title
+        self.deps = tuple(deps)
+        self.prompt = prompt
+        self.render = render
+        self.when = when
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    return value
+
+
+def section_key(node: str, section: ReportSection, state: Dict[str, Any]) -> str:
+    """섹션 캐시 키 = 노드 + 섹션 + 버전 + LLM 백엔드 + 의존 입력 해시"""
+    inputs = {dep: _jsonable(DEPENDENCY_GETTERS[dep](state)) for dep in section.deps}
+    payload = json.dumps(inputs, ensure_ascii=False, sort_keys=True, default=str)
+    digest = hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+    return f"{node}|{section.name}|{REPORT_SECTION_VERSION}|{get_llm_backend()}|{digest}"
+
+
+class SectionCache:
+    """섹션 출력 캐시 (LRU + JSON 파일, 스레드 안전)"""
+
+    def __init__(self, path: str = SECTION_CACHE_PATH, max_entries: int = SECTION_CACHE_SIZE):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _read_file(self) -> "OrderedDict[str, str]":
+        if not os.path.exists(self.path):
+            return OrderedDict()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return OrderedDict(json.load(f).get("sections", []))
+        except Exception as e:
+            print(f"⚠️  보고서 섹션 캐시 로드 실패 ({self.path}): {e}")
+            return OrderedDict()
+
+    def _load(self):
+        self._entries = self._read_file()
+
+    def save(self):
+        """파일에 기록 - 다른 프로세스가 저장한 섹션과 합친 뒤 교체 (같은 키는 이 프로세스 값, 최근 사용 순 유지)"""
+        on_disk = self._read_file()
+        with self._lock:
+            for key, text in self._entries.items():
+                on_disk.pop(key, None)
+                on_disk[key] = text
+            while len(on_disk) > self.max_entries:
+                on_disk.popitem(last=False)
+            self._entries = on_disk
+            entries = list(on_disk.items())
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"sections": entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            text = self._entries.get(key)
+            if text is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return text
+
+    def put(self, key: str, text: str):
+        with self._lock:
+            self._entries[key] = text
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        """섹션 재사용(hits) / 재생성(misses) 수 / 저장된 섹션 수"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+_SECTION_CACHE: Optional[SectionCache] = None
+_SECTION_CACHE_LOCK = threading.Lock()
+
+
+def get_section_cache() -> SectionCache:
+    """프로세스 공용 섹션 캐시"""
+    global _SECTION_CACHE
+    with _SECTION_CACHE_LOCK:
+        if _SECTION_CACHE is None:
+            _SECTION_CACHE = SectionCache()
+        return _SECTION_CACHE
+
+
+def get_report_section_stats() -> Dict[str, int]:
+    return get_section_cache().stats()
+
+
+class _OrderedEmitter:
+    """
+    조각(헤더/섹션)별 텍스트를 조각 순서대로 전달
+
+    현재 조각은 바로 전달하고, 뒤 조각은 앞 조각이 끝날 때까지 버퍼링했다가 한 번에 전달합니다.
+    → 섹션을 동시에 생성해도 스트리밍 화면에는 보고서 순서대로 표시
+    """
+
+    def __init__(self, emit: Callable[[str], None], count: int):
+        self._emit = emit
+        self._lock = threading.Lock()
+        self._buffers: List[List[str]] = [[] for _ in range(count)]
+        self._done = [False] * count
+        self._cursor = 0
+
+    def write(self, index: int, text: str):
+        with self._lock:
+            if index == self._cursor:
+                self._emit(text)
+            else:
+                self._buffers[index].append(text)
+
+    def finish(self, index: int):
+        with self._lock:
+            self._done[index] = True
+            while self._cursor < len(self._done) and self._done[self._cursor]:
+                self._cursor += 1
+                if self._cursor < len(self._done) and self._buffers[self._cursor]:
+                    self._emit("".join(self._buffers[self._cursor]))
+                    self._buffers[self._cursor] = []
+
+
+def build_report(node: str, header: str, sections: List[ReportSection], state: Dict[str, Any], llm: Any,
+                 on_token: Optional[Callable[[str], None]] = None,
+                 cache: Optional[SectionCache] = None) -> str:
+    """
+    섹션 순서대로 보고서 조립 (데이터 섹션은 로컬 렌더링, 서술 섹션은 입력이 바뀐 것만 LLM 호출)
+
+    캐시에 없는 서술 섹션은 서로 독립이므로 동시에 생성합니다 (워커마다 contextvars 복사 → 트레이스/
+    deadline/쿼터 우선순위 유지, 노드 예산은 동시 호출이 함께 사용).
+    재사용 섹션도 on_token으로 한 번에 전달되고, 동시 생성 섹션의 토큰은 섹션 순서대로 전달됩니다.
+    DeadlineExceeded는 모든 워커가 끝난 뒤 호출 측으로 전달되며, 그 전에 생성된 섹션은 캐시에 남습니다.
+    """
+    cache = cache or get_section_cache()
+    active = [s for s in sections if s.when is None or s.when(state)]
+    emitter = _OrderedEmitter(on_token or (lambda text: None), len(active) + 1)
+    texts: List[Optional[str]] = [None] * len(active)
+    rendered, reused, generated, pending = [], [], [], []
+    emitter.write(0, header + "\n\n")
+    emitter.finish(0)
+
+    def generate(i: int, section: ReportSection, key: str):
+        forward = (lambda text: emitter.write(i + 1, text)) if on_token else None
+        response = invoke_with_budget(
+            llm, section.prompt(state), f"{node}.{section.name}.llm", node=node, on_token=forward
+        )
+        texts[i] = response.content.strip()
+        if SECTION_CACHE_ENABLED:
+            cache.put(key, texts[i])
+        generated.append(section.name)
+        emitter.write(i + 1, "\n\n")
+        emitter.finish(i + 1)
+
+    try:
+        for i, section in enumerate(active):
+            emitter.write(i + 1, f"## {i + 1}. {section.title}\n\n")
+            if section.render is not None:
+                texts[i] = section.render(state)
+                rendered.append(section.name)
+            else:
+                key = section_key(node, section, state)
+                texts[i] = cache.get(key) if SECTION_CACHE_ENABLED else None
+                if texts[i] is None:
+                    pending.append((i, section, key))
+                    continue
+                reused.append(section.name)
+            emitter.write(i + 1, texts[i] + "\n\n")
+            emitter.finish(i + 1)
+
+        if pending:
+            workers = max(1, min(REPORT_SECTION_PARALLEL, len(pending)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{node}-section") as executor:
+                futures = [executor.submit(contextvars.copy_context().run, generate, *job) for job in pending]
+                wait(futures)
+            for future in futures:
+                future.result()
+    finally:
+        if generated and SECTION_CACHE_ENABLED:
+            cache.save()
+        annotate(sections_rendered=rendered, sections_reused=reused, sections_generated=generated)
+        print(f"   ♻️  [{node}] 섹션 로컬 렌더링 {len(rendered)}개 / 재사용 {len(reused)}개 / 생성 {len(generated)}개"
+              + (f" ({', '.join(generated)})" if generated else ""))
+
+    return "\n\n".join([header] + [f"## {i}. {section.title}\n\n{text}"
+                                     for i, (section, text) in enumerate(zip(active, texts), 1)])
+
+
+__all__ = [
+    "ReportSection",
+    "SectionCache",
+    "DEPENDENCY_GETTERS",
+    "REPORT_SECTION_VERSION",
+    "section_key",
+    "build_report",
+    "get_section_cache",
+    "get_report_section_stats",
+]
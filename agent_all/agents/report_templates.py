@@ -0,0 +1,205 @@
+# agents/report_templates.py
+"""
+데이터 섹션 결정적 렌더링 (LLM 미사용)
+- STP / 4P / 상황 데이터의 수치를 그대로 옮기는 섹션은 로컬 템플릿으로 즉시 렌더링
+  (가맹점 위치, 군집 현황, 경쟁점 표, 4P 지표, 날씨·이벤트 표, 전략 카드 비교)
+- LLM은 해석·권고(서술) 섹션만 작성 → 출력 토큰과 생성 시간 감소
+
+모든 함수는 입력이 같으면 같은 마크다운을 반환합니다.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import urlparse
+
+MAX_COMPETITOR_ROWS = 5
+MAX_EVENT_ROWS = 5
+MAX_IMPACT_ITEMS = 3
+
+
+def _fmt(value: Any, digits: int = 2, suffix: str = "") -> str:
+    if value is None or value == "":
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.{digits}f}{suffix}"
+    return f"{value}{suffix}"
+
+
+def _cell(value: Any) -> str:
+    return str(value).replace("|", "/").replace("\n", " ")
+
+
+def markdown_table(headers: Sequence[str], rows: Sequence[Sequence[Any]]) -> str:
+    lines = ["| " + " | ".join(headers) + " |", "|" + "|".join("---" for _ in headers) + "|"]
+    lines += ["| " + " | ".join(_cell(v) for v in row) + " |" for row in rows]
+    return "\n".join(lines)
+
+
+# ============================================================================
+# 1. STP
+# ============================================================================
+
+def render_store_position(stp: Any, store_name: str) -> str:
+    """가맹점 위치 (PC 점수, 군집 중심 대비 차이)"""
+    pos = stp.store_current_position
+    cluster = next((c for c in stp.cluster_profiles if c.cluster_id == pos.cluster_id), None)
+    pc1 = stp.pc_axis_interpretation.get("PC1")
+    pc2 = stp.pc_axis_interpretation.get("PC2")
+    rows = [
+        ["PC1", pc1.interpretation if pc1 else "-", _fmt(pos.pc1_score),
+         _fmt(cluster.pc1_mean) if cluster else "-",
+         f"{pos.pc1_score - cluster.pc1_mean:+.2f}" if cluster else "-"],
+        ["PC2", pc2.interpretation if pc2 else "-", _fmt(pos.pc2_score),
+         _fmt(cluster.pc2_mean) if cluster else "-",
+         f"{pos.pc2_score - cluster.pc2_mean:+.2f}" if cluster else "-"],
+    ]
+    return f"""- **가맹점명**: {store_name}
+- **업종**: {pos.industry}
+- **소속 군집**: {pos.cluster_name}
+- **근접 경쟁자**: {len(stp.nearby_competitors)}개
+
+{markdown_table(["축", "해석", "가맹점 점수", "군집 평균", "차이"], rows)}"""
+
+
+def render_cluster_stats(stp: Any) -> str:
+    """업종 내 군집 현황 (타겟 군집 표시)"""
+    if not stp.cluster_profiles:
+        return "군집 데이터 없음"
+    target_id = stp.store_current_position.cluster_id if stp.store_current_position else stp.target_cluster_id
+    rows = [
+        [("🎯 " if c.cluster_id == target_id else "") + c.cluster_name, c.store_count,
+         _fmt(c.pc1_mean), _fmt(c.pc2_mean), c.characteristics]
+        for c in stp.cluster_profiles
+    ]
+    return markdown_table(["군집", "매장 수", "PC1 평균", "PC2 평균", "특성"], rows)
+
+
+def render_pc_factors(stp: Any) -> str:
+    """PC축별 상위 요인 (PCA 가중치)"""
+    rows = [
+        [axis, info.interpretation, f.get("속성", "-"), _fmt(f.get("가중치"))]
+        for axis, info in stp.pc_axis_interpretation.items()
+        for f in info.top_features
+    ]
+    return markdown_table(["축", "해석", "요인", "가중치"], rows) if rows else "PC축 요인 데이터 없음"
+
+
+def render_competitor_table(stp: Any, limit: int = MAX_COMPETITOR_ROWS) -> str:
+    """근접 경쟁점 (포지셔닝 공간 거리순)"""
+    competitors = sorted(stp.nearby_competitors, key=lambda c: c.get("distance", 0))
+    if not competitors:
+        return "근접 경쟁점 없음"
+    rows = [[c.get("store_name", "-"), c.get("cluster", "-"), _fmt(c.get("distance"))] for c in competitors[:limit]]
+    table = markdown_table(["경쟁점", "군집", "거리"], rows)
+    if len(competitors) > limit:
+        table += f"\n\n외 {len(competitors) - limit}개"
+    return table
+
+
+# ============================================================================
+# 2. 4P / 전략 카드
+# ============================================================================
+
+def render_4p_metrics(data_4p_summary: Optional[Dict[str, Any]]) -> str:
+    """4P 매핑 지표 (strategy_4p_agent의 data_4p_summary)"""
+    rows = []
+    for p_type, summary in (data_4p_summary or {}).items():
+        for insight in (summary or {}).get("insights", []):
+            source = insight.get("source", "")
+            for key, value in insight.items():
+                if key != "source" and value not in (None, "", [], {}):
+                    rows.append([p_type, source or "-", key, _fmt(value)])
+    return markdown_table(["4P", "출처", "지표", "값"], rows) if rows else "4P 매핑 데이터 없음"
+
+
+def render_strategy_cards_table(cards: List[Any]) -> str:
+    """전략 카드 비교"""
+    if not cards:
+        return "전략 카드 없음"
+    rows = [[card.card_id, card.title, card.priority, card.positioning_concept, card.expected_outcome] for card in cards]
+    return markdown_table(["#", "전략", "우선순위", "포지셔닝", "기대 효과"], rows)
+
+
+# ============================================================================
+# 3. 상황 (날씨 / 이벤트)
+# ============================================================================
+
+def format_expected_impact(items: Sequence[Dict[str, Any]], limit: int = MAX_IMPACT_ITEMS) -> str:
+    """날씨 신호 예상 변화 한 줄 요약 ("신규 고객 비중 +22.1% (8.54→10.44), ...")"""
+    parts = []
+    for it in list(items)[:limit]:
+        change = f"{it['change_pct']:+.1f}%" if it.get("change_pct") is not None else f"{it['diff']:+.2f}"
+        parts.append(f"{it['business_var']} {change} ({it['baseline']:.2f}→{it['expected']:.2f})")
+    return ", ".join(parts)
+
+
+def render_weather_table(signals: List[Dict[str, Any]]) -> str:
+    weather = [s for s in signals if s.get("signal_type") == "weather"]
+    if not weather:
+        return ""
+    # 날씨 영향 표 수치가 붙은 신호가 있으면 예상 영향 열 추가 (tools.weather_impact)
+    has_impact = any((s.get("details") or {}).get("expected_impact") for s in weather)
+    rows = []
+    for sig in weather:
+        d = sig.get("details") or {}
+        row = [
+            sig.get("description", "-"),
+            _fmt(d.get("tmax_overall", d.get("temp_mean")), 1, "°C"),
+            _fmt(d.get("tmin_overall"), 1, "°C"),
+            _fmt(d.get("pop_mean"), 0, "%"),
+            _fmt(d.get("rain_mm"), 1, "mm"),
+        ]
+        if has_impact:
+            impact = d.get("expected_impact") or []
+            row.append(f"{format_expected_impact(impact)} ({impact[0]['level']} 기준)" if impact else "-")
+        rows.append(row)
+    headers = ["날씨 신호", "최고기온", "최저기온", "강수확률", "강수량"] + (["예상 영향"] if has_impact else [])
+    return markdown_table(headers, rows)
+
+
+def render_event_table(signals: List[Dict[str, Any]], limit: int = MAX_EVENT_ROWS) -> str:
+    events = sorted((s for s in signals if s.get("signal_type") == "event"),
+                    key=lambda s: -(s.get("relevance") or 0))
+    if not events:
+        return ""
+    rows = []
+    for sig in events[:limit]:
+        d = sig.get("details") or {}
+        url = d.get("url")
+        rows.append([
+            sig.get("description", "-"),
+            f"{d['expected_visitors']:,}명" if d.get("expected_visitors") else "-",
+            _fmt(sig.get("relevance")),
+            f"[{urlparse(url).netloc or '링크'}]({url})" if url else "-",
+        ])
+    table = markdown_table(["이벤트", "예상 방문객", "관련도", "출처"], rows)
+    if len(events) > limit:
+        table += f"\n\n외 {len(events) - limit}건"
+    return table
+
+
+def render_situation_tables(situation: Optional[Dict[str, Any]], market_id: Optional[str] = None,
+                            period_start: Optional[str] = None, period_end: Optional[str] = None) -> str:
+    """상황 시그널 (요약 + 날씨 표 + 이벤트 표)"""
+    header = f"- **상권/기간**: {market_id or 'N/A'} / {period_start or ''} ~ {period_end or ''}"
+    if not situation or not situation.get("has_valid_signal"):
+        return f"{header}\n- 상황 정보 없음 - 가맹점 데이터 기반 전략을 우선 고려"
+    signals = situation.get("signals") or []
+    parts = [f"{header}\n- **요약**: {situation.get('summary', '')}"]
+    parts += [t for t in (render_weather_table(signals), render_event_table(signals)) if t]
+    return "\n\n".join(parts)
+
+
+__all__ = [
+    "markdown_table",
+    "render_store_position",
+    "render_cluster_stats",
+    "render_pc_factors",
+    "render_competitor_table",
+    "render_4p_metrics",
+    "render_strategy_cards_table",
+    "format_expected_impact",
+    "render_weather_table",
+    "render_event_table",
+    "render_situation_tables",
+]
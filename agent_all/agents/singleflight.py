@@ -0,0 +1,108 @@
+# agents/singleflight.py
+"""
+In-process single-flight (동일 요청 합치기)
+- 같은 key의 호출이 실행 중이면 새로 실행하지 않고 진행 중인 실행에 합류하여 같은 결과를 받음
+- 실행이 끝나면 key가 해제되므로 이후 요청은 다시 실행됨 (결과 캐시 아님)
+- do_stream(): 실행 중 이벤트(스트리밍 진행 상황)를 합류한 호출에도 전달 - 합류 전 이벤트는 먼저 재생
+
+사용 예:
+    flight = SingleFlight()
+    result, coalesced = flight.do(("store_1", "종합_전략_수립"), lambda: run(...))
+    result, coalesced = flight.do_stream(key, lambda emit: run(..., event_callback=emit), events.put)
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+        self.events: List[Any] = []
+        self.subscribers: List[Callable[[Any], None]] = []
+
+
+class SingleFlight:
+    """key별 실행 1회 보장 (스레드 안전)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Returns:
+            (결과, 합류 여부) - 합류한 호출은 선행 실행의 결과(또는 예외)를 그대로 받음
+        """
+        return self._do(key, lambda emit: fn(), None)
+
+    def do_stream(self, key: Hashable, fn: Callable[[Callable[[Any], None]], Any],
+                  on_event: Callable[[Any], None]) -> Tuple[Any, bool]:
+        """
+        do()와 같지만 실행 fn(emit)이 emit한 이벤트를 이 key의 모든 do_stream 호출의 on_event로 전달
+
+        합류한 호출은 합류 전 이벤트를 먼저 재생받으므로 모든 호출이 같은 순서로 전체 이벤트를 받습니다.
+        on_event는 잠금 안에서 호출되므로 막히지 않아야 합니다 (예: queue.Queue.put).
+        do()로 합류한 호출은 이벤트 없이 결과만, 이벤트가 없는 do() 실행에 합류하면 결과만 받습니다.
+        """
+        return self._do(key, fn, on_event)
+
+    def _do(self, key: Hashable, fn: Callable[[Callable[[Any], None]], Any],
+            on_event: Optional[Callable[[Any], None]]) -> Tuple[Any, bool]:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+            if on_event is not None:
+                for event in call.events:
+                    on_event(event)
+                call.subscribers.append(on_event)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        def emit(event: Any):
+            with self._lock:
+                call.events.append(event)
+                for subscriber in call.subscribers:
+                    subscriber(event)
+
+        try:
+            call.result = fn(emit)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self, key: Optional[Hashable] = None) -> int:
+        """진행 중인 실행 수 (key 지정 시 그 key의 실행 수: 0 또는 1)"""
+        with self._lock:
+            if key is not None:
+                return int(key in self._calls)
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        """실행 수 / 합류(coalesced) 수 / 현재 진행 중 key 수"""
+        with self._lock:
+            return {"executions": self.executions, "coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+
+__all__ = ["SingleFlight"]
@@ -4,11 +4,21 @@
 - Tavily Events (주변 행사 정보)
 - Weather Signals (날씨 정보)
 병렬로 호출하여 Situation JSON 생성
+
+collect_mode="both"는 두 소스를 동시에 호출하고 소스별 타임아웃을 적용 →
+한쪽이 실패/시간 초과여도 나머지 결과만으로 병합 (failed_sources에 기록)
+
+소스별 결과는 상황 캐시(agents.situation_cache)를 먼저 조회하고 미스일 때만 실시간 수집 →
+백그라운드 선계산(SituationPrefetcher)이 켜져 있으면 기본 기간 요청은 수집 대기 없음
 """
 
 from typing import Dict, Any, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import contextvars
+from itertools import zip_longest
+import os
 import sys
+import time
 from pathlib import Path
 
 # tools 임포트
@@ -34,6 +44,18 @@ except ImportError as e:
 
 HAS_SITUATION_TOOLS = HAS_EVENTS_TOOL or HAS_WEATHER_TOOL
 
+try:
+    from agents.deadline import get_deadline
+except ImportError:
+    def get_deadline(): return None
+
+from agents.situation_cache import event_query_terms, get_situation_cache, is_failure
+
+COLLECT_MODES = ("weather_only", "event_only", "both")
+# 소스별 수집 타임아웃 (초) - 요청 deadline이 더 짧으면 남은 시간까지
+WEATHER_TIMEOUT_S = float(os.getenv("MARKETING_SITUATION_WEATHER_TIMEOUT_S", "15"))
+EVENT_TIMEOUT_S = float(os.getenv("MARKETING_SITUATION_EVENT_TIMEOUT_S", "25"))
+
 def default_market_locator(mid: str):
     """✅ 실제 데이터 기반 상권 위치 매핑 (40+ 상권)"""
     try:
@@ -70,7 +92,8 @@ def _call_events(market_id: str, start: str, end: str, user_query: Optional[str]
             "market_id": market_id,
             "start": start,
             "end": end,
-            "user_query": user_query,
+            # 모드 접두어를 뗀 질의어만 검색에 사용 (상황 캐시 키와 같은 기준)
+            "user_query": event_query_terms(user_query),
         })
     except Exception as e:
         return {
@@ -112,7 +135,7 @@ def collect_situation_info(
     period_start: str,
     period_end: str,
     user_query: Optional[str] = None,
-    collect_mode: str = "weather_only"  # "weather_only", "event_only" (both 제거)
+    collect_mode: str = "weather_only"  # "weather_only", "event_only", "both"
 ) -> Dict[str, Any]:
     """
     상황 정보 수집 (사용자 선택 모드 기반)
@@ -122,7 +145,7 @@ def collect_situation_info(
         period_start: 시작일 (YYYY-MM-DD)
         period_end: 종료일 (YYYY-MM-DD)
         user_query: 사용자 쿼리 (선택)
-        collect_mode: "weather_only" 또는 "event_only" (사용자가 Streamlit에서 선택)
+        collect_mode: "weather_only" / "event_only" / "both" (사용자가 Streamlit에서 선택)
 
     Returns:
         {
@@ -132,7 +155,9 @@ def collect_situation_info(
             "citations": List[str],
             "assumptions": List[str],
             "event_count": int,
-            "weather_count": int
+            "weather_count": int,
+            "failed_sources": List[str],  # 실패/시간 초과한 소스 ("events", "weather")
+            "cached_sources": List[str]   # 상황 캐시에서 가져온 소스
         }
     """
 
@@ -148,45 +173,63 @@ def collect_situation_info(
         }
 
     # 유효한 모드 검증
-    if collect_mode not in ["weather_only", "event_only"]:
+    if collect_mode not in COLLECT_MODES:
         print(f"   ⚠️ 잘못된 collect_mode: {collect_mode}, 기본값 weather_only 사용")
         collect_mode = "weather_only"
 
     # 선택된 모드 로그
-    mode_emoji = "🌤️" if collect_mode == "weather_only" else "📅"
-    mode_name = "날씨 전용" if collect_mode == "weather_only" else "행사 전용"
+    mode_emoji = {"weather_only": "🌤️", "event_only": "📅", "both": "🌤️📅"}[collect_mode]
+    mode_name = {"weather_only": "날씨 전용", "event_only": "행사 전용", "both": "날씨 + 행사 (병렬)"}[collect_mode]
     print(f"   {mode_emoji} 수집 모드: {mode_name}")
 
     store = {"market_id": market_id}
     period = {"start": period_start, "end": period_end}
 
-    # 단일 모드 실행 (병렬 불필요)
-    events = None
-    wx = None
-
-    if collect_mode == "event_only":
-        try:
-            events = _call_events(market_id, period_start, period_end, user_query)
-        except Exception as e:
-            events = {
-                "has_valid_signal": False,
-                "summary": f"이벤트 수집 실패({e})",
-                "signals": [],
-                "citations": [],
-                "assumptions": []
-            }
-
-    elif collect_mode == "weather_only":
-        try:
-            wx = _call_weather(user_query, store, period)
-        except Exception as e:
-            wx = {
-                "has_valid_signal": False,
-                "summary": f"날씨 수집 실패({e})",
-                "signals": [],
-                "citations": [],
-                "assumptions": []
-            }
+    calls = {}
+    if collect_mode in ("event_only", "both"):
+        calls["events"] = (lambda: _call_events(market_id, period_start, period_end, user_query), EVENT_TIMEOUT_S)
+    if collect_mode in ("weather_only", "both"):
+        calls["weather"] = (lambda: _call_weather(user_query, store, period), WEATHER_TIMEOUT_S)
+
+    # 캐시 적중 소스는 바로 사용, 나머지만 실시간 수집
+    cache = get_situation_cache()
+    results, failed, cached = {}, [], []
+    for name in list(calls):
+        hit = cache.get(name, market_id, period_start, period_end, user_query)
+        if hit is not None:
+            results[name] = hit
+            cached.append(name)
+            del calls[name]
+    if cached:
+        print(f"   ♻️ 상황 캐시 사용: {', '.join(cached)}")
+
+    # 소스별 타임아웃으로 동시 실행 - 느린 소스를 기다리지 않도록 executor는 대기 없이 종료
+    started = time.monotonic()
+    deadline = get_deadline()
+    remaining = deadline.remaining() if deadline is not None else float("inf")
+    executor = ThreadPoolExecutor(max_workers=max(1, len(calls)), thread_name_prefix="situation")
+    try:
+        futures = {name: executor.submit(contextvars.copy_context().run, fn) for name, (fn, _) in calls.items()}
+        for name, future in futures.items():
+            timeout = min(calls[name][1], remaining)
+            label = "이벤트" if name == "events" else "날씨"
+            try:
+                results[name] = future.result(timeout=max(0.0, started + timeout - time.monotonic()))
+            except FutureTimeout:
+                print(f"   ⏱️ {label} 수집 시간 초과 ({timeout:g}s) - 나머지 소스만 병합")
+                results[name] = {"has_valid_signal": False, "summary": f"{label} 수집 시간 초과",
+                                 "signals": [], "citations": [], "assumptions": []}
+            except Exception as e:
+                results[name] = {"has_valid_signal": False, "summary": f"{label} 수집 실패({e})",
+                                 "signals": [], "citations": [], "assumptions": []}
+            if is_failure(results[name]):
+                failed.append(name)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    cache.put_many([(name, market_id, period_start, period_end, user_query, results[name]) for name in calls])
+
+    events = results.get("events")
+    wx = results.get("weather")
 
     # 안전 가드
     events = events or {"signals": [], "citations": [], "assumptions": [], "summary": None}
@@ -195,7 +238,8 @@ def collect_situation_info(
     # 병합
     ev_sig = events.get("signals") or []
     wx_sig = wx.get("signals") or []
-    signals = ev_sig + wx_sig
+    # 날씨/이벤트 교차 (날씨 먼저) - 앞쪽 N개만 쓰는 프롬프트에서 날씨 신호와 영향 수치가 빠지지 않도록
+    signals = [sig for pair in zip_longest(wx_sig, ev_sig) for sig in pair if sig is not None]
     has_valid = bool(signals)
 
     parts = []
@@ -213,6 +257,8 @@ def collect_situation_info(
         "assumptions": (events.get("assumptions") or []) + (wx.get("assumptions") or []),
         "event_count": len(ev_sig),
         "weather_count": len(wx_sig),
+        "failed_sources": failed,
+        "cached_sources": cached,
     }
 
     return merged
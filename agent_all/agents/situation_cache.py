@@ -0,0 +1,295 @@
+# agents/situation_cache.py
+"""
+상황 시그널 캐시 + 백그라운드 선계산 (prefetch)
+- SituationCache: (소스, 상권, 기간, 질의)별 Situation JSON 캐시 (메모리 + JSON 파일)
+  collect_situation_info가 먼저 조회하고, 미스일 때만 실시간 수집 후 결과를 저장 (read-through)
+- SituationPrefetcher: 설정 주기마다 MARKET_COORDINATES 전체 상권 × [오늘, 오늘+N일] 기간의
+  날씨 신호(detect_weather_signals_bulk, 일괄 1회)와 지정 상권의 이벤트 신호를 미리 계산
+  → 기본 기간(오늘~+7일) 전술 요청은 수집 대기 없이 캐시에서 응답
+
+    python -m agents.situation_cache --once                  # 1회 갱신 (cron 등 외부 스케줄러용)
+    python -m agents.situation_cache --interval 1800         # 주기 실행 (포그라운드)
+    MARKETING_SITUATION_PREFETCH=1 streamlit run ...         # 앱 프로세스 안에서 백그라운드 실행
+
+이벤트 신호는 사용자 질의별로 검색 쿼리가 달라지므로 질의 없는 기본 검색만 선계산합니다.
+페이지가 붙이는 모드 접두어("이벤트 분석", "날씨·이벤트 분석: ...")는 검색어가 아니므로 event_query_terms()로
+떼어낸 뒤 캐시 키와 Tavily 쿼리에 사용 → 힌트 없는 페이지 요청도 선계산 항목에 적중합니다.
+다른 프로세스(cron)가 갱신한 파일은 조회 시 수정 시각을 보고 다시 읽습니다.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from agents.backends import is_offline_tools
+
+SITUATION_CACHE_PATH = os.getenv(
+    "MARKETING_SITUATION_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache", "situation_signals.json"),
+)
+PREFETCH_INTERVAL_S = float(os.getenv("MARKETING_SITUATION_PREFETCH_INTERVAL_S", "1800"))
+PREFETCH_DAYS = int(os.getenv("MARKETING_SITUATION_PREFETCH_DAYS", "7"))
+# 이벤트 선계산 대상 상권: "" = 없음(기본, Tavily 호출 비용), "all" = 전체, "성수동,강남" = 지정
+PREFETCH_EVENT_MARKETS = os.getenv("MARKETING_PREFETCH_EVENT_MARKETS", "")
+# 캐시 항목 유효 시간 - 기본은 갱신 주기 2배 (갱신 1회 실패까지 허용)
+SITUATION_CACHE_TTL_S = float(os.getenv("MARKETING_SITUATION_CACHE_TTL_S", str(PREFETCH_INTERVAL_S * 2)))
+
+SOURCES = ("weather", "events")
+# 도구/수집 실패 결과의 요약 문구 (캐시하지 않음)
+FAILURE_MARKERS = ("수집 실패", "시간 초과", "미설치", "입력 누락")
+# 마케팅 AI Agent 페이지의 user_query 모드 접두어 ("{모드} 분석" / "{모드} 분석: {힌트}")
+MODE_QUERY_PREFIX = re.compile(r"^\s*(날씨·이벤트|날씨|이벤트)\s*분석\s*(:|$)")
+
+
+def event_query_terms(user_query: Optional[str]) -> Optional[str]:
+    """이벤트 검색에 실제로 쓰는 질의어 (모드 접두어 제거, 공백 정규화) - 남는 말이 없으면 None"""
+    query = MODE_QUERY_PREFIX.sub("", user_query or "")
+    query = " ".join(query.split())
+    return query or None
+
+
+def situation_key(source: str, market_id: str, start: str, end: str, user_query: Optional[str] = None) -> str:
+    # 날씨 신호는 질의와 무관 / 오프라인 스텁 결과는 실제 결과와 분리
+    query = (event_query_terms(user_query) or "") if source == "events" else ""
+    tools = "offline" if is_offline_tools() else "live"
+    return f"{tools}|{source}|{market_id}|{start}|{end}|{query}"
+
+
+def is_failure(result: Dict[str, Any]) -> bool:
+    if not isinstance(result, dict):
+        return True
+    summary = result.get("summary") or ""
+    return any(marker in summary for marker in FAILURE_MARKERS)
+
+
+class SituationCache:
+    """상황 시그널 캐시 (메모리 + JSON 파일, 스레드 안전)"""
+
+    def __init__(self, path: str = SITUATION_CACHE_PATH, ttl_s: float = SITUATION_CACHE_TTL_S):
+        self.path = path
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._mtime = 0.0
+        self.hits = 0
+        self.misses = 0
+        self._reload_if_changed()
+
+    def _reload_if_changed(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime <= self._mtime:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f).get("entries", {})
+        except Exception as e:
+            print(f"⚠️  상황 캐시 로드 실패 ({self.path}): {e}")
+            return
+        with self._lock:
+            # 파일 항목과 메모리 항목 중 최신 것 유지
+            for key, entry in entries.items():
+                if key not in self._entries or self._entries[key]["fetched_at"] < entry["fetched_at"]:
+                    self._entries[key] = entry
+            self._mtime = mtime
+
+    def _save(self):
+        now = time.time()
+        with self._lock:
+            self._entries = {k: v for k, v in self._entries.items() if v["expires_at"] > now}
+            entries = dict(self._entries)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"entries": entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        with self._lock:
+            self._mtime = os.path.getmtime(self.path)
+
+    def get(self, source: str, market_id: str, start: str, end: str,
+            user_query: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        self._reload_if_changed()
+        key = situation_key(source, market_id, start, end, user_query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry["expires_at"] <= time.time():
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry["result"]
+
+    def put_many(self, items: List[tuple]):
+        """[(source, market_id, start, end, user_query, result), ...] 저장 - 실패 결과는 제외"""
+        now = time.time()
+        stored = 0
+        with self._lock:
+            for source, market_id, start, end, user_query, result in items:
+                if is_failure(result):
+                    continue
+                self._entries[situation_key(source, market_id, start, end, user_query)] = {
+                    "result": result, "fetched_at": now, "expires_at": now + self.ttl_s,
+                }
+                stored += 1
+        if stored:
+            try:
+                self._save()
+            except OSError as e:
+                print(f"⚠️  상황 캐시 저장 실패 ({self.path}): {e}")
+
+    def put(self, source: str, market_id: str, start: str, end: str,
+            user_query: Optional[str], result: Dict[str, Any]):
+        self.put_many([(source, market_id, start, end, user_query, result)])
+
+    def stats(self) -> Dict[str, int]:
+        """캐시 적중 / 미스 / 저장된 항목 수"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+_SITUATION_CACHE: Optional[SituationCache] = None
+_SITUATION_CACHE_LOCK = threading.Lock()
+
+
+def get_situation_cache() -> SituationCache:
+    """프로세스 공용 상황 캐시"""
+    global _SITUATION_CACHE
+    with _SITUATION_CACHE_LOCK:
+        if _SITUATION_CACHE is None:
+            _SITUATION_CACHE = SituationCache()
+        return _SITUATION_CACHE
+
+
+def get_situation_cache_stats() -> Dict[str, int]:
+    return get_situation_cache().stats()
+
+
+# ============================================================================
+# Prefetcher
+# ============================================================================
+
+def _event_markets(setting: str, markets: List[str]) -> List[str]:
+    if setting.strip().lower() == "all":
+        return markets
+    return [m.strip() for m in setting.split(",") if m.strip()]
+
+
+class SituationPrefetcher:
+    """전체 상권 상황 시그널 주기 갱신 (데몬 스레드)"""
+
+    def __init__(self, interval_s: float = PREFETCH_INTERVAL_S, days: int = PREFETCH_DAYS,
+                 event_markets: str = PREFETCH_EVENT_MARKETS, cache: Optional[SituationCache] = None):
+        self.interval_s = interval_s
+        self.days = days
+        self.event_markets = event_markets
+        self.cache = cache or get_situation_cache()
+        self.last_refresh: Optional[Dict[str, Any]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh_once(self) -> Dict[str, Any]:
+        """[오늘, 오늘+days] 기간 날씨(전체 상권) + 이벤트(지정 상권) 선계산"""
+        # 순환 import 방지 (situation_agent가 이 모듈을 import)
+        from agents.market_coordinates import MARKET_COORDINATES
+        from agents.situation_agent import default_market_locator, _call_events
+        from tools.weather_signals import detect_weather_signals_bulk
+
+        started = time.perf_counter()
+        start = dt.date.today()
+        period = (start.isoformat(), (start + dt.timedelta(days=self.days)).isoformat())
+        markets = list(MARKET_COORDINATES)
+
+        items = []
+        try:
+            weather = detect_weather_signals_bulk(markets, *period, market_locator=default_market_locator)
+            items += [("weather", mid, *period, None, result) for mid, result in weather.items()]
+        except Exception as e:
+            print(f"⚠️  날씨 선계산 실패: {type(e).__name__}: {e}")
+
+        for mid in _event_markets(self.event_markets, markets):
+            items.append(("events", mid, *period, None, _call_events(mid, *period, None)))
+
+        self.cache.put_many(items)
+        summary = {
+            "period": period,
+            "weather": sum(1 for source, *_, result in items if source == "weather" and not is_failure(result)),
+            "events": sum(1 for source, *_, result in items if source == "events" and not is_failure(result)),
+            "failed": sum(1 for *_, result in items if is_failure(result)),
+            "elapsed_s": round(time.perf_counter() - started, 2),
+        }
+        self.last_refresh = summary
+        print(f"🔄 상황 시그널 선계산 {period[0]}~{period[1]}: 날씨 {summary['weather']}개 / "
+              f"이벤트 {summary['events']}개 / 실패 {summary['failed']}개 ({summary['elapsed_s']}s)")
+        return summary
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh_once()
+            except Exception as e:
+                print(f"⚠️  상황 시그널 선계산 오류: {type(e).__name__}: {e}")
+            self._stop.wait(self.interval_s)
+
+    def start(self) -> "SituationPrefetcher":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True, name="situation-prefetch")
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+_PREFETCHER: Optional[SituationPrefetcher] = None
+_PREFETCHER_LOCK = threading.Lock()
+
+
+def start_situation_prefetcher() -> SituationPrefetcher:
+    """프로세스 공용 선계산 스레드 시작 (이미 실행 중이면 그대로 반환)"""
+    global _PREFETCHER
+    with _PREFETCHER_LOCK:
+        if _PREFETCHER is None:
+            _PREFETCHER = SituationPrefetcher()
+        return _PREFETCHER.start()
+
+
+def _main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="상권별 상황 시그널 선계산")
+    parser.add_argument("--once", action="store_true", help="1회 갱신 후 종료")
+    parser.add_argument("--interval", type=float, default=PREFETCH_INTERVAL_S, help="갱신 주기(초)")
+    parser.add_argument("--days", type=int, default=PREFETCH_DAYS, help="오늘부터 선계산할 일수")
+    parser.add_argument("--event-markets", default=PREFETCH_EVENT_MARKETS,
+                        help='이벤트 선계산 상권 ("all" 또는 쉼표 구분, 기본: 없음)')
+    args = parser.parse_args()
+
+    prefetcher = SituationPrefetcher(args.interval, args.days, args.event_markets)
+    if args.once:
+        prefetcher.refresh_once()
+        return
+    prefetcher._run()
+
+
+if __name__ == "__main__":
+    _main()
+
+
+__all__ = [
+    "SituationCache",
+    "SituationPrefetcher",
+    "SITUATION_CACHE_PATH",
+    "situation_key",
+    "event_query_terms",
+    "is_failure",
+    "get_situation_cache",
+    "get_situation_cache_stats",
+    "start_situation_prefetcher",
+]
@@ -0,0 +1,168 @@
+# agents/strategy_templates.py
+"""
+군집 단위 전략 카드 템플릿 캐시 (strategy_generation_mode="template")
+- 같은 업종 + 같은 군집(cluster_id)의 가맹점은 STP 컨텍스트가 거의 같으므로
+  군집 공통 카드 골격(skeleton) 3장을 한 번만 생성하여 디스크(JSON)에 캐시
+- 가맹점 요청은 골격 + 가맹점 델타(군집 평균 대비 PC 점수, 4P 요약)만 담은
+  짧은 개인화 호출 1회로 처리 (사용자 요청은 이후 personalize_strategy_cards 노드에서 반영)
+- 골격은 요청 중 캐시 미스 시 생성하거나, 야간 배치로 미리 생성
+
+    python -m agents.strategy_templates            # 전체 업종 × 군집 골격 미리 생성
+    python -m agents.strategy_templates --force    # 기존 골격 무시하고 재생성
+
+키: 업종 | cluster_id | 데이터 버전 | 템플릿 버전 (데이터가 바뀌면 자동으로 새 골격 생성)
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from agents.singleflight import SingleFlight
+
+TEMPLATE_CACHE_PATH = os.getenv(
+    "MARKETING_TEMPLATE_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache", "strategy_templates.json"),
+)
+# 골격 프롬프트/스키마가 바뀌면 올려서 기존 캐시 무효화
+TEMPLATE_VERSION = "v1"
+# 개인화 호출의 가변 컨텍스트 예산 (토큰)
+PERSONALIZE_CONTEXT_BUDGET = int(os.getenv("MARKETING_PROMPT_BUDGET_PERSONALIZE", "600"))
+
+
+def template_key(industry: str, cluster_id: str, data_version: str) -> str:
+    return f"{industry}|{cluster_id}|{data_version}|{TEMPLATE_VERSION}"
+
+
+class StrategyTemplateCache:
+    """군집별 카드 골격 캐시 (메모리 + JSON 파일, 스레드 안전)"""
+
+    def __init__(self, path: str = TEMPLATE_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._templates: Dict[str, Dict[str, Any]] = {}
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.builds = 0
+        self._load()
+
+    def _read_file(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f).get("templates", {})
+        except Exception as e:
+            print(f"⚠️  전략 템플릿 캐시 로드 실패 ({self.path}): {e}")
+            return {}
+
+    def _load(self):
+        self._templates = self._read_file()
+
+    def _save(self):
+        """파일에 기록 (호출 측이 self._lock 보유) - 다른 프로세스가 저장한 골격과 합친 뒤 교체"""
+        for key, entry in self._read_file().items():
+            if key not in self._templates or self._templates[key]["created_at"] < entry["created_at"]:
+                self._templates[key] = entry
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"templates": self._templates}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            entry = self._templates.get(key)
+            return list(entry["cards"]) if entry else None
+
+    def put(self, key: str, cards: List[Dict[str, Any]], **meta):
+        with self._lock:
+            self._templates[key] = {"cards": cards, "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), **meta}
+            self._save()
+
+    def get_or_build(self, key: str, build: Callable[[], Optional[List[Dict[str, Any]]]],
+                     force: bool = False, **meta) -> tuple:
+        """
+        캐시된 골격 반환, 없으면 build()로 생성 후 저장 (같은 key 동시 생성은 1회로 합침)
+
+        Returns:
+            (cards 또는 None, cache_hit 여부) - build()가 None이면 저장하지 않음
+        """
+        cards = None if force else self.get(key)
+        with self._lock:
+            if cards is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if cards is not None:
+            return cards, True
+
+        def build_and_store():
+            built = build()
+            if built:
+                self.put(key, built, **meta)
+                with self._lock:
+                    self.builds += 1
+            return built
+
+        cards, _ = self._flight.do(key, build_and_store)
+        return cards, False
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._templates)
+
+    def stats(self) -> Dict[str, int]:
+        """캐시 적중 / 미스 / 골격 생성 수 / 저장된 골격 수"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "builds": self.builds, "templates": len(self._templates)}
+
+
+_TEMPLATE_CACHE: Optional[StrategyTemplateCache] = None
+_TEMPLATE_CACHE_LOCK = threading.Lock()
+
+
+def get_template_cache() -> StrategyTemplateCache:
+    """프로세스 공용 템플릿 캐시"""
+    global _TEMPLATE_CACHE
+    with _TEMPLATE_CACHE_LOCK:
+        if _TEMPLATE_CACHE is None:
+            _TEMPLATE_CACHE = StrategyTemplateCache()
+        return _TEMPLATE_CACHE
+
+
+def get_template_stats() -> Dict[str, int]:
+    return get_template_cache().stats()
+
+
+def _main():
+    import argparse
+
+    # 순환 import 방지 (marketing_system이 이 모듈을 import)
+    from agents.marketing_system import prebuild_cluster_templates
+
+    parser = argparse.ArgumentParser(description="군집별 전략 카드 골격 미리 생성 (야간 배치)")
+    parser.add_argument("--industries", nargs="*", help="대상 업종 (기본: 전체)")
+    parser.add_argument("--force", action="store_true", help="캐시된 골격 무시하고 재생성")
+    args = parser.parse_args()
+
+    summary = prebuild_cluster_templates(industries=args.industries, force=args.force)
+    print(f"✅ 골격 생성 {summary['built']}건 / 캐시 사용 {summary['cached']}건 / 실패 {summary['failed']}건")
+
+
+if __name__ == "__main__":
+    _main()
+
+
+__all__ = [
+    "StrategyTemplateCache",
+    "TEMPLATE_CACHE_PATH",
+    "TEMPLATE_VERSION",
+    "PERSONALIZE_CONTEXT_BUDGET",
+    "template_key",
+    "get_template_cache",
+    "get_template_stats",
+]
@@ -0,0 +1,142 @@
+# agents/streaming.py
+"""
+그래프 스트리밍 이벤트
+- LangGraph stream(stream_mode=["values", "custom"]) 결과를 타입이 있는 이벤트로 변환
+- 노드 내부(서브그래프 포함)에서 emit_event()로 custom 이벤트 전송 (예: 전략 카드 1개 완료)
+- 보고서/전술 카드/콘텐츠 가이드 노드의 토큰 스트리밍 (token_forwarder → 콜백 + report_token 이벤트)
+
+이벤트 종류:
+    stp_done       - STP 분석 완료 (data: STPOutput)
+    card_done      - 전략 카드 1개 완료 (data: StrategyCard, index: 1~3)
+    strategy_done  - 전략 카드 전체 완료 (data: List[StrategyCard])
+    report_token   - 보고서/전술 카드/콘텐츠 가이드 토큰 (data: str, node: 노드명)
+    report_done    - 최종 산출물 완료 (data: 보고서 텍스트 또는 content_guide, node: 노드명)
+    done           - 실행 완료 (data: run_marketing_system 결과 dict)
+    error          - 실행 실패 (data: 예외)
+
+스트리밍 실행이 아닐 때 emit_event()는 no-op이고, 토큰 콜백도 없으면 노드는 일반 invoke를 사용합니다.
+"""
+from __future__ import annotations
+
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Literal, Optional, TypedDict
+
+from langgraph.constants import CONFIG_KEY_STREAM_WRITER
+from langgraph.utils.config import get_configurable
+
+StreamEventType = Literal[
+    "stp_done", "card_done", "strategy_done", "report_token", "report_done", "done", "error"
+]
+
+TokenCallback = Callable[[str, str], None]  # (node, text)
+
+_TOKEN_CALLBACK: contextvars.ContextVar[Optional[TokenCallback]] = contextvars.ContextVar("marketing_token_callback", default=None)
+
+REPORT_OUTPUT_KEYS = {
+    "generate_comprehensive_report": "final_report",
+    "generate_tactical_card": "tactical_card",
+    "generate_content_guide": "content_guide",
+}
+REPORT_NODE_BY_TASK = {
+    "종합_전략_수립": "generate_comprehensive_report",
+    "상황_전술_제안": "generate_tactical_card",
+    "콘텐츠_생성_가이드": "generate_content_guide",
+}
+
+
+class StreamEvent(TypedDict, total=False):
+    """스트리밍 이벤트"""
+    type: StreamEventType
+    data: Any
+    node: str
+    index: int
+
+
+def _stream_writer() -> Optional[Callable[[Any], None]]:
+    try:
+        return get_configurable().get(CONFIG_KEY_STREAM_WRITER)
+    except RuntimeError:  # 그래프 실행 컨텍스트 밖
+        return None
+
+
+def emit_event(event_type: StreamEventType, data: Any = None, **extra):
+    """노드 내부에서 custom 스트림 이벤트 전송 (스트리밍 실행이 아니면 무시)"""
+    writer = _stream_writer()
+    if writer:
+        writer(StreamEvent(type=event_type, data=data, **extra))
+
+
+@contextmanager
+def use_token_callback(callback: Optional[TokenCallback]) -> Iterator[Optional[TokenCallback]]:
+    """현재 컨텍스트에 토큰 콜백 등록 - callback(node, text)"""
+    token = _TOKEN_CALLBACK.set(callback)
+    try:
+        yield callback
+    finally:
+        _TOKEN_CALLBACK.reset(token)
+
+
+def token_forwarder(node: str) -> Optional[Callable[[str], None]]:
+    """
+    노드의 LLM 토큰 전달 함수 (invoke_with_budget(on_token=...)용)
+
+    토큰 콜백도 스트리밍 실행도 아니면 None → 노드는 일반 invoke 사용
+    """
+    callback, writer = _TOKEN_CALLBACK.get(), _stream_writer()
+    if callback is None and writer is None:
+        return None
+
+    def forward(text: str):
+        if callback:
+            callback(node, text)
+        if writer:
+            writer(StreamEvent(type="report_token", data=text, node=node))
+    return forward
+
+
+def stream_graph(app, initial_state: Dict[str, Any], config: Dict[str, Any],
+                 emit: Callable[[StreamEvent], None]) -> Dict[str, Any]:
+    """
+    그래프를 스트리밍 실행하며 이벤트 전달
+
+    Returns:
+        최종 state (invoke 결과와 동일)
+    """
+    final_state = dict(initial_state)
+    sent = set()
+
+    def emit_once(key: str, event: StreamEvent):
+        if key not in sent:
+            sent.add(key)
+            emit(event)
+
+    for mode, chunk in app.stream(initial_state, config=config, stream_mode=["values", "custom"]):
+        if mode == "custom":
+            emit(chunk)
+        elif mode == "values":
+            final_state = chunk
+            # Supervisor가 다음 단계로 라우팅하면 이전 단계 산출물이 확정된 것
+            # (체크포인트 재사용으로 팀 노드가 생략된 경우도 포함)
+            next_node = chunk.get("next")
+            if next_node in ("strategy_planning_team", "personalize_strategy_cards") or next_node in REPORT_OUTPUT_KEYS:
+                emit_once("stp", StreamEvent(type="stp_done", data=chunk.get("stp_output")))
+            if next_node in REPORT_OUTPUT_KEYS:
+                emit_once("strategy", StreamEvent(type="strategy_done", data=chunk.get("strategy_cards")))
+
+    node = REPORT_NODE_BY_TASK.get(final_state.get("task_type"), "generate_comprehensive_report")
+    output = final_state.get(REPORT_OUTPUT_KEYS[node])
+    if output:
+        emit(StreamEvent(type="report_done", data=output, node=node))
+    return final_state
+
+
+__all__ = [
+    "StreamEvent",
+    "StreamEventType",
+    "TokenCallback",
+    "emit_event",
+    "stream_graph",
+    "use_token_callback",
+    "token_forwarder",
+]
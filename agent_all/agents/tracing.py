@@ -0,0 +1,234 @@
+# agents/tracing.py
+"""
+요청 단위 Span 트레이싱
+- 그래프 노드 / LLM 호출 / HTTP 호출 / 데이터 로드마다 span 기록
+- span: 소요시간, prompt/completion 토큰, 캐시 적중 여부, payload 크기
+- JSONL 및 Chrome trace-event JSON(chrome://tracing, Perfetto)으로 내보내기
+
+사용 예:
+    tracer = Tracer()
+    with use_tracer(tracer):
+        run_something()
+    tracer.export_jsonl("trace.jsonl")
+    tracer.export_chrome_trace("trace.json")
+
+트레이서가 활성화되지 않은 요청에서는 모든 span 호출이 no-op입니다.
+"""
+from __future__ import annotations
+
+import contextvars
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+_CURRENT_TRACER: contextvars.ContextVar[Optional["Tracer"]] = contextvars.ContextVar("marketing_tracer", default=None)
+_CURRENT_SPAN: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar("marketing_span", default=None)
+
+
+class Tracer:
+    """요청 1건의 span 수집기 (스레드 안전)"""
+
+    def __init__(self, trace_id: Optional[str] = None):
+        self.trace_id = trace_id or uuid.uuid4().hex[:12]
+        self.spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def _next_id(self) -> int:
+        with self._lock:
+            return next(self._ids)
+
+    def _add(self, record: Dict[str, Any]):
+        with self._lock:
+            self.spans.append(record)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """category별 호출 수 / 총 소요시간(ms) / 토큰 합계"""
+        out: Dict[str, Dict[str, float]] = {}
+        for sp in self.spans:
+            cat = out.setdefault(sp["cat"], {"count": 0, "total_ms": 0.0, "prompt_tokens": 0, "completion_tokens": 0})
+            cat["count"] += 1
+            cat["total_ms"] = round(cat["total_ms"] + sp["dur_ms"], 3)
+            cat["prompt_tokens"] += sp["attrs"].get("prompt_tokens") or 0
+            cat["completion_tokens"] += sp["attrs"].get("completion_tokens") or 0
+        return out
+
+    def export_jsonl(self, path: str) -> str:
+        """span 1개당 1줄 JSON"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for sp in sorted(self.spans, key=lambda x: x["start_us"]):
+                f.write(json.dumps({"trace_id": self.trace_id, **sp}, ensure_ascii=False, default=str) + "\n")
+        return path
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Chrome trace-event 형식 (complete event, ph='X')"""
+        events = []
+        for sp in sorted(self.spans, key=lambda x: x["start_us"]):
+            events.append({
+                "name": sp["name"],
+                "cat": sp["cat"],
+                "ph": "X",
+                "ts": sp["start_us"],
+                "dur": int(sp["dur_ms"] * 1000),
+                "pid": os.getpid(),
+                "tid": sp["thread"],
+                "args": {"span_id": sp["span_id"], "parent_id": sp["parent_id"], **sp["attrs"]},
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"trace_id": self.trace_id}}
+
+    def export_chrome_trace(self, path: str) -> str:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f, ensure_ascii=False, default=str)
+        return path
+
+
+def get_tracer() -> Optional[Tracer]:
+    """현재 컨텍스트의 트레이서 (비활성화 시 None)"""
+    return _CURRENT_TRACER.get()
+
+
+@contextmanager
+def use_tracer(tracer: Optional[Tracer]) -> Iterator[Optional[Tracer]]:
+    """현재 컨텍스트에 트레이서 활성화"""
+    token = _CURRENT_TRACER.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _CURRENT_TRACER.reset(token)
+
+
+@contextmanager
+def span(name: str, cat: str = "node", **attrs) -> Iterator[Dict[str, Any]]:
+    """
+    span 기록 컨텍스트
+
+    Args:
+        name: span 이름 (노드명, 모델명, URL 호스트 등)
+        cat: "node" | "llm" | "http" | "data" | "parse" | "queue"
+        **attrs: 초기 속성 (cache_hit, request_bytes 등)
+
+    Yields:
+        속성 dict - 블록 안에서 토큰 수 등을 추가로 기록
+    """
+    tracer = _CURRENT_TRACER.get()
+    if tracer is None:
+        yield dict(attrs)
+        return
+
+    parent = _CURRENT_SPAN.get()
+    record = {
+        "span_id": tracer._next_id(),
+        "parent_id": parent["span_id"] if parent else None,
+        "name": name,
+        "cat": cat,
+        "thread": threading.get_ident(),
+        "start_us": int(time.time() * 1_000_000),
+        "dur_ms": 0.0,
+        "attrs": dict(attrs),
+    }
+    token = _CURRENT_SPAN.set(record)
+    t0 = time.perf_counter()
+    try:
+        yield record["attrs"]
+    except BaseException as e:
+        record["attrs"]["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record["dur_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+        _CURRENT_SPAN.reset(token)
+        tracer._add(record)
+
+
+def annotate(**attrs):
+    """현재 span에 속성 추가 (트레이서 비활성화 시 무시)"""
+    current = _CURRENT_SPAN.get()
+    if current is not None:
+        current["attrs"].update(attrs)
+
+
+def traced_node(name: str) -> Callable[[Callable], Callable]:
+    """그래프 노드 함수용 데코레이터"""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name, cat="node"):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def payload_size(value: Any) -> int:
+    """payload 크기(bytes, UTF-8 기준)"""
+    if value is None:
+        return 0
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (list, tuple)):
+        return sum(payload_size(getattr(v, "content", v)) for v in value)
+    try:
+        return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+    except Exception:
+        return len(str(value).encode("utf-8"))
+
+
+def record_llm_usage(attrs: Dict[str, Any], response: Any):
+    """LangChain AIMessage(.usage_metadata)에서 토큰 수 기록"""
+    usage = getattr(response, "usage_metadata", None) or {}
+    attrs["prompt_tokens"] = usage.get("input_tokens")
+    attrs["completion_tokens"] = usage.get("output_tokens")
+    attrs["response_bytes"] = payload_size(getattr(response, "content", None))
+
+
+def traced_invoke(llm: Any, prompt: Any, name: str, **invoke_kwargs) -> Any:
+    """LLM invoke + span 기록"""
+    model = getattr(llm, "model", None) or type(llm).__name__
+    with span(name, cat="llm", model=str(model), cache_hit=False, request_bytes=payload_size(prompt)) as attrs:
+        response = llm.invoke(prompt, **invoke_kwargs)
+        record_llm_usage(attrs, response)
+        return response
+
+
+def traced_stream(llm: Any, prompt: Any, name: str, on_token: Callable[[str], None], **stream_kwargs) -> Any:
+    """LLM stream + span 기록 - 토큰 청크를 on_token으로 전달하고 합쳐진 메시지 반환"""
+    model = getattr(llm, "model", None) or type(llm).__name__
+    with span(name, cat="llm", model=str(model), cache_hit=False, streamed=True,
+              request_bytes=payload_size(prompt)) as attrs:
+        t0 = time.perf_counter()
+        response = None
+        for chunk in llm.stream(prompt, **stream_kwargs):
+            if response is None:
+                attrs["ttft_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+                response = chunk
+            else:
+                response = response + chunk
+            if isinstance(chunk.content, str) and chunk.content:
+                on_token(chunk.content)
+        if response is None:
+            from langchain_core.messages import AIMessage
+            response = AIMessage(content="")
+        record_llm_usage(attrs, response)
+        return response
+
+
+__all__ = [
+    "Tracer",
+    "get_tracer",
+    "use_tracer",
+    "span",
+    "annotate",
+    "traced_node",
+    "traced_invoke",
+    "traced_stream",
+    "record_llm_usage",
+    "payload_size",
+]
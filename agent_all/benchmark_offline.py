@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+"""
+오프라인 재현 벤치마크
+- LLM: FakeReplayChatModel (고정 응답 + 설정 가능한 지연시간)
+- 도구: Open-Meteo / Tavily 오프라인 스텁
+- task_type별로 run_marketing_system을 반복 실행하고 span 트레이스로
+  데이터 로드 / LLM / HTTP / 파싱 / 쿼터 대기 / 그래프 오버헤드(요청 전체 - 하위 항목 합) 시간을 집계
+- 디스크 캐시(섹션/상황/예보/이벤트 저장소/템플릿/체크포인트)는 실행마다 새 임시 디렉터리를 쓰고
+  보고서 섹션 캐시는 끔 → 이전 벤치마크 실행이나 .cache 상태와 무관하게 같은 조건
+  (--warm-cache 지정 시 기존 .cache와 섹션 캐시 사용)
+
+사용 예:
+    python benchmark_offline.py --runs 5 --latency-ms 200
+    python benchmark_offline.py --task-types 종합_전략_수립 --output bench.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from agents.backends import set_backends
+
+TASK_TYPES = ["종합_전략_수립", "상황_전술_제안", "콘텐츠_생성_가이드"]
+LEAF_CATEGORIES = ["data", "llm", "http", "parse", "queue"]
+# 디스크 캐시 경로 환경변수 → 파일명 (모듈 import 전에 임시 디렉터리로 지정)
+CACHE_PATH_ENV = {
+    "MARKETING_REPORT_SECTION_CACHE_PATH": "report_sections.json",
+    "MARKETING_SITUATION_CACHE_PATH": "situation_signals.json",
+    "MARKETING_FORECAST_CACHE_PATH": "forecast_cache.json",
+    "MARKETING_EVENT_STORE_PATH": "event_store.sqlite3",
+    "MARKETING_TEMPLATE_CACHE_PATH": "strategy_templates.json",
+    "MARKETING_CHECKPOINT_PATH": "checkpoints.sqlite3",
+}
+
+# 실행마다 동일한 입력 (날짜 고정 → 오프라인 날씨 스텁 결과도 고정)
+TACTICAL_INPUT = {
+    "target_market_id": "성수동",
+    "period_start": "2025-10-20",
+    "period_end": "2025-10-26",
+}
+
+
+def _percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def _breakdown(tracer) -> dict:
+    """트레이스 1건 → category별 소요시간(ms)"""
+    summary = tracer.summary()
+    out = {cat: summary.get(cat, {}).get("total_ms", 0.0) for cat in LEAF_CATEGORIES}
+    total = summary.get("request", {}).get("total_ms", 0.0)
+    out["total"] = total
+    # 병렬 LLM 호출이 겹치면 음수가 될 수 있어 0으로 보정
+    out["graph_overhead"] = max(0.0, total - sum(out[cat] for cat in LEAF_CATEGORIES))
+    return out
+
+
+def isolate_caches(directory: str):
+    """디스크 캐시를 directory로 돌리고 보고서 섹션 캐시를 끔 (agents/tools 모듈 import 전에 호출)"""
+    for name, filename in CACHE_PATH_ENV.items():
+        os.environ[name] = os.path.join(directory, filename)
+    os.environ["MARKETING_REPORT_SECTION_CACHE"] = "0"
+
+
+def run_benchmark(runs: int, task_types, store_id: str, store_name: str, quiet: bool = True) -> dict:
+    from agents.marketing_system import run_marketing_system
+
+    results = {}
+    for task_type in task_types:
+        samples = []
+        for _ in range(runs):
+            sink = io.StringIO() if quiet else None
+            with contextlib.redirect_stdout(sink) if quiet else contextlib.nullcontext():
+                result = run_marketing_system(
+                    target_store_id=store_id,
+                    target_store_name=store_name,
+                    task_type=task_type,
+                    trace=True,
+                    **(TACTICAL_INPUT if task_type == "상황_전술_제안" else {}),
+                )
+            samples.append(_breakdown(result["trace"]))
+
+        keys = ["total", "graph_overhead"] + LEAF_CATEGORIES
+        results[task_type] = {
+            key: {
+                "median_ms": round(statistics.median(s[key] for s in samples), 1),
+                "p95_ms": round(_percentile([s[key] for s in samples], 95), 1),
+            }
+            for key in keys
+        }
+    return results
+
+
+def print_report(results: dict):
+    print("=" * 80)
+    print("📊 오프라인 벤치마크 (median / p95, ms)")
+    print("=" * 80)
+    for task_type, stats in results.items():
+        print(f"\n🎯 {task_type}")
+        for key, value in stats.items():
+            print(f"   {key:<15} {value['median_ms']:>10.1f} / {value['p95_ms']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 재현 벤치마크 (fake LLM + 도구 스텁)")
+    parser.add_argument("--runs", type=int, default=3, help="task_type별 반복 횟수")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="fake LLM 응답 지연(ms)")
+    parser.add_argument("--task-types", nargs="+", default=TASK_TYPES, choices=TASK_TYPES)
+    parser.add_argument("--store-id", default=None, help="가맹점 ID (기본값: 포지셔닝 데이터 첫 가맹점)")
+    parser.add_argument("--output", default=None, help="결과 JSON 저장 경로")
+    parser.add_argument("--verbose", action="store_true", help="실행 로그 출력")
+    parser.add_argument("--warm-cache", action="store_true", help="기존 .cache와 보고서 섹션 캐시 사용")
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        if not args.warm_cache:
+            isolate_caches(stack.enter_context(tempfile.TemporaryDirectory(prefix="marketing-bench-")))
+        run(args)
+
+
+def run(args):
+    set_backends(llm="fake", tools="offline", fake_latency_ms=args.latency_ms)
+
+    from agents.marketing_system import PrecomputedPositioningLoader
+    loader = PrecomputedPositioningLoader()
+    loader.load_all_data()
+    positioning = loader.store_positioning
+    if args.store_id:
+        store_id = args.store_id
+        matched = positioning[positioning['가맹점구분번호'] == store_id]
+        store_name = matched.iloc[0]['가맹점명'] if not matched.empty else store_id
+    else:
+        store_id = positioning.iloc[0]['가맹점구분번호']
+        store_name = positioning.iloc[0]['가맹점명']
+
+    results = run_benchmark(args.runs, args.task_types, store_id, store_name, quiet=not args.verbose)
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"runs": args.runs, "latency_ms": args.latency_ms, "store_id": store_id, "warm_cache": args.warm_cache,
+                       "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"\n📁 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
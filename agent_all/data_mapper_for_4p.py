@@ -8,6 +8,8 @@ from typing import Dict, Optional
 from pathlib import Path
 import os
 
+from agents.tracing import span
+
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
 
 # ============================================================================
@@ -74,6 +76,11 @@ class DataLoaderFor4P:
 
     def load_all(self):
         """전체 데이터 로드 - 여러 인코딩 시도"""
+        with span("DataLoaderFor4P.load_all", cat="data") as attrs:
+            self._load_all()
+            attrs["rows"] = len(self.ds2) + len(self.ds3) + len(self.df_final)
+
+    def _load_all(self):
         encodings = ['utf-8-sig', 'cp949', 'euc-kr', 'utf-8']
 
         try:
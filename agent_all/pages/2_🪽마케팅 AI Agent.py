@@ -47,12 +47,22 @@ _sys.stderr = io.StringIO()
 # 메인 시스템 임포트
 sys.path.append(str(Path(__file__).parent.parent))
 from agents.marketing_system import (
-    run_marketing_system,
+    stream_marketing_system,
     PrecomputedPositioningLoader
 )
+from agents.tracing import span
+from agents.deadline import invoke_with_budget
+from agents.situation_cache import start_situation_prefetcher
+
+# 🔄 상황 시그널 백그라운드 선계산 (프로세스당 1개 스레드, rerun 시 재사용)
+if os.getenv("MARKETING_SITUATION_PREFETCH", "0") == "1":
+    start_situation_prefetcher()
 
 # 🔥 Intent 분류기 (내장)
-from langchain_google_genai import ChatGoogleGenerativeAI
+from agents.backends import get_chat_model, is_offline_tools
+from tools.http_client import http_get
+from agents.intent_classifier import get_intent_classifier, normalize_query
+from functools import lru_cache
 from pydantic import BaseModel
 from typing import Literal
 import json
@@ -64,11 +74,40 @@ class IntentClassification(BaseModel):
     reasoning: str
 
 def classify_user_intent(user_input: str) -> IntentClassification:
-    """사용자 입력 의도 분류 (초고속)"""
+    """
+    사용자 입력 의도 분류 (초고속)
 
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
+    로컬 문자 n-gram 분류기 결과의 confidence가 보정 임계값(clf.threshold) 이상이면 바로 반환하고,
+    미만일 때만 LLM 분류를 사용합니다 (같은 입력은 캐시).
+    """
+    clf = get_intent_classifier()
+    if clf is not None:
+        with span("classify_user_intent.local", cat="node") as attrs:
+            task_type, confidence = clf.predict(user_input)
+            attrs["confidence"] = confidence
+        if confidence >= clf.threshold:
+            return IntentClassification(task_type=task_type, confidence=confidence, reasoning="로컬 분류기")
+
+    try:
+        return _classify_user_intent_llm(normalize_query(user_input))
+    except Exception as e:
+        print(f"⚠️ LLM 분류 실패: {e}, 룰 베이스 사용")
+        # 폴백: 키워드 기반
+        user_lower = user_input.lower()
+        if any(k in user_lower for k in ['날씨', '비', '눈', '행사', '이벤트', '긴급', '오늘', '내일']):
+            return IntentClassification(task_type="상황_전술_제안", confidence=0.7, reasoning="키워드 매칭")
+        elif any(k in user_lower for k in ['콘텐츠', '인스타', '블로그', '포스팅', 'sns', '해시태그']):
+            return IntentClassification(task_type="콘텐츠_생성_가이드", confidence=0.7, reasoning="키워드 매칭")
+        else:
+            return IntentClassification(task_type="종합_전략_수립", confidence=0.6, reasoning="기본값")
+
+@lru_cache(maxsize=256)
+def _classify_user_intent_llm(user_input: str) -> IntentClassification:
+    """LLM 의도 분류 (정규화된 입력 기준 캐시, 실패 시 예외)"""
+
+    llm = get_chat_model(
         temperature=0.0,
+        model="gemini-2.5-flash",
         max_output_tokens=150
     )
 
@@ -83,29 +122,18 @@ def classify_user_intent(user_input: str) -> IntentClassification:
 JSON 출력 (예시):
 {{"task_type": "상황_전술_제안", "confidence": 0.9, "reasoning": "날씨 키워드 감지"}}"""
 
-    try:
-        response = llm.invoke(prompt)
-        content = response.content.strip()
+    # 실패는 캐시하지 않도록 예외를 호출자에게 전달
+    response = invoke_with_budget(llm, prompt, "classify_user_intent.llm", node="classify_user_intent")
+    content = response.content.strip()
 
-        # JSON 파싱
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0].strip()
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0].strip()
+    # JSON 파싱
+    if "```json" in content:
+        content = content.split("```json")[1].split("```")[0].strip()
+    elif "```" in content:
+        content = content.split("```")[1].split("```")[0].strip()
 
-        data = json.loads(content)
-        return IntentClassification(**data)
-
-    except Exception as e:
-        print(f"⚠️ LLM 분류 실패: {e}, 룰 베이스 사용")
-        # 폴백: 키워드 기반
-        user_lower = user_input.lower()
-        if any(k in user_lower for k in ['날씨', '비', '눈', '행사', '이벤트', '긴급', '오늘', '내일']):
-            return IntentClassification(task_type="상황_전술_제안", confidence=0.7, reasoning="키워드 매칭")
-        elif any(k in user_lower for k in ['콘텐츠', '인스타', '블로그', '포스팅', 'sns', '해시태그']):
-            return IntentClassification(task_type="콘텐츠_생성_가이드", confidence=0.7, reasoning="키워드 매칭")
-        else:
-            return IntentClassification(task_type="종합_전략_수립", confidence=0.6, reasoning="기본값")
+    data = json.loads(content)
+    return IntentClassification(**data)
 
 HAS_INTENT_CLASSIFIER = True
 
@@ -130,6 +158,9 @@ def fetch_moodboard_image(keyword: str, orientation: str = "portrait") -> dict:
     if not PEXELS_API_KEY:
         print("⚠️ PEXELS_API_KEY가 설정되지 않았습니다.")
         return None
+    if is_offline_tools():
+        # 오프라인 도구 모드: 외부 이미지 검색 생략
+        return None
 
     try:
         # URL 인코딩으로 한글 키워드 처리
@@ -139,7 +170,9 @@ def fetch_moodboard_image(keyword: str, orientation: str = "portrait") -> dict:
         url = f"https://api.pexels.com/v1/search?query={encoded_keyword}&per_page=15&page=1&orientation={orientation}"
         headers = {"Authorization": PEXELS_API_KEY}
 
-        response = requests.get(url, headers=headers, timeout=15)
+        with span("pexels.search", cat="http", cache_hit=False) as attrs:
+            response = http_get(url, headers=headers, timeout=15)
+            attrs["response_bytes"] = len(response.content)
 
         # 상세 에러 로깅
         if response.status_code == 401:
@@ -161,7 +194,9 @@ def fetch_moodboard_image(keyword: str, orientation: str = "portrait") -> dict:
                 fallback_keyword = "food" if "음식" in keyword or "맛" in keyword else "lifestyle"
                 encoded_fallback = urllib.parse.quote(fallback_keyword)
                 url = f"https://api.pexels.com/v1/search?query={encoded_fallback}&per_page=15&page=1&orientation={orientation}"
-                response = requests.get(url, headers=headers, timeout=15)
+                with span("pexels.search", cat="http", cache_hit=False) as attrs:
+                    response = http_get(url, headers=headers, timeout=15)
+                    attrs["response_bytes"] = len(response.content)
                 response.raise_for_status()
                 photos = response.json().get("photos", [])
 
@@ -740,9 +775,9 @@ with st.sidebar:
         # 상황 분석 모드 선택 (필수)
         situation_mode = st.radio(
             "📊 상황 분석 모드",
-            ["🌤️ 날씨 기반", "📅 이벤트 기반"],
+            ["🌤️ 날씨 기반", "📅 이벤트 기반", "🌤️📅 날씨 + 이벤트"],
             horizontal=True,
-            help="날씨 또는 이벤트 중 하나를 선택하세요"
+            help="날씨, 이벤트 또는 둘 다(동시 수집)를 선택하세요"
         )
 
         # 상권 정보 (필수)
@@ -763,7 +798,14 @@ with st.sidebar:
         # 상황별 힌트 입력
         st.markdown("#### 📝 상황 설명 (선택사항)")
 
-        if "날씨" in situation_mode:
+        if situation_mode == "🌤️📅 날씨 + 이벤트":
+            situation_hint = st.text_area(
+                "날씨·이벤트 상황",
+                placeholder="예: 주말 비 예보, 성수동 팝업스토어 오픈",
+                height=80,
+                help="예상되는 날씨와 이벤트 상황을 자유롭게 입력하세요"
+            )
+        elif "날씨" in situation_mode:
             situation_hint = st.text_area(
                 "날씨 상황",
                 placeholder="예: 이번 주 폭염 예보, 주말에 강한 비 예상",
@@ -781,14 +823,16 @@ with st.sidebar:
         # collect_mode 매핑 (marketing_system.py로 전달)
         collect_mode_mapping = {
             "🌤️ 날씨 기반": "weather_only",
-            "📅 이벤트 기반": "event_only"
+            "📅 이벤트 기반": "event_only",
+            "🌤️📅 날씨 + 이벤트": "both"
         }
         selected_collect_mode = collect_mode_mapping.get(situation_mode, "weather_only")
 
         # user_query 구성 (모드 + 힌트)
         mode_mapping = {
             "🌤️ 날씨 기반": "날씨",
-            "📅 이벤트 기반": "이벤트"
+            "📅 이벤트 기반": "이벤트",
+            "🌤️📅 날씨 + 이벤트": "날씨·이벤트"
         }
         mode_keyword = mode_mapping.get(situation_mode, "")
 
@@ -872,8 +916,17 @@ if analyze_button and selected_store_id:
 
     with st.spinner(""):
         try:
-            # 시스템 실행
-            result = run_marketing_system(
+            # 시스템 실행 (🔥 스트리밍: STP → 전략 카드 → 보고서 순으로 완료되는 대로 미리보기)
+            live = st.container()
+            live_status = live.empty()
+            live_map = live.empty()
+            live_cards = [col.empty() for col in live.columns(3)]
+            live_report = live.empty()
+            live_status.info("📊 STP 분석 중...")
+            report_text = ""
+            result = None
+
+            for event in stream_marketing_system(
                 target_store_id=selected_store_id,
                 target_store_name=selected_store_name,
                 task_type=task_type,
@@ -882,10 +935,40 @@ if analyze_button and selected_store_id:
                 period_start=str(period_start) if period_start else None,
                 period_end=str(period_end) if period_end else None,
                 content_channels=content_channels,
-                collect_mode=selected_collect_mode  # 사용자 선택 모드 전달
-            )
-            
+                collect_mode=selected_collect_mode,  # 사용자 선택 모드 전달
+                reuse_checkpoint=True  # 같은 가맹점 후속 질문은 STP·전략 카드·보고서 섹션 재사용
+            ):
+                if event["type"] == "stp_done":
+                    live_status.info("🎯 전략 카드 생성 중...")
+                    fig = create_positioning_map(event["data"]) if event["data"] else None
+                    if fig:
+                        live_map.plotly_chart(fig, width='stretch')
+                elif event["type"] == "card_done" and 1 <= event.get("index", 0) <= 3:
+                    live_cards[event["index"] - 1].markdown(render_strategy_card(event["data"], event["index"]))
+                elif event["type"] == "strategy_done":
+                    live_status.info("📄 최종 결과 작성 중...")
+                elif event["type"] == "report_token":
+                    report_text += event["data"]
+                    if event.get("node") == "generate_content_guide":
+                        # 콘텐츠 가이드는 JSON 생성 → 원문 미리보기
+                        live_report.code(report_text, language="json")
+                    else:
+                        live_report.markdown(report_text)
+                elif event["type"] == "error":
+                    raise event["data"]
+                elif event["type"] == "done":
+                    result = event["data"]
+
+            # 미리보기 영역 정리 후 최종 탭 렌더링
+            live_status.empty()
+            live_map.empty()
+            live_report.empty()
+            for card_slot in live_cards:
+                card_slot.empty()
+
             st.success("✅ 분석 완료!")
+            if result.get('degraded'):
+                st.warning("⏱️ 응답 시간 제한으로 일부 결과는 데이터 기반 요약으로 제공됩니다.")
             
             # ================================================================
             # 🔥 작업 유형별 탭 구성 (전략 카드 포함)
@@ -0,0 +1,26 @@
+# tests/conftest.py
+"""
+공용 테스트 설정
+- agent_all을 import 경로에 추가 (agents.*, tools.* 모듈)
+- 모듈 import 전에 오프라인 백엔드 + 캐시/저장소 경로를 임시 디렉터리로 지정 (.cache 오염 방지)
+"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+_CACHE_DIR = tempfile.mkdtemp(prefix="marketing-tests-")
+os.environ.setdefault("MARKETING_LLM_BACKEND", "fake")
+os.environ.setdefault("MARKETING_TOOLS_BACKEND", "offline")
+for _name, _file in (
+    ("MARKETING_TEMPLATE_CACHE_PATH", "strategy_templates.json"),
+    ("MARKETING_REPORT_SECTION_CACHE_PATH", "report_sections.json"),
+    ("MARKETING_CHECKPOINT_PATH", "checkpoints.sqlite3"),
+    ("MARKETING_SITUATION_CACHE_PATH", "situation_signals.json"),
+    ("MARKETING_FORECAST_CACHE_PATH", "forecast_cache.json"),
+    ("MARKETING_EVENT_STORE_PATH", "event_store.sqlite3"),
+):
+    os.environ[_name] = os.path.join(_CACHE_DIR, _file)
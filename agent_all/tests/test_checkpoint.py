@@ -0,0 +1,76 @@
+# tests/test_checkpoint.py
+from agents.deadline import Deadline, use_deadline
+
+STORE_ID, STORE_NAME = "FCA7A6787B", "로스*****"
+
+
+def _state(**overrides):
+    state = {"target_store_id": STORE_ID, "data_version": "v1", "user_query": "매출 분석",
+             "strategy_generation_mode": "single", "phase_keys": {}}
+    state.update(overrides)
+    return state
+
+
+def test_strategy_phase_key_includes_generation_mode():
+    from agents.marketing_system import _phase_key
+
+    single = _phase_key(_state(), "strategy")
+    assert single != _phase_key(_state(strategy_generation_mode="parallel"), "strategy")
+    assert _phase_key(_state(), "stp") == _phase_key(_state(strategy_generation_mode="parallel"), "stp")
+
+
+def test_degraded_phase_is_current_only_within_its_request():
+    from agents.marketing_system import _completed_phase_keys, _phase_is_current, _phase_key
+
+    deadline = Deadline(60)
+    with use_deadline(deadline):
+        keys = _completed_phase_keys(_state(), "strategy")
+        assert keys["strategy"] == _phase_key(_state(), "strategy")
+        deadline.mark_degraded("strategy_4p_agent", "budget")
+        keys = _completed_phase_keys(_state(phase_keys=keys), "strategy")
+        assert keys["strategy"] != _phase_key(_state(), "strategy")
+        assert _phase_is_current(_state(phase_keys=keys), "strategy")
+        assert _completed_phase_keys(_state(), "stp")["stp"] == _phase_key(_state(), "stp")
+
+    # 다음 요청 (제한 없음 / 새 deadline)
+    assert not _phase_is_current(_state(phase_keys=keys), "strategy")
+    with use_deadline(Deadline(60)):
+        assert not _phase_is_current(_state(phase_keys=keys), "strategy")
+
+
+def test_degraded_run_is_not_reused_by_later_runs():
+    from agents.checkpoint import get_checkpointer
+    from agents.marketing_system import _phase_key, create_super_graph, run_marketing_system
+
+    kwargs = dict(task_type="종합_전략_수립", user_query="매출 분석", reuse_checkpoint=True, coalesce=False)
+    degraded = run_marketing_system(STORE_ID, STORE_NAME, deadline_s=1e-6, **kwargs)
+    assert any(d["node"] == "strategy_4p_agent" for d in degraded["degraded_nodes"])
+
+    app = create_super_graph(checkpointer=get_checkpointer())
+    saved = app.get_state({"configurable": {"thread_id": f"store_{STORE_ID}"}}).values
+    assert saved["phase_keys"]["stp"] == _phase_key(saved, "stp")
+    assert saved["phase_keys"]["strategy"] != _phase_key(saved, "strategy")
+
+    # 제한 없는 다음 실행은 폴백 카드를 재사용하지 않고 다시 생성해 저장
+    fresh = run_marketing_system(STORE_ID, STORE_NAME, deadline_s=None, **kwargs)
+    assert not fresh["degraded"]
+    saved = app.get_state({"configurable": {"thread_id": f"store_{STORE_ID}"}}).values
+    assert saved["phase_keys"]["strategy"] == _phase_key(saved, "strategy")
+
+
+def test_checkpoints_persist_across_saver_instances(tmp_path):
+    from agents.checkpoint import FileCheckpointSaver
+    from agents.marketing_system import create_super_graph
+
+    path = str(tmp_path / "checkpoints.sqlite3")
+    saver = FileCheckpointSaver(path, max_per_thread=2)
+    config = {"configurable": {"thread_id": "store_persist"}}
+    app = create_super_graph(checkpointer=saver)
+    app.update_state(config, {"target_store_id": "A", "phase_keys": {"stp": "k1"}})
+    app.update_state(config, {"phase_keys": {"stp": "k2"}})
+    app.update_state(config, {"phase_keys": {"stp": "k3"}})
+
+    reloaded = FileCheckpointSaver(path, max_per_thread=2)
+    assert len(reloaded.storage["store_persist"][""]) == 2          # 보관 한도 밖의 행은 파일에서도 삭제
+    values = create_super_graph(checkpointer=reloaded).get_state(config).values
+    assert values["target_store_id"] == "A" and values["phase_keys"]["stp"] == "k3"
@@ -0,0 +1,47 @@
+# tests/test_deadline.py
+import contextvars
+import threading
+import time
+
+import pytest
+
+from agents.deadline import Deadline, DeadlineExceeded, invoke_with_budget, use_deadline
+
+
+class _SlowLLM:
+    def __init__(self, delay_s):
+        self.delay_s = delay_s
+
+    def invoke(self, prompt, **kwargs):
+        time.sleep(self.delay_s)
+        return "ok"
+
+
+def test_sequential_calls_share_node_budget():
+    deadline = Deadline(10, shares={"node": 0.03})  # 노드 예산 0.3초
+    llm = _SlowLLM(0.2)
+    with use_deadline(deadline):
+        assert invoke_with_budget(llm, "p", "first", node="node") == "ok"
+        with pytest.raises(DeadlineExceeded):
+            invoke_with_budget(llm, "p", "second", node="node")
+    assert deadline.spent("node") == pytest.approx(0.3, abs=0.08)
+    # 다른 노드 예산은 그대로
+    assert deadline.budget("other") > 2
+
+
+def test_concurrent_calls_count_overlap_once():
+    deadline = Deadline(10, shares={"node": 0.1})
+    llm = _SlowLLM(0.2)
+    with use_deadline(deadline):
+        workers = [threading.Thread(target=contextvars.copy_context().run,
+                                    args=(invoke_with_budget, llm, "p", f"card_{i}"), kwargs={"node": "node"})
+                   for i in range(3)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+    assert deadline.spent("node") == pytest.approx(0.2, abs=0.08)
+
+
+def test_no_deadline_calls_directly():
+    assert invoke_with_budget(_SlowLLM(0), "p", "x", node="node") == "ok"
@@ -0,0 +1,73 @@
+# tests/test_event_store.py
+import tools.tavily_events as tavily_events
+from tools.event_store import EventStore
+from tools.offline_stubs import FakeTavilySearch
+
+AREA = "성수동"
+INPUT = {"store": {"market_id": "M45"}, "period": {"start": "2024-03-04", "end": "2024-03-10"}}
+
+
+def _item(url, snippet):
+    return {"title": "지역 이벤트", "url": url, "snippet": snippet, "query": "q"}
+
+
+def test_partial_put_is_not_covered(tmp_path):
+    store = EventStore(str(tmp_path / "events.sqlite3"))
+    store.put(AREA, "2024-03", [_item("https://a.example/1", "디올 향수 전시가 연무장길에서 열린다")], complete=False)
+    assert store.covered_months(AREA, ["2024-03"]) == set()
+    assert len(store.events(AREA, ["2024-03"])) == 1
+
+    store.put(AREA, "2024-03", [_item("https://a.example/1", "디올 향수 전시가 연무장길에서 열린다")])
+    assert store.covered_months(AREA, ["2024-03"]) == {"2024-03"}
+    assert len(store.events(AREA, ["2024-03"])) == 1  # 같은 URL은 다시 저장하지 않음
+
+
+def test_month_with_failed_query_is_refetched(tmp_path, monkeypatch):
+    store = EventStore(str(tmp_path / "events.sqlite3"))
+    monkeypatch.setattr(tavily_events, "get_event_store", lambda: store)
+    calls = []
+    real_invoke = FakeTavilySearch.invoke
+
+    def flaky_invoke(self, query):
+        calls.append(query)
+        if "행사" in query and len(calls) <= 4:
+            raise TimeoutError("tavily timeout")
+        return real_invoke(self, query)
+
+    monkeypatch.setattr(FakeTavilySearch, "invoke", flaky_invoke)
+
+    first = tavily_events.search_event_signals(INPUT)
+    assert first["signals"]                        # 성공한 쿼리의 이벤트는 그대로 응답
+    assert store.covered_months(AREA, ["2024-03"], "offline") == set()
+
+    n_first = len(calls)
+    tavily_events.search_event_signals(INPUT)
+    assert len(calls) == 2 * n_first               # 일부 실패한 월은 전체 쿼리를 다시 질의
+    assert store.covered_months(AREA, ["2024-03"], "offline") == {"2024-03"}
+
+    tavily_events.search_event_signals(INPUT)
+    assert len(calls) == 2 * n_first               # 수집 완료된 월은 저장소에서 응답
+
+
+def test_multi_month_period_queries_once(tmp_path, monkeypatch):
+    store = EventStore(str(tmp_path / "events.sqlite3"))
+    monkeypatch.setattr(tavily_events, "get_event_store", lambda: store)
+    calls = []
+    real_invoke = FakeTavilySearch.invoke
+
+    def counting_invoke(self, query):
+        calls.append(query)
+        return real_invoke(self, query)
+
+    monkeypatch.setattr(FakeTavilySearch, "invoke", counting_invoke)
+
+    two_months = {**INPUT, "period": {"start": "2024-03-25", "end": "2024-04-07"}}
+    result = tavily_events.search_event_signals(two_months)
+    assert result["signals"]
+    assert len(calls) == len(tavily_events._queries(AREA, "2024-03-25", "2024-04-07", None))  # 월별이 아닌 기간 1회
+    assert any("3월~4월" in q for q in calls)
+    assert store.covered_months(AREA, ["2024-03", "2024-04"], "offline") == {"2024-03", "2024-04"}
+
+    n_first = len(calls)
+    tavily_events.search_event_signals({**INPUT, "period": {"start": "2024-04-01", "end": "2024-04-30"}})
+    assert len(calls) == n_first                   # 결과를 월별로 저장 → 4월 단독 요청도 저장소에서 응답
@@ -0,0 +1,55 @@
+# tests/test_forecast_cache.py
+import datetime as dt
+import time
+
+import pytest
+
+from tools import forecast_cache
+from tools.forecast_cache import ForecastCache, forecast_expiry
+
+
+def test_past_period_uses_long_ttl():
+    now = time.time()
+    assert forecast_expiry(now, "2020-01-01") == pytest.approx(now + forecast_cache.PAST_TTL_HOURS * 3600)
+
+
+def test_forecast_expires_at_next_model_update():
+    period = forecast_cache.FORECAST_UPDATE_HOURS * 3600
+    lag = forecast_cache.FORECAST_UPDATE_LAG_MIN * 60
+    end = (dt.date.today() + dt.timedelta(days=7)).isoformat()
+    fetched_at = 1_700_000_000.0
+    expires = forecast_expiry(fetched_at, end)
+    assert fetched_at < expires <= fetched_at + period
+    assert (expires - lag) % period == 0          # 갱신 경계 + 반영 지연
+
+
+def _fetcher(calls, fail=False):
+    def fetch(timeout, retries):
+        calls.append((timeout, retries))
+        if fail:
+            raise TimeoutError("open-meteo timeout")
+        return {"daily": {"n": len(calls)}}
+    return fetch
+
+
+def test_fresh_hit_then_stale_read_on_refresh_failure(tmp_path):
+    cache = ForecastCache(str(tmp_path / "forecast.json"))
+    end = (dt.date.today() + dt.timedelta(days=3)).isoformat()
+    args = (37.54, 127.05, dt.date.today().isoformat(), end, "temperature_2m_max")
+    calls = []
+
+    data, meta = cache.get_or_fetch(*args, fetch=_fetcher(calls))
+    assert meta == {"cache_hit": False, "stale": False, "age_s": 0.0}
+    assert calls == [(forecast_cache.FETCH_TIMEOUT_S, None)]
+    assert cache.get_or_fetch(*args, fetch=_fetcher(calls))[1]["cache_hit"] and len(calls) == 1
+
+    key = forecast_cache.forecast_key(*args)
+    cache._entries[key]["expires_at"] = time.time() - 60                  # 만료 (stale 허용 시간 내)
+    data, meta = cache.get_or_fetch(*args, fetch=_fetcher(calls, fail=True))
+    assert meta["stale"] and data == {"daily": {"n": 1}}
+    assert calls[-1] == (forecast_cache.STALE_REFRESH_TIMEOUT_S, 0)        # 짧은 타임아웃, 재시도 없음
+
+    cache._entries[key]["expires_at"] = time.time() - forecast_cache.FORECAST_MAX_STALE_HOURS * 3600 - 60
+    with pytest.raises(TimeoutError):
+        cache.get_or_fetch(*args, fetch=_fetcher(calls, fail=True))
+    assert cache.stats()["stale_hits"] == 1
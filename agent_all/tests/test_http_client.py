@@ -0,0 +1,56 @@
+# tests/test_http_client.py
+import pytest
+import requests
+
+from tools import http_client
+from tools.http_client import HttpClient, backoff_delay
+
+
+class _Response:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def close(self):
+        pass
+
+
+def _client(monkeypatch, responses):
+    client = HttpClient(max_retries=2, host_limits={})
+    calls = []
+
+    def request(method, url, timeout=None, **kwargs):
+        calls.append(method)
+        item = responses.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    monkeypatch.setattr(client.session, "request", request)
+    monkeypatch.setattr(http_client.time, "sleep", lambda s: None)
+    return client, calls
+
+
+def test_get_retries_retryable_status_and_connection_errors(monkeypatch):
+    client, calls = _client(monkeypatch, [_Response(503), requests.ConnectionError("reset"), _Response(200)])
+    assert client.get("https://api.example.com/x").status_code == 200
+    assert calls == ["GET"] * 3
+    stats = client.stats()["api.example.com"]
+    assert stats["requests"] == 3 and stats["errors"] == 2 and stats["retries"] == 2
+
+
+def test_post_is_not_retried_by_default(monkeypatch):
+    client, calls = _client(monkeypatch, [_Response(503), _Response(200)])
+    assert client.post("https://api.example.com/x").status_code == 503
+    assert calls == ["POST"]
+
+    client, calls = _client(monkeypatch, [requests.Timeout("slow")] * 3)
+    with pytest.raises(requests.Timeout):
+        client.get("https://api.example.com/x")
+    assert len(calls) == 3
+
+
+def test_backoff_honors_retry_after_within_cap():
+    assert backoff_delay(0, "1") >= 1
+    assert backoff_delay(10, "3600") == http_client.HTTP_BACKOFF_MAX_S
+    assert 0 <= backoff_delay(1) <= http_client.HTTP_BACKOFF_BASE_S * 2
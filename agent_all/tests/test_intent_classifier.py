@@ -0,0 +1,40 @@
+# tests/test_intent_classifier.py
+import pytest
+
+from agents.intent_classifier import CharNgramIntentClassifier, get_intent_classifier, load_labeled_queries
+
+
+@pytest.fixture(scope="module")
+def clf():
+    return get_intent_classifier()
+
+
+@pytest.mark.parametrize("text", ["asdf qwer", "아무거나", "안녕하세요"])
+def test_out_of_vocabulary_input_goes_to_llm(clf, text):
+    _, confidence = clf.predict(text)
+    assert confidence < clf.threshold
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("내일 비 온다는데 프로모션 추천", "상황_전술_제안"),
+    ("인스타 게시물 써줘", "콘텐츠_생성_가이드"),
+    ("우리 가게 전략", "종합_전략_수립"),
+])
+def test_in_domain_queries_stay_local(clf, text, expected):
+    label, confidence = clf.predict(text)
+    assert label == expected and confidence >= clf.threshold
+
+
+def test_scores_are_length_normalized(clf):
+    # 같은 문장을 반복해도 사후확률이 1로 쏠리지 않음
+    short = clf.predict_proba("매출 올리고 싶어")
+    repeated = clf.predict_proba(" ".join(["매출 올리고 싶어"] * 5))
+    assert max(repeated.values()) == pytest.approx(max(short.values()), abs=0.05)
+
+
+def test_threshold_is_chosen_on_held_out_folds():
+    queries, labels = load_labeled_queries()
+    strict = CharNgramIntentClassifier().fit(queries, labels).calibrate(queries, labels, target_precision=1.0)
+    loose = CharNgramIntentClassifier().fit(queries, labels).calibrate(queries, labels, target_precision=0.5)
+    assert 0.5 < loose.threshold <= strict.threshold <= 1.0
+    assert strict.scale > 1.0
@@ -0,0 +1,43 @@
+# tests/test_llm_quota.py
+import threading
+import time
+
+import pytest
+
+from agents.llm_quota import LocalBuckets, QuotaManager, _Buckets
+
+
+def test_buckets_base_is_abstract():
+    with pytest.raises(TypeError):
+        _Buckets(60, 1000)
+
+
+def test_interactive_requests_go_before_queued_batch():
+    manager = QuotaManager(rpm=600, tpm=0, lock_path=None)   # 0.1초마다 요청 1건
+    manager._buckets._state["requests"] = 0                  # 버킷이 빈 상태에서 시작
+    order = []
+
+    def call(name, priority):
+        manager.acquire(0, priority)
+        order.append(name)
+
+    threads = [threading.Thread(target=call, args=(f"batch-{i}", "batch")) for i in range(2)]
+    for t in threads:
+        t.start()
+    time.sleep(0.03)
+    threads.append(threading.Thread(target=call, args=("interactive", "interactive")))
+    threads[-1].start()
+    for t in threads:
+        t.join()
+
+    assert order[0] == "interactive"                         # 먼저 기다리던 batch보다 앞
+    stats = manager.stats()
+    assert stats["interactive"]["requests"] == 1 and stats["batch"]["requests"] == 2
+
+
+def test_settle_returns_unused_tokens():
+    buckets = LocalBuckets(rpm=0, tpm=600)
+    assert buckets.try_take(500) == 0
+    assert buckets.try_take(500) > 0
+    buckets.adjust_tokens(400)                               # 예약 500 중 100만 사용
+    assert buckets.try_take(450) == 0
@@ -0,0 +1,68 @@
+# tests/test_near_dup.py
+from tools.near_dup import EVENT_TITLE_PLACEHOLDER, event_duplicate_labels, minhash_signatures, near_duplicate_labels
+
+# TavilySearchResults.invoke() 실제 결과 형태: 제목/answer 없이 url + content
+LIVE_RESULTS = [
+    {"url": "https://news.example.com/a/1", "content": "성수동 디올 팝업스토어가 10월 3일부터 문을 연다. 뷰티 체험존과 한정판 굿즈를 선보인다."},
+    {"url": "https://blog.example.com/b/2", "content": "성수 샤넬 향수 전시가 연무장길에서 열린다. 향수 아카이브와 조향 클래스가 함께 진행된다."},
+    {"url": "https://www.example.org/c/3", "content": "서울숲 재즈 페스티벌 라인업 공개, 주말 이틀 동안 야외 무대에서 공연이 이어진다."},
+    {"url": "https://magazine.example.net/d/4", "content": "성수동 카페 거리에서 커피 박람회가 개최되어 로스터리 스무 곳이 참여한다."},
+    {"url": "https://event.example.kr/e/5", "content": "무신사 스탠다드 성수 플래그십 매장 리뉴얼 기념 할인 행사가 2주간 열린다."},
+]
+
+
+def _as_items(results):
+    """tavily_events가 저장소/신호용으로 만드는 항목과 같은 매핑"""
+    return [{"title": r.get("title") or EVENT_TITLE_PLACEHOLDER, "url": r.get("url"),
+             "snippet": r.get("content") or r.get("answer") or ""} for r in results]
+
+
+def test_live_shape_results_are_not_merged():
+    labels = event_duplicate_labels(_as_items(LIVE_RESULTS), area="성수동")
+    assert labels == [0, 1, 2, 3, 4]
+
+
+def test_live_shape_near_duplicate_content_is_merged():
+    results = LIVE_RESULTS + [
+        {"url": "https://another.example.com/x", "content": "성수동 디올 팝업스토어가 10월 3일부터 문을 연다! 뷰티 체험존과 한정판 굿즈를 선보인다"},
+    ]
+    labels = event_duplicate_labels(_as_items(results), area="성수동")
+    assert labels[:5] == [0, 1, 2, 3, 4]
+    assert labels[5] == 0
+
+
+def test_empty_fields_never_match():
+    items = [{"title": EVENT_TITLE_PLACEHOLDER, "url": f"https://x.example/{i}", "snippet": ""} for i in range(4)]
+    assert event_duplicate_labels(items, area="성수동") == [0, 1, 2, 3]
+
+
+def test_titles_differing_only_in_brand_are_distinct():
+    items = [
+        {"title": "성수 디올 팝업스토어 오픈 일정 안내", "url": "https://a.example/1", "snippet": ""},
+        {"title": "성수 샤넬 팝업스토어 오픈 일정 안내", "url": "https://a.example/2", "snippet": ""},
+        {"title": "[성수] 디올 팝업 스토어 오픈! 10월 일정", "url": "https://b.example/3", "snippet": ""},
+    ]
+    assert event_duplicate_labels(items, area="성수동") == [0, 1, 0]
+
+
+def test_same_url_key_is_duplicate():
+    sigs = minhash_signatures(["", "", ""])
+    assert near_duplicate_labels([sigs], keys=["a", "b", "a"]) == [0, 1, 0]
+
+
+class _LiveShapeTavily:
+    """실제 TavilySearchResults처럼 [{url, content}]만 돌려주는 도구 (쿼리와 무관하게 같은 결과)"""
+
+    def invoke(self, query):
+        return [dict(r) for r in LIVE_RESULTS]
+
+
+def test_search_event_signals_keeps_distinct_live_events():
+    from tools.tavily_events import search_event_signals
+
+    out = search_event_signals(
+        {"store": {"market_id": "M45"}, "period": {"start": "2025-10-01", "end": "2025-10-07"}},
+        tavily=_LiveShapeTavily(),
+    )
+    snippets = [s["details"]["snippet"] for s in out["signals"]]
+    assert snippets == [r["content"] for r in LIVE_RESULTS]
@@ -0,0 +1,42 @@
+# tests/test_prompt_budget.py
+from agents.prompt_budget import (PromptSection, collapse_4p_summary, dedupe_lines, estimate_tokens,
+                                  fit_section_texts, round_numbers, _trim_to)
+
+
+def test_lossless_compression():
+    assert dedupe_lines("a\n a \n\n\nb\n") == "a\n\nb"
+    assert round_numbers("PC1=0.123456, n=12") == "PC1=0.12, n=12"
+    summary = {"Price": {"insights": [{"source": "가격 데이터", "안정성": "안정", "비율": 0.4567, "빈값": ""}]},
+               "Place": {"insights": []}}
+    assert collapse_4p_summary(summary) == "- Price [가격 데이터] 안정성=안정 · 비율=0.46"
+
+
+def test_low_priority_sections_are_trimmed_first():
+    store = "가맹점 " * 50
+    signals = "\n".join(f"신호 {i} 설명입니다" for i in range(40))
+    sources = "\n".join(f"https://source.example/{i}" for i in range(40))
+    sections = [
+        PromptSection(name="store", text=store, priority=0, required=True),
+        PromptSection(name="signals", text=signals, priority=1),
+        PromptSection(name="sources", text=sources, priority=2),
+    ]
+    budget = estimate_tokens(store) + 150
+    texts = fit_section_texts("test_node", sections, budget=budget)
+    assert texts["store"] == store.strip()
+    assert texts["sources"] == ""                                   # 가장 덜 중요한 섹션부터 생략
+    assert texts["signals"].startswith("신호 0") and "생략" in texts["signals"]
+    assert sum(estimate_tokens(t) for t in texts.values()) <= budget
+
+
+def test_dedupe_keeps_repeated_lines_of_separate_items():
+    signals = "- 맑음 28도\n- 예상 영향(방문 증가)\n- 흐림 18도\n- 예상 영향(방문 증가)"
+    assert dedupe_lines(signals) == signals
+    assert dedupe_lines("a\na\nb") == "a\nb"
+
+
+def test_trim_marker_fits_in_budget():
+    text = "\n".join(f"신호 {i} 설명입니다" for i in range(40))
+    for budget in range(5, estimate_tokens(text), 7):
+        trimmed = _trim_to(text, budget)
+        assert estimate_tokens(trimmed) <= budget
+        assert not trimmed or trimmed.endswith("줄 생략)")
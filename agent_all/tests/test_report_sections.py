@@ -0,0 +1,118 @@
+# tests/test_report_sections.py
+import threading
+import time
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from agents.report_sections import ReportSection, SectionCache, build_report
+
+
+class _EchoLLM:
+    """프롬프트를 지연 후 그대로 돌려주는 LLM (동시 호출 수 기록)"""
+
+    def __init__(self, delay_s=0.2):
+        self.delay_s = delay_s
+        self.calls = []
+        self.active = self.peak = 0
+        self._lock = threading.Lock()
+
+    def _enter(self, prompt):
+        with self._lock:
+            self.calls.append(prompt)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay_s)
+        with self._lock:
+            self.active -= 1
+
+    def invoke(self, prompt, **kwargs):
+        self._enter(prompt)
+        return AIMessage(content=f"{prompt} 본문")
+
+    def stream(self, prompt, **kwargs):
+        self._enter(prompt)
+        for word in (prompt, " 본문"):
+            yield AIMessageChunk(content=word)
+
+
+def _sections():
+    return [
+        ReportSection("overview", "개요", deps=("store",), render=lambda s: "개요 표"),
+        ReportSection("positioning", "포지셔닝", deps=("stp",), prompt=lambda s: "포지셔닝"),
+        ReportSection("strategy", "전략", deps=("selected_strategy",), prompt=lambda s: "전략"),
+        ReportSection("request", "요청", deps=("user_query",), prompt=lambda s: f"요청 {s['user_query']}"),
+    ]
+
+
+STATE = {"target_store_id": "S1", "target_store_name": "가게", "stp_output": {"a": 1},
+         "selected_strategy": {"title": "카드"}, "user_query": "매출"}
+EXPECTED = "# 보고서\n\n## 1. 개요\n\n개요 표\n\n## 2. 포지셔닝\n\n포지셔닝 본문\n\n## 3. 전략\n\n전략 본문\n\n## 4. 요청\n\n요청 매출 본문"
+
+
+def test_sections_generate_concurrently_in_order(tmp_path):
+    llm, tokens = _EchoLLM(), []
+    started = time.perf_counter()
+    report = build_report("node", "# 보고서", _sections(), STATE, llm, on_token=tokens.append,
+                          cache=SectionCache(str(tmp_path / "sections.json")))
+    elapsed = time.perf_counter() - started
+
+    assert report == EXPECTED
+    assert "".join(tokens).strip() == EXPECTED
+    assert llm.peak == 3 and elapsed < 0.5
+
+
+def test_changed_input_regenerates_only_its_section(tmp_path):
+    cache = SectionCache(str(tmp_path / "sections.json"))
+    build_report("node", "# 보고서", _sections(), STATE, _EchoLLM(0), cache=cache)
+
+    llm = _EchoLLM(0)
+    report = build_report("node", "# 보고서", _sections(), {**STATE, "user_query": "재방문"}, llm, cache=cache)
+    assert llm.calls == ["요청 재방문"]
+    assert report.endswith("요청 재방문 본문")
+    # 파일 캐시도 같은 내용
+    assert SectionCache(str(tmp_path / "sections.json")).stats()["entries"] == 4
+
+
+def test_follow_up_queries_reuse_cards_and_sections():
+    from agents.marketing_system import run_marketing_system
+    from agents.report_sections import get_report_section_stats
+
+    def llm_calls(result, node):
+        return sum(1 for sp in result["trace"].spans if sp["cat"] == "llm" and sp["name"].startswith(f"{node}."))
+
+    def run(query):
+        return run_marketing_system(*store, user_query=query, reuse_checkpoint=True, coalesce=False, trace=True)
+
+    store = ("16184E93D9", "성우**")  # 다른 테스트의 체크포인트와 겹치지 않는 가맹점
+    first = run("매출 올리는 전략")
+    assert llm_calls(first, "strategy_4p_agent") > 0
+    assert llm_calls(first, "personalize_strategy_cards") == 1
+
+    before = get_report_section_stats()
+    follow_ups = ["20대 여성 타겟 전략", "재방문율 높이는 방법", "객단가 올리는 가격 전략"]
+    card_calls = personalize_calls = 0
+    for query in follow_ups:
+        result = run(query)
+        card_calls += llm_calls(result, "strategy_4p_agent")
+        personalize_calls += llm_calls(result, "personalize_strategy_cards")
+    after = get_report_section_stats()
+
+    hits, misses = after["hits"] - before["hits"], after["misses"] - before["misses"]
+    assert card_calls == 0                             # 기본 카드는 재사용
+    assert personalize_calls == len(follow_ups)        # 사용자 요청 반영은 질문마다 1회
+    # 후속 질문마다 user_request 섹션만 새로 생성 (positioning/strategy/roadmap 재사용)
+    assert (hits, misses) == (3 * len(follow_ups), len(follow_ups))
+
+    repeated = run(follow_ups[-1])                    # 같은 질문은 반영 결과도 재사용
+    assert llm_calls(repeated, "strategy_4p_agent") == llm_calls(repeated, "personalize_strategy_cards") == 0
+
+
+def test_save_merges_sections_written_by_other_processes(tmp_path):
+    path = str(tmp_path / "sections.json")
+    first, second = SectionCache(path), SectionCache(path)
+    first.put("a", "A")
+    first.save()
+    second.put("b", "B")
+    second.save()
+    reloaded = SectionCache(path)
+    assert reloaded.get("a") == "A" and reloaded.get("b") == "B"
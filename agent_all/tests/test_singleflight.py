@@ -0,0 +1,174 @@
+# tests/test_singleflight.py
+import threading
+import time
+
+import pytest
+
+from agents.singleflight import SingleFlight
+
+
+def _run_concurrently(targets):
+    threads = [threading.Thread(target=t) for t in targets]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def test_concurrent_calls_share_one_execution():
+    flight, calls, results = SingleFlight(), [], []
+    started = threading.Event()
+
+    def work():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return "value"
+
+    def leader():
+        results.append(flight.do("k", work))
+
+    def follower():
+        started.wait()
+        results.append(flight.do("k", work))
+
+    _run_concurrently([leader, follower, follower])
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True]
+    assert {value for value, _ in results} == {"value"}
+    assert flight.stats() == {"executions": 1, "coalesced": 2, "in_flight": 0}
+
+
+def test_in_flight_is_per_key():
+    flight, seen = SingleFlight(), {}
+
+    def work():
+        seen["a"], seen["b"], seen["total"] = flight.in_flight("a"), flight.in_flight("b"), flight.in_flight()
+        return None
+
+    flight.do("a", work)
+    assert seen == {"a": 1, "b": 0, "total": 1}
+    assert flight.in_flight("a") == 0
+
+
+def test_followers_receive_leader_error():
+    flight = SingleFlight()
+    started = threading.Event()
+    errors = []
+
+    def fail():
+        started.set()
+        time.sleep(0.05)
+        raise ValueError("boom")
+
+    def leader():
+        with pytest.raises(ValueError):
+            flight.do("k", fail)
+
+    def follower():
+        started.wait()
+        try:
+            flight.do("k", fail)
+        except ValueError as e:
+            errors.append(e)
+
+    _run_concurrently([leader, follower])
+    assert len(errors) == 1 and flight.in_flight() == 0
+
+
+def test_request_coalescing_key_and_message(monkeypatch):
+    from agents import marketing_system
+
+    release = threading.Event()
+    executions = []
+
+    def fake_execute(*args):
+        executions.append(args)
+        release.wait(1)
+        return {"final_report": "ok"}
+
+    monkeypatch.setattr(marketing_system, "_execute_marketing_system", fake_execute)
+    messages, results = [], []
+
+    def call(**kwargs):
+        results.append(marketing_system.run_marketing_system("S1", "가게", progress_callback=messages.append, **kwargs))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    while not marketing_system._REQUEST_FLIGHT.in_flight():
+        time.sleep(0.01)
+    others = [threading.Thread(target=call, kwargs=kw) for kw in ({}, {"reuse_checkpoint": True}, {"trace": True})]
+    for t in others:
+        t.start()
+    time.sleep(0.1)
+    release.set()
+    for t in [leader] + others:
+        t.join()
+
+    assert len(executions) == 3  # 리더 + 체크포인트 재사용 요청 + 트레이스 요청
+    assert sorted(r["coalesced"] for r in results) == [False, False, False, True]
+    assert messages.count("♻️ 동일한 분석이 진행 중이어서 결과를 공유합니다...") == 1
+
+
+def test_do_stream_replays_events_to_late_followers():
+    import queue
+
+    flight = SingleFlight()
+    halfway, release = threading.Event(), threading.Event()
+
+    def work(emit):
+        emit("stp_done")
+        emit("card_1")
+        halfway.set()
+        release.wait(1)
+        emit("report")
+        return "result"
+
+    leader_events, follower_events = queue.Queue(), queue.Queue()
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do_stream("k", work, leader_events.put)))
+    leader.start()
+    halfway.wait(1)
+    follower = threading.Thread(target=lambda: results.append(flight.do_stream("k", work, follower_events.put)))
+    follower.start()
+    time.sleep(0.05)
+    release.set()
+    leader.join()
+    follower.join()
+
+    expected = ["stp_done", "card_1", "report"]
+    assert list(leader_events.queue) == expected and list(follower_events.queue) == expected
+    assert sorted(results) == [("result", False), ("result", True)]
+
+
+def test_streaming_requests_are_coalesced(monkeypatch):
+    from agents import marketing_system
+
+    started = threading.Event()
+    executions = []
+
+    def fake_execute(*args):
+        emit = args[-2]
+        executions.append(args)
+        emit({"type": "stp_done", "data": None})
+        started.set()
+        time.sleep(0.1)
+        emit({"type": "strategy_done", "data": []})
+        return {"final_report": "ok"}
+
+    monkeypatch.setattr(marketing_system, "_execute_marketing_system", fake_execute)
+    streams = []
+
+    def consume():
+        streams.append([e["type"] for e in marketing_system.stream_marketing_system("S2", "가게")])
+
+    first = threading.Thread(target=consume)
+    first.start()
+    started.wait(1)
+    second = threading.Thread(target=consume)
+    second.start()
+    first.join()
+    second.join()
+
+    assert len(executions) == 1
+    assert streams == [["stp_done", "strategy_done", "done"]] * 2
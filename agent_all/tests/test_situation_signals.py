@@ -0,0 +1,45 @@
+# tests/test_situation_signals.py
+from agents import situation_agent
+
+
+def _source(kind, n):
+    return {
+        "has_valid_signal": True, "summary": kind, "citations": [], "assumptions": [],
+        "signals": [{"signal_id": f"{kind}-{i}", "signal_type": kind, "description": f"{kind} {i}",
+                     "details": {"tmax_overall": 31.5, "pop_mean": 70.0} if kind == "weather" else {}}
+                    for i in range(n)],
+    }
+
+
+def test_both_mode_keeps_weather_within_prompt_budget(monkeypatch):
+    monkeypatch.setattr(situation_agent, "_call_events", lambda *a: _source("event", 8))
+    monkeypatch.setattr(situation_agent, "_call_weather", lambda *a: _source("weather", 2))
+    merged = situation_agent.collect_situation_info("M-order-test", "2025-07-01", "2025-07-07", collect_mode="both")
+
+    types = [s["signal_type"] for s in merged["signals"]]
+    assert types[:4] == ["weather", "event", "weather", "event"]
+    assert len(types) == 10 and types.count("weather") == 2
+    assert merged["weather_count"] == 2 and merged["event_count"] == 8
+
+
+def test_weather_facts_read_first_weather_signal():
+    from agents.marketing_system import _weather_facts
+
+    signals = _source("event", 2)["signals"] + _source("weather", 1)["signals"]
+    assert _weather_facts(signals) == "최고기온 31.5°C, 강수확률 70%"
+    assert _weather_facts(_source("event", 2)["signals"]) == ""
+
+
+def test_page_mode_prefix_hits_prefetched_events(tmp_path):
+    from agents.situation_cache import SituationCache, event_query_terms
+
+    assert event_query_terms("이벤트 분석") is None
+    assert event_query_terms("날씨·이벤트 분석") is None
+    assert event_query_terms("날씨·이벤트 분석:  주말  팝업") == "주말 팝업"
+    assert event_query_terms("성수 팝업 분석") == "성수 팝업 분석"
+
+    cache = SituationCache(str(tmp_path / "situation.json"))
+    result = _source("event", 1)
+    cache.put("events", "M45", "2025-07-01", "2025-07-07", None, result)   # 선계산 (질의 없음)
+    assert cache.get("events", "M45", "2025-07-01", "2025-07-07", "날씨·이벤트 분석") == result
+    assert cache.get("events", "M45", "2025-07-01", "2025-07-07", "이벤트 분석: 주말 팝업") is None
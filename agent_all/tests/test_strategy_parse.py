@@ -0,0 +1,21 @@
+# tests/test_strategy_parse.py
+import json
+
+from agents.marketing_system import _parse_strategy_cards_json, _repair_json_text
+
+CARD = ('{"title": "“동네 단골” 만들기", "positioning_concept": "“가성비” 대신 경험", '
+        '"strategy_4p": {"product": "p", "price": "q", "place": "r", "promotion": "s"}, '
+        '"expected_outcome": "재방문 10%↑", "priority": "High"}')
+
+
+def test_repair_keeps_typographic_quotes_inside_strings():
+    text = '{"strategy_cards": [' + CARD + ',]}'          # 후행 쉼표 → 보정 경로
+    data = json.loads(_repair_json_text(text))
+    assert data["strategy_cards"][0]["title"] == "“동네 단골” 만들기"
+    cards, status = _parse_strategy_cards_json(text, [])
+    assert status == "repaired" and cards[0].positioning_concept == "“가성비” 대신 경험"
+
+
+def test_repair_replaces_structural_smart_quotes():
+    text = '{“title”: “카드 “A” 전략”, “items”: [“x”, “y”]'  # 잘린 출력
+    assert json.loads(_repair_json_text(text)) == {"title": "카드 “A” 전략", "items": ["x", "y"]}
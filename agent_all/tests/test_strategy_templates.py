@@ -0,0 +1,71 @@
+# tests/test_strategy_templates.py
+import contextvars
+import threading
+import time
+
+import pytest
+
+from agents.deadline import Deadline, DeadlineExceeded, call_with_budget, get_deadline, use_deadline
+from agents.strategy_templates import StrategyTemplateCache
+
+CARDS = [{"title": "골격 카드"}]
+
+
+def _slow_build(delay_s, calls):
+    def build():
+        calls.append(get_deadline())
+        time.sleep(delay_s)
+        return CARDS
+    return build
+
+
+def test_skeleton_build_past_deadline_is_cached(tmp_path):
+    cache = StrategyTemplateCache(str(tmp_path / "templates.json"))
+    calls = []
+
+    def build():
+        with use_deadline(None):
+            return _slow_build(0.3, calls)()
+
+    with use_deadline(Deadline(10, shares={"node": 0.01})):   # 노드 예산 0.1초
+        with pytest.raises(DeadlineExceeded):
+            call_with_budget(lambda: cache.get_or_build("k", build), "node", what="골격 생성")
+
+    time.sleep(0.4)
+    assert calls == [None]                       # 골격 생성은 요청 deadline 밖에서 실행
+    assert cache.get_or_build("k", build) == (CARDS, True)
+    assert cache.stats()["builds"] == 1
+
+
+def test_waiter_uses_own_budget_not_leaders_timeout(tmp_path):
+    cache = StrategyTemplateCache(str(tmp_path / "templates.json"))
+    calls = []
+    build = _slow_build(0.3, calls)
+    results = {}
+
+    def request(name, share):
+        with use_deadline(Deadline(10, shares={"node": share})):
+            try:
+                results[name] = call_with_budget(lambda: cache.get_or_build("k", build), "node")
+            except DeadlineExceeded:
+                results[name] = "timeout"
+
+    leader = threading.Thread(target=contextvars.copy_context().run, args=(request, "leader", 0.01))
+    leader.start()
+    time.sleep(0.05)
+    waiter = threading.Thread(target=contextvars.copy_context().run, args=(request, "waiter", 0.1))
+    waiter.start()
+    leader.join()
+    waiter.join()
+
+    assert results["leader"] == "timeout"
+    assert results["waiter"] == (CARDS, False)   # 선행 생성에 합류해 결과를 받음 (캐시 미스)
+    assert len(calls) == 1
+
+
+def test_save_keeps_skeletons_written_by_other_processes(tmp_path):
+    path = str(tmp_path / "templates.json")
+    first, second = StrategyTemplateCache(path), StrategyTemplateCache(path)
+    first.put("a", CARDS)
+    second.put("b", CARDS)                        # second는 a를 읽기 전에 생성됨
+    assert sorted(StrategyTemplateCache(path).keys()) == ["a", "b"]
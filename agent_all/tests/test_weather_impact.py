@@ -0,0 +1,40 @@
+# tests/test_weather_impact.py
+import pandas as pd
+import pytest
+
+from tools.weather_impact import WeatherImpactIndex
+
+COLUMNS = ["상권", "업종", "날씨변수", "비즈니스변수", "고조건 평균", "저조건 평균", "샘플수(고)", "샘플수(저)"]
+
+
+@pytest.fixture
+def index(tmp_path):
+    rows = {
+        "업종+상권별_날씨_영향.csv": [["성수", "카페", "강수량", "매출", 80.0, 100.0, 10, 20]],
+        "상권별_날씨_영향.csv": [["성수", "", "평균기온", "방문", 120.0, 100.0, 5, 5]],
+        "업종별_날씨_영향.csv": [["", "카페", "강수량", "매출", 90.0, 100.0, 30, 30]],
+    }
+    for name, data in rows.items():
+        pd.DataFrame(data, columns=COLUMNS).to_csv(tmp_path / name)
+    return WeatherImpactIndex(str(tmp_path))
+
+
+def test_most_specific_level_wins(index):
+    level, rows = index.rows("성수동", "카페", "강수량")     # "성수동" → "성수" 상권명 후보
+    assert level == "업종+상권" and len(rows) == 1
+    assert index.rows("강남", "카페", "강수량")[0] == "업종"
+    level, rows = index.rows("강남", "한식", "강수량")
+    assert level is None and len(rows) == 0
+
+
+def test_low_direction_is_relative_to_high_condition(index):
+    signals = [
+        {"signal_id": "WX-1", "signal_type": "weather"},
+        {"signal_id": "EV-1", "signal_type": "event"},
+        {"signal_id": "WXC-1", "signal_type": "weather"},
+    ]
+    rain, event, cold = index.signal_impact(signals, "성수동", "카페")
+    assert rain[0]["change_pct"] == -20.0 and rain[0]["samples"] == 30
+    assert event == []
+    # 한파(저조건): (100 - 120) / 120 × 100
+    assert cold[0]["direction"] == "low" and cold[0]["change_pct"] == pytest.approx(-16.7)
@@ -0,0 +1,296 @@
+# tools/event_store.py
+"""
+이벤트 단서 로컬 저장소 (SQLite + FTS5 전문 검색)
+- Tavily로 수집한 이벤트를 (지역, 월) 단위로 저장하고, 수집한 (지역, 월)은 coverage 테이블에 기록
+  → search_event_signals는 저장된 (지역, 월)은 저장소에서 바로 응답하고 미수집 월만 Tavily에 질의
+- 중복 제거: URL(스킴/www/추적 파라미터/끝 슬래시/fragment 제거)과 제목(NFKC, 공백, 사이트명 꼬리표 제거) 정규화 키
+  + 저장 시 같은 (지역, 월)의 기존 이벤트와 근사 중복(tools.near_dup, MinHash/LSH)인 항목은 제외
+- 전문 검색: events_fts (FTS5, 한글 부분 일치를 위해 trigram 토크나이저 - 미지원 SQLite면 unicode61 접두 검색)
+- TTL: 지난 달은 만료 없음, 이번 달 이후는 EVENT_STORE_TTL_HOURS마다 다시 수집 (새 공지 반영)
+
+사용 예:
+    store = get_event_store()
+    store.search("팝업스토어", area="성수동")          # 자유 텍스트 조회 (bm25 순)
+    store.events("성수동", ["2025-10"], source="live")  # (지역, 월) 이벤트 (수집 순)
+
+오프라인 스텁 결과는 source="offline"으로 실제 결과와 분리해 저장합니다.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from tools.near_dup import event_duplicate_labels
+
+EVENT_STORE_PATH = os.getenv(
+    "MARKETING_EVENT_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache", "event_store.sqlite3"),
+)
+# "0"이면 저장소를 쓰지 않고 매 요청 Tavily 질의
+EVENT_STORE_ENABLED = os.getenv("MARKETING_EVENT_STORE", "1") != "0"
+EVENT_STORE_TTL_HOURS = float(os.getenv("MARKETING_EVENT_STORE_TTL_HOURS", "24"))
+
+# 비교 시 버리는 추적용 쿼리 파라미터 (utm_* 포함)
+TRACKING_PARAMS = {"fbclid", "gclid", "ref", "ref_src"}
+# "제목 - 네이버 블로그", "제목 | 사이트명" 같은 사이트명 꼬리표
+_TITLE_SUFFIX = re.compile(r"\s+[-|:·]\s+[^-|:·]{1,20}$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    area TEXT NOT NULL,
+    month TEXT NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT,
+    snippet TEXT,
+    title_key TEXT NOT NULL,
+    url_key TEXT NOT NULL,
+    query TEXT,
+    fetched_at REAL NOT NULL,
+    UNIQUE (source, area, month, url_key, title_key)
+);
+CREATE TABLE IF NOT EXISTS coverage (
+    source TEXT NOT NULL,
+    area TEXT NOT NULL,
+    month TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (source, area, month)
+);
+CREATE TRIGGER IF NOT EXISTS events_ai AFTER INSERT ON events BEGIN
+    INSERT INTO events_fts (rowid, title, snippet, area) VALUES (new.id, new.title, new.snippet, new.area);
+END;
+"""
+
+
+def normalize_url(url: Optional[str]) -> str:
+    """비교용 URL 키 (소문자 호스트, www/추적 파라미터/fragment/끝 슬래시 제거)"""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query)
+                             if not (k.lower().startswith("utm_") or k.lower() in TRACKING_PARAMS)))
+    return urlunsplit(("", host, parts.path.rstrip("/"), query, "")).lstrip("/")
+
+
+def normalize_title(title: Optional[str]) -> str:
+    """비교용 제목 키 (NFKC, 소문자, 사이트명 꼬리표/괄호 기호 제거, 공백 정리)"""
+    text = unicodedata.normalize("NFKC", title or "").strip()
+    text = _TITLE_SUFFIX.sub("", text)
+    text = re.sub(r"[\[\]()<>「」『』【】\"'“”‘’]", " ", text.lower())
+    return " ".join(text.split())
+
+
+def month_periods(start: str, end: str) -> List[Tuple[str, str, str]]:
+    """기간 → [(월 "YYYY-MM", 월 내 시작일, 월 내 종료일), ...]"""
+    s, e = dt.date.fromisoformat(start), dt.date.fromisoformat(end)
+    periods = []
+    first = s.replace(day=1)
+    while first <= e:
+        following = (first + dt.timedelta(days=32)).replace(day=1)
+        periods.append((f"{first:%Y-%m}", max(s, first).isoformat(),
+                        min(e, following - dt.timedelta(days=1)).isoformat()))
+        first = following
+    return periods
+
+
+class EventStore:
+    """(지역, 월)별 이벤트 저장소 (SQLite, 스레드 안전 - 작업마다 연결)"""
+
+    def __init__(self, path: str = EVENT_STORE_PATH, ttl_hours: float = EVENT_STORE_TTL_HOURS):
+        self.path = path
+        self.ttl_s = ttl_hours * 3600
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            self.tokenizer = self._create_fts(conn)
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """작업 단위 연결 (정상 종료 시 commit, 항상 close)"""
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _create_fts(conn: sqlite3.Connection) -> str:
+        for tokenizer in ("trigram", "unicode61"):
+            try:
+                conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5("
+                             f"title, snippet, area UNINDEXED, content='events', content_rowid='id', "
+                             f"tokenize='{tokenizer}')")
+            except sqlite3.OperationalError:
+                continue
+            # 기존 파일이면 생성 당시 토크나이저를 사용
+            sql = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'events_fts'").fetchone()[0]
+            return "trigram" if "trigram" in sql else "unicode61"
+        raise sqlite3.OperationalError("FTS5 미지원 SQLite")
+
+    def _fresh_after(self, month: str) -> float:
+        """month 수집분이 유효한 최소 fetched_at (지난 달은 0 = 만료 없음)"""
+        if month < f"{dt.date.today():%Y-%m}":
+            return 0.0
+        return time.time() - self.ttl_s
+
+    def covered_months(self, area: str, months: Sequence[str], source: str = "live") -> Set[str]:
+        """months 중 유효한 수집 기록이 있는 월"""
+        if not months:
+            return set()
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT month, fetched_at FROM coverage WHERE source = ? AND area = ? "
+                f"AND month IN ({','.join('?' * len(months))})", (source, area, *months)).fetchall()
+        covered = {r["month"] for r in rows if r["fetched_at"] >= self._fresh_after(r["month"])}
+        with self._lock:
+            self.hits += len(covered)
+            self.misses += len(set(months) - covered)
+        return covered
+
+    def put(self, area: str, month: str, items: Iterable[Dict[str, Any]], source: str = "live",
+            complete: bool = True):
+        """
+        (지역, 월) 수집 결과 저장 + 수집 기록 갱신
+
+        이미 저장된 이벤트 또는 앞선 새 항목과 근사 중복(near_dup)인 항목은 저장하지 않습니다
+        → (지역, 월)마다 실제 행사 하나당 대표 이벤트 1건.
+        complete=False(월의 쿼리 일부 실패)면 이벤트만 저장하고 수집 기록은 남기지 않아 다음 요청에서 다시 수집합니다.
+        """
+        now = time.time()
+        items = list(items)
+        with self._connect() as conn:
+            existing = [dict(r) for r in conn.execute(
+                "SELECT title, url, snippet FROM events WHERE source = ? AND area = ? AND month = ? ORDER BY id",
+                (source, area, month))]
+        candidates = existing + items
+        labels = event_duplicate_labels(candidates, area, keys=[normalize_url(it.get("url")) for it in candidates])
+        offset = len(existing)
+        rows = [(source, area, month, it["title"], it.get("url"), it.get("snippet") or "",
+                 normalize_title(it["title"]), normalize_url(it.get("url")), it.get("query"), now)
+                for i, it in enumerate(items) if labels[offset + i] == offset + i]
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO events (source, area, month, title, url, snippet, title_key, url_key, "
+                "query, fetched_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            if complete:
+                conn.execute("INSERT OR REPLACE INTO coverage (source, area, month, fetched_at) VALUES (?, ?, ?, ?)",
+                             (source, area, month, now))
+
+    def events(self, area: str, months: Sequence[str], source: str = "live") -> List[Dict[str, Any]]:
+        """(지역, 월들)의 저장 이벤트 - 월 순, 월 안에서는 수집(쿼리) 순"""
+        if not months:
+            return []
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT id, area, month, title, url, snippet FROM events WHERE source = ? AND area = ? "
+                f"AND month IN ({','.join('?' * len(months))}) ORDER BY month, id",
+                (source, area, *months)).fetchall()
+        return [dict(r) for r in rows]
+
+    def _match_expr(self, text: str) -> Tuple[Optional[str], List[str]]:
+        """자유 텍스트 → (FTS MATCH 식, LIKE로 찾을 짧은 단어들) - trigram은 3글자 미만 단어를 찾지 못함"""
+        terms = [t.replace('"', "") for t in text.split() if t.replace('"', "")]
+        if self.tokenizer == "trigram":
+            long_terms = [t for t in terms if len(t) >= 3]
+            short_terms = [t for t in terms if len(t) < 3]
+            return (" OR ".join(f'"{t}"' for t in long_terms) or None), short_terms
+        return (" OR ".join(f'"{t}"*' for t in terms) or None), []
+
+    def search(self, text: str, area: Optional[str] = None, months: Optional[Sequence[str]] = None,
+               source: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        저장 이벤트 자유 텍스트 검색 (제목/스니펫, 단어 중 하나라도 일치)
+
+        Returns:
+            [{"id", "area", "month", "title", "url", "snippet"}, ...] - FTS 일치는 bm25 순, 짧은 단어 일치는 그 뒤
+        """
+        match, short_terms = self._match_expr(text)
+        filters, params = [], []
+        if area:
+            filters.append("e.area = ?")
+            params.append(area)
+        if months:
+            filters.append(f"e.month IN ({','.join('?' * len(months))})")
+            params += list(months)
+        if source:
+            filters.append("e.source = ?")
+            params.append(source)
+        where = "".join(f" AND {f}" for f in filters)
+        columns = "e.id, e.area, e.month, e.title, e.url, e.snippet"
+
+        out: Dict[int, Dict[str, Any]] = {}
+        with self._connect() as conn:
+            if match:
+                for r in conn.execute(
+                        f"SELECT {columns} FROM events_fts JOIN events e ON e.id = events_fts.rowid "
+                        f"WHERE events_fts MATCH ?{where} ORDER BY events_fts.rank LIMIT ?",
+                        (match, *params, limit)):
+                    out[r["id"]] = dict(r)
+            if short_terms and len(out) < limit:
+                like = " OR ".join("e.title LIKE ? OR e.snippet LIKE ?" for _ in short_terms)
+                for r in conn.execute(
+                        f"SELECT {columns} FROM events e WHERE ({like}){where} ORDER BY e.month, e.id LIMIT ?",
+                        (*[f"%{t}%" for t in short_terms for _ in range(2)], *params, limit)):
+                    out.setdefault(r["id"], dict(r))
+        return list(out.values())[:limit]
+
+    def stats(self) -> Dict[str, int]:
+        """저장소 적중 / 미수집 (지역, 월) 수, 저장된 이벤트 / (지역, 월) 수"""
+        with self._connect() as conn:
+            events = conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+            area_months = conn.execute("SELECT COUNT(*) FROM coverage").fetchone()[0]
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "events": events, "area_months": area_months}
+
+
+_EVENT_STORE: Optional[EventStore] = None
+_EVENT_STORE_LOCK = threading.Lock()
+
+
+def get_event_store() -> Optional[EventStore]:
+    """프로세스 공용 이벤트 저장소 (MARKETING_EVENT_STORE=0이거나 열기에 실패하면 None)"""
+    global _EVENT_STORE
+    if not EVENT_STORE_ENABLED:
+        return None
+    with _EVENT_STORE_LOCK:
+        if _EVENT_STORE is None:
+            try:
+                _EVENT_STORE = EventStore()
+            except (OSError, sqlite3.Error) as e:
+                print(f"⚠️  이벤트 저장소 열기 실패 ({EVENT_STORE_PATH}): {e}")
+                return None
+        return _EVENT_STORE
+
+
+def get_event_store_stats() -> Dict[str, int]:
+    store = get_event_store()
+    return store.stats() if store else {}
+
+
+__all__ = [
+    "EventStore",
+    "EVENT_STORE_PATH",
+    "normalize_url",
+    "normalize_title",
+    "month_periods",
+    "get_event_store",
+    "get_event_store_stats",
+]
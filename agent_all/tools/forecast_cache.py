@@ -0,0 +1,219 @@
+# tools/forecast_cache.py
+"""
+Open-Meteo 예보 디스크 캐시 (TTL)
+- 키: 반올림 좌표(소수 2자리, 약 1km) + 기간 + 요청 변수 + 소스(live/offline)
+  → 같은 상권의 가맹점들은 같은 예보 1건을 공유
+- TTL: 예보 모델 갱신 주기 경계(FORECAST_UPDATE_HOURS, UTC 기준) + 반영 지연(FORECAST_UPDATE_LAG_MIN)까지
+  (다음 모델 갱신 전에는 같은 예보가 나오므로 재요청하지 않음)
+  기간이 모두 과거인 요청은 값이 바뀌지 않으므로 PAST_TTL_HOURS 동안 유지
+- 만료된 항목은 FORECAST_MAX_STALE_HOURS 이내면 짧은 타임아웃 + 재시도 없이 갱신을 시도하고,
+  업스트림이 느리거나 실패하면 만료 항목을 그대로 반환 (stale read)
+- 같은 키 동시 요청은 1회 호출로 합침 (SingleFlight)
+
+사용 예:
+    data, info = get_forecast_cache().get_or_fetch(lat, lon, start, end, variables,
+                                                   fetch=lambda timeout, retries: ...)
+"""
+from __future__ import annotations
+
+import datetime as dt
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from agents.singleflight import SingleFlight
+except ImportError:  # 단독 실행 시 합치기 없이 직접 호출
+    SingleFlight = None
+
+FORECAST_CACHE_PATH = os.getenv(
+    "MARKETING_FORECAST_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache", "forecast_cache.json"),
+)
+FORECAST_CACHE_SIZE = int(os.getenv("MARKETING_FORECAST_CACHE_SIZE", "300"))
+# 예보 모델 갱신 주기(시간)와 갱신 후 API 반영까지의 지연(분)
+FORECAST_UPDATE_HOURS = int(os.getenv("MARKETING_FORECAST_UPDATE_HOURS", "3"))
+FORECAST_UPDATE_LAG_MIN = int(os.getenv("MARKETING_FORECAST_UPDATE_LAG_MIN", "30"))
+PAST_TTL_HOURS = float(os.getenv("MARKETING_FORECAST_PAST_TTL_HOURS", "168"))
+FORECAST_MAX_STALE_HOURS = float(os.getenv("MARKETING_FORECAST_MAX_STALE_HOURS", "24"))
+# 만료 항목이 있을 때의 갱신 타임아웃 / 캐시가 없을 때의 타임아웃 (초)
+STALE_REFRESH_TIMEOUT_S = float(os.getenv("MARKETING_FORECAST_REFRESH_TIMEOUT_S", "5"))
+FETCH_TIMEOUT_S = float(os.getenv("MARKETING_FORECAST_FETCH_TIMEOUT_S", "30"))
+
+KST = dt.timezone(dt.timedelta(hours=9))
+
+
+def forecast_key(lat: float, lon: float, start: str, end: str, variables: str, source: str = "live") -> str:
+    return f"{source}|{lat:.2f},{lon:.2f}|{start}|{end}|{variables}"
+
+
+def forecast_expiry(fetched_at: float, end: str) -> float:
+    """fetched_at에 받은 예보의 만료 시각 (epoch 초)"""
+    if dt.date.fromisoformat(end) < dt.datetime.fromtimestamp(fetched_at, KST).date():
+        return fetched_at + PAST_TTL_HOURS * 3600
+
+    period = max(FORECAST_UPDATE_HOURS, 1) * 3600
+    lag = FORECAST_UPDATE_LAG_MIN * 60
+    # 반영 지연을 뺀 시각 기준으로 다음 갱신 경계를 계산 (UTC 00시 정렬)
+    next_boundary = ((fetched_at - lag) // period + 1) * period
+    return next_boundary + lag
+
+
+class ForecastCache:
+    """예보 응답 캐시 (메모리 + JSON 파일, 스레드 안전)"""
+
+    def __init__(self, path: str = FORECAST_CACHE_PATH, max_entries: int = FORECAST_CACHE_SIZE):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._flight = SingleFlight() if SingleFlight else None
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f).get("entries", {})
+        except Exception as e:
+            print(f"⚠️  예보 캐시 로드 실패 ({self.path}): {e}")
+
+    def _save(self):
+        now = time.time()
+        with self._lock:
+            # 최대 stale 허용 시간도 지난 항목은 버리고, 초과분은 오래 받은 순으로 제거
+            live = {k: v for k, v in self._entries.items()
+                    if v["expires_at"] + FORECAST_MAX_STALE_HOURS * 3600 > now}
+            keep = sorted(live, key=lambda k: live[k]["fetched_at"])[-self.max_entries:]
+            self._entries = {k: live[k] for k in keep}
+            entries = dict(self._entries)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"entries": entries}, f)
+        os.replace(tmp_path, self.path)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key: str, data: Dict[str, Any], end: str):
+        self.put_many([(key, data)], end)
+
+    def put_many(self, items: List[Tuple[str, Dict[str, Any]]], end: str):
+        """여러 예보를 저장하고 파일은 한 번만 기록 (다중 좌표 일괄 조회용)"""
+        fetched_at = time.time()
+        expires_at = forecast_expiry(fetched_at, end)
+        with self._lock:
+            for key, data in items:
+                self._entries[key] = {"data": data, "fetched_at": fetched_at, "expires_at": expires_at}
+        try:
+            self._save()
+        except OSError as e:
+            print(f"⚠️  예보 캐시 저장 실패 ({self.path}): {e}")
+
+    def lookup(self, key: str, allow_stale: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        만료 전 예보 반환 (적중 수 기록) - allow_stale=True면 최대 stale 허용 시간 내 만료 항목도 반환
+
+        일괄 조회처럼 get_or_fetch 대신 호출 측에서 업스트림 요청을 묶을 때 사용합니다.
+        """
+        now = time.time()
+        entry = self.get(key)
+        if entry is None:
+            return None
+        if entry["expires_at"] > now:
+            with self._lock:
+                self.hits += 1
+            return entry["data"]
+        if allow_stale and entry["expires_at"] + FORECAST_MAX_STALE_HOURS * 3600 > now:
+            with self._lock:
+                self.stale_hits += 1
+            return entry["data"]
+        return None
+
+    def record_misses(self, count: int):
+        with self._lock:
+            self.misses += count
+
+    def get_or_fetch(self, lat: float, lon: float, start: str, end: str, variables: str,
+                     fetch: Callable[[float, Optional[int]], Dict[str, Any]], source: str = "live") -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        캐시된 예보 반환, 없거나 만료되면 fetch(timeout, retries)로 갱신
+        (만료 항목이 있으면 retries=0, 없으면 None = HTTP 클라이언트 기본 재시도)
+
+        Returns:
+            (예보 응답, {"cache_hit", "stale", "age_s"}) - 만료 항목 갱신에 실패하면 stale=True로 기존 응답 반환
+        """
+        key = forecast_key(lat, lon, start, end, variables, source)
+        now = time.time()
+        entry = self.get(key)
+        if entry and entry["expires_at"] > now:
+            with self._lock:
+                self.hits += 1
+            return entry["data"], {"cache_hit": True, "stale": False, "age_s": round(now - entry["fetched_at"], 1)}
+
+        usable = entry if entry and entry["expires_at"] + FORECAST_MAX_STALE_HOURS * 3600 > now else None
+        timeout = STALE_REFRESH_TIMEOUT_S if usable else FETCH_TIMEOUT_S
+        retries = 0 if usable else None
+
+        def fetch_and_store():
+            data = fetch(timeout, retries)
+            self.put(key, data, end)
+            return data
+
+        try:
+            if self._flight:
+                data, _ = self._flight.do(key, fetch_and_store)
+            else:
+                data = fetch_and_store()
+        except Exception as e:
+            if not usable:
+                raise
+            with self._lock:
+                self.stale_hits += 1
+            print(f"⚠️  예보 갱신 실패 → 만료 캐시 사용 ({start}~{end}): {type(e).__name__}")
+            return usable["data"], {"cache_hit": True, "stale": True, "age_s": round(now - usable["fetched_at"], 1)}
+
+        with self._lock:
+            self.misses += 1
+        return data, {"cache_hit": False, "stale": False, "age_s": 0.0}
+
+    def stats(self) -> Dict[str, int]:
+        """신선 적중 / 만료 캐시 사용 / 업스트림 호출 수 / 저장된 예보 수"""
+        with self._lock:
+            return {"hits": self.hits, "stale_hits": self.stale_hits, "misses": self.misses,
+                    "entries": len(self._entries)}
+
+
+_FORECAST_CACHE: Optional[ForecastCache] = None
+_FORECAST_CACHE_LOCK = threading.Lock()
+
+
+def get_forecast_cache() -> ForecastCache:
+    """프로세스 공용 예보 캐시"""
+    global _FORECAST_CACHE
+    with _FORECAST_CACHE_LOCK:
+        if _FORECAST_CACHE is None:
+            _FORECAST_CACHE = ForecastCache()
+        return _FORECAST_CACHE
+
+
+def get_forecast_cache_stats() -> Dict[str, int]:
+    return get_forecast_cache().stats()
+
+
+__all__ = [
+    "ForecastCache",
+    "FORECAST_CACHE_PATH",
+    "forecast_key",
+    "forecast_expiry",
+    "get_forecast_cache",
+    "get_forecast_cache_stats",
+]
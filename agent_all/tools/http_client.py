@@ -0,0 +1,226 @@
+# tools/http_client.py
+"""
+공용 HTTP 클라이언트 (외부 API 호출: Open-Meteo / Tavily / Pexels)
+- requests.Session 하나를 공유 → 연결 풀 + keep-alive (호출마다 TCP/TLS 핸드셰이크 반복 방지)
+- 재시도: 연결 오류 / 타임아웃 / 429·5xx 응답만, 최대 HTTP_MAX_RETRIES회
+  대기 시간은 지수 백오프 full jitter (Retry-After 헤더가 있으면 그 값 이상, 최대 HTTP_BACKOFF_MAX_S)
+  기본은 GET만 재시도, 멱등 POST(검색 API 등)는 idempotent=True로 지정
+- 호스트별 동시 요청 수 제한 (HTTP_MAX_PER_HOST, MARKETING_HTTP_HOST_LIMITS="api.pexels.com=2,...")
+- 호스트별 지연시간 통계 (get_http_stats: 요청/오류/재시도 수, p50·p95·최대 지연, 슬롯 대기)
+
+사용 예:
+    response = http_get("https://api.open-meteo.com/v1/forecast", params=params, timeout=30)
+    response = get_http_client().post(url, json=payload, idempotent=True)
+
+요청 deadline(agents.deadline)이 활성화되어 있으면 남은 시간보다 긴 백오프는 하지 않고 마지막 결과를 반환합니다.
+"""
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from agents.tracing import annotate
+except ImportError:  # 단독 실행 시 트레이싱 비활성
+    def annotate(**attrs): pass
+
+try:
+    from agents.deadline import get_deadline
+except ImportError:
+    def get_deadline(): return None
+
+HTTP_POOL_SIZE = int(os.getenv("MARKETING_HTTP_POOL_SIZE", "16"))
+HTTP_MAX_RETRIES = int(os.getenv("MARKETING_HTTP_MAX_RETRIES", "2"))
+HTTP_BACKOFF_BASE_S = float(os.getenv("MARKETING_HTTP_BACKOFF_BASE_S", "0.3"))
+HTTP_BACKOFF_MAX_S = float(os.getenv("MARKETING_HTTP_BACKOFF_MAX_S", "4"))
+HTTP_MAX_PER_HOST = int(os.getenv("MARKETING_HTTP_MAX_PER_HOST", "4"))
+RETRY_STATUS = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+LATENCY_SAMPLES = 1000
+
+
+def _parse_host_limits(value: str) -> Dict[str, int]:
+    """'host=n,host=n' → {host: n}"""
+    limits = {}
+    for item in value.split(","):
+        host, _, n = item.strip().partition("=")
+        if host and n.strip().isdigit():
+            limits[host.strip()] = int(n)
+    return limits
+
+
+# Tavily는 이벤트 수집 시 쿼리 5개를 동시에 보내므로 기본 한도를 맞춤
+HTTP_HOST_LIMITS = _parse_host_limits(os.getenv("MARKETING_HTTP_HOST_LIMITS", "api.tavily.com=5"))
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """attempt번째 재시도 전 대기(초) - full jitter, Retry-After(초) 우선"""
+    delay = random.uniform(0, min(HTTP_BACKOFF_MAX_S, HTTP_BACKOFF_BASE_S * (2 ** attempt)))
+    if retry_after and retry_after.strip().isdigit():
+        delay = max(delay, float(retry_after))
+    return min(delay, HTTP_BACKOFF_MAX_S)
+
+
+class _HostMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_slot_wait_ms = 0.0
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+
+class HttpClient:
+    """연결 풀 세션 + 재시도 + 호스트별 동시성 제한 (스레드 안전)"""
+
+    def __init__(self, pool_size: int = HTTP_POOL_SIZE, max_retries: int = HTTP_MAX_RETRIES,
+                 max_per_host: int = HTTP_MAX_PER_HOST, host_limits: Optional[Dict[str, int]] = None):
+        self.max_retries = max_retries
+        self.max_per_host = max_per_host
+        self.host_limits = dict(HTTP_HOST_LIMITS if host_limits is None else host_limits)
+        self.session = requests.Session()
+        # 재시도는 아래 request()에서 직접 처리 (지연 통계 / deadline 반영)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._lock = threading.Lock()
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._metrics: Dict[str, _HostMetrics] = {}
+
+    def _host_state(self, host: str):
+        with self._lock:
+            if host not in self._slots:
+                self._slots[host] = threading.BoundedSemaphore(self.host_limits.get(host, self.max_per_host))
+                self._metrics[host] = _HostMetrics()
+            return self._slots[host], self._metrics[host]
+
+    @contextmanager
+    def host_slot(self, host: str) -> Iterator[float]:
+        """호스트 동시 요청 슬롯 1개 확보 (세션 밖 SDK 호출에도 사용) - 대기 시간(ms) 반환"""
+        slot, metrics = self._host_state(host)
+        t0 = time.perf_counter()
+        slot.acquire()
+        wait_ms = (time.perf_counter() - t0) * 1000
+        with self._lock:
+            metrics.total_slot_wait_ms += wait_ms
+        try:
+            yield wait_ms
+        finally:
+            slot.release()
+
+    def record(self, host: str, latency_ms: float, error: bool = False, retried: bool = False):
+        _, metrics = self._host_state(host)
+        with self._lock:
+            metrics.requests += 1
+            metrics.latencies.append(latency_ms)
+            if error:
+                metrics.errors += 1
+            if retried:
+                metrics.retries += 1
+
+    def request(self, method: str, url: str, timeout: float = 30, retries: Optional[int] = None,
+                idempotent: Optional[bool] = None, **kwargs) -> requests.Response:
+        """
+        HTTP 요청 (재시도 대상 오류면 백오프 후 재시도)
+
+        Returns:
+            마지막 응답 - 재시도 후에도 429/5xx면 그 응답을 그대로 반환 (raise_for_status는 호출 측)
+        Raises:
+            requests.RequestException: 재시도 후에도 연결 오류 / 타임아웃
+        """
+        method = method.upper()
+        host = urlparse(url).netloc
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        if retries is None:
+            retries = self.max_retries if idempotent else 0
+
+        slot_wait_ms = 0.0
+        for attempt in range(retries + 1):
+            response, error = None, None
+            with self.host_slot(host) as wait_ms:
+                slot_wait_ms += wait_ms
+                t0 = time.perf_counter()
+                try:
+                    response = self.session.request(method, url, timeout=timeout, **kwargs)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error = e
+                latency_ms = (time.perf_counter() - t0) * 1000
+
+            retryable = error is not None or response.status_code in RETRY_STATUS
+            delay = backoff_delay(attempt, response.headers.get("Retry-After") if response is not None else None)
+            deadline = get_deadline()
+            will_retry = retryable and attempt < retries and (deadline is None or deadline.remaining() > delay)
+            self.record(host, latency_ms, error=retryable, retried=will_retry)
+            if not will_retry:
+                break
+            if response is not None:
+                response.close()
+            time.sleep(delay)
+
+        annotate(http_attempts=attempt + 1, slot_wait_ms=round(slot_wait_ms, 1))
+        if error is not None:
+            raise error
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """호스트별 요청 / 오류 / 재시도 수, p50·p95·최대 지연(ms), 평균 슬롯 대기(ms)"""
+        with self._lock:
+            out = {}
+            for host, m in self._metrics.items():
+                samples = sorted(m.latencies)
+                out[host] = {
+                    "requests": m.requests,
+                    "errors": m.errors,
+                    "retries": m.retries,
+                    "p50_ms": round(samples[len(samples) // 2], 1) if samples else 0.0,
+                    "p95_ms": round(samples[int(0.95 * (len(samples) - 1))], 1) if samples else 0.0,
+                    "max_ms": round(samples[-1], 1) if samples else 0.0,
+                    "avg_slot_wait_ms": round(m.total_slot_wait_ms / m.requests, 1) if m.requests else 0.0,
+                }
+            return out
+
+
+_HTTP_CLIENT: Optional[HttpClient] = None
+_HTTP_CLIENT_LOCK = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """프로세스 공용 HTTP 클라이언트"""
+    global _HTTP_CLIENT
+    with _HTTP_CLIENT_LOCK:
+        if _HTTP_CLIENT is None:
+            _HTTP_CLIENT = HttpClient()
+        return _HTTP_CLIENT
+
+
+def http_get(url: str, **kwargs) -> requests.Response:
+    return get_http_client().get(url, **kwargs)
+
+
+def get_http_stats() -> Dict[str, Dict[str, Any]]:
+    return get_http_client().stats()
+
+
+__all__ = [
+    "HttpClient",
+    "backoff_delay",
+    "get_http_client",
+    "get_http_stats",
+    "http_get",
+]
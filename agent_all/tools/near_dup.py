@@ -0,0 +1,179 @@
+# tools/near_dup.py
+"""
+근사 중복 탐지 (문자 shingle + MinHash + LSH)
+- 같은 팝업/행사가 사이트마다 URL·제목이 조금씩 달라 이벤트 신호가 부풀려지는 문제 해결용
+- 비교 텍스트: NFKC/소문자 정규화 후 행사 공통어("팝업스토어", "오픈", "일정 안내"...), 날짜, 지역명,
+  기호/공백을 제거 → 브랜드·행사명처럼 행사를 구분하는 부분만 남김
+  (공통어를 남기면 "성수 디올 팝업스토어 오픈" / "성수 샤넬 팝업스토어 오픈"이 중복으로 묶임)
+- 문자 SHINGLE_SIZE-gram → MinHash 서명 (NUM_PERM개, 전체 문서를 배치로 한 번에 계산)
+- LSH: 서명을 LSH_BANDS개 밴드로 나눠 같은 버킷의 후보 쌍만 추정 Jaccard로 확인 (문서 수에 거의 선형)
+- 필드(제목/스니펫) 중 하나라도 추정 Jaccard ≥ threshold면 같은 묶음 (union-find), 대표는 가장 앞의 항목
+
+사용 예:
+    labels = event_duplicate_labels(items, area="성수동")   # items: [{"title", "url", "snippet"}, ...]
+    canonical = [it for i, it in enumerate(items) if labels[i] == i]
+"""
+from __future__ import annotations
+
+import os
+import re
+import unicodedata
+import zlib
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+NEAR_DUP_THRESHOLD = float(os.getenv("MARKETING_NEAR_DUP_THRESHOLD", "0.6"))
+SHINGLE_SIZE = 2          # 한글은 글자당 정보량이 커서 2-gram
+NUM_PERM = 128
+LSH_BANDS = 32            # 밴드당 4행 → 유사도 0.6이면 후보가 될 확률 약 99%
+MINHASH_BATCH = 2000      # 배치당 (NUM_PERM × shingle 수) 행렬 메모리 제한
+_PRIME = (1 << 31) - 1
+
+_rng = np.random.RandomState(20251019)
+_A = _rng.randint(1, _PRIME, size=NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, _PRIME, size=NUM_PERM).astype(np.uint64)
+
+# 행사 제목/스니펫에 두루 나오는 말 (긴 것부터 제거)
+GENERIC_EVENT_TERMS = sorted([
+    "팝업스토어", "팝업 스토어", "팝업", "스토어", "popup", "pop-up", "오픈", "open", "그랜드", "개최", "개막",
+    "안내", "일정", "총정리", "정리", "소식", "행사", "이벤트", "기간", "정보", "진행", "예정", "방문", "후기",
+    "리뷰", "추천", "예약", "네이버", "블로그", "인스타그램", "뉴스", "기사", "공식", "현장", "최신",
+], key=len, reverse=True)
+# 제목이 없는 결과에 붙이는 자리표시 제목 - 비교 대상이 아님 (실제 Tavily 결과는 url/content만 있음)
+EVENT_TITLE_PLACEHOLDER = "지역 이벤트"
+_DATE = re.compile(r"\d{4}\s*년|\d{1,2}\s*월|\d{1,2}\s*일|\d{4}[-./]\d{1,2}([-./]\d{1,2})?|\d+")
+
+
+def normalize_text(text: Optional[str], stopwords: Sequence[str] = ()) -> str:
+    """비교용 텍스트 (NFKC, 소문자, 공통어/날짜/stopwords 제거, 한글·영문 외 문자 제거)"""
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    for word in list(stopwords) + GENERIC_EVENT_TERMS:
+        if word:
+            text = text.replace(word.lower(), " ")
+    text = _DATE.sub(" ", text)
+    return re.sub(r"[^a-z가-힣]", "", text)
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> List[str]:
+    if len(text) <= size:
+        return [text] if text else []
+    return list({text[i:i + size] for i in range(len(text) - size + 1)})
+
+
+def minhash_signatures(texts: Sequence[str]) -> np.ndarray:
+    """
+    정규화된 텍스트 N개 → (N, NUM_PERM) uint32 MinHash 서명
+
+    전체 shingle 해시를 (순열, shingle) 행렬로 한 번에 계산하고 문서 경계별 최소값(reduceat)을 취합니다.
+    shingle이 없는 텍스트는 행 전체가 _PRIME (어떤 항목과도 중복으로 보지 않음).
+    """
+    out = np.full((len(texts), NUM_PERM), _PRIME, dtype=np.uint32)
+    for lo in range(0, len(texts), MINHASH_BATCH):
+        batch = [shingles(t) for t in texts[lo:lo + MINHASH_BATCH]]
+        docs = [i for i, grams in enumerate(batch) if grams]
+        if not docs:
+            continue
+        hashes = np.fromiter((zlib.crc32(g.encode("utf-8")) for i in docs for g in batch[i]), dtype=np.uint64)
+        starts = np.cumsum([0] + [len(batch[i]) for i in docs[:-1]])
+        values = (_A[:, None] * (hashes % _PRIME)[None, :] + _B[:, None]) % _PRIME
+        out[lo + np.array(docs)] = np.minimum.reduceat(values, starts, axis=1).T
+    return out
+
+
+def _candidate_pairs(sigs: np.ndarray) -> np.ndarray:
+    """LSH 밴드 버킷에서 (버킷 첫 항목, 나머지 항목) 후보 쌍 (K, 2) - 같은 쌍은 한 번만"""
+    rows = NUM_PERM // LSH_BANDS
+    valid = np.flatnonzero(~(sigs == _PRIME).all(axis=1))
+    pairs = []
+    for band in range(LSH_BANDS):
+        band_sigs = np.ascontiguousarray(sigs[valid, band * rows:(band + 1) * rows])
+        _, first, inverse = np.unique(band_sigs.view(np.dtype((np.void, band_sigs.dtype.itemsize * rows))).ravel(),
+                                      return_index=True, return_inverse=True)
+        heads = valid[first[inverse.ravel()]]
+        members = valid != heads
+        pairs.append(np.stack([heads[members], valid[members]], axis=1))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.unique(np.concatenate(pairs), axis=0)
+
+
+def near_duplicate_labels(fields: Sequence[np.ndarray], threshold: float = NEAR_DUP_THRESHOLD,
+                          keys: Optional[Sequence[str]] = None) -> List[int]:
+    """
+    각 항목이 속한 근사 중복 묶음의 대표 인덱스 (대표는 묶음에서 가장 앞의 항목)
+
+    Args:
+        fields: 필드별 (N, NUM_PERM) 서명 - 어느 한 필드라도 유사하면 중복
+        keys: 정확 일치 키 (정규화 URL 등) - 빈 값이 아니고 같으면 텍스트와 무관하게 중복
+    """
+    n = len(fields[0]) if fields else len(keys or [])
+    parent = list(range(n))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int):
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)  # 앞의 항목이 대표
+
+    if keys is not None:
+        first: Dict[str, int] = {}
+        for i, key in enumerate(keys):
+            if key:
+                union(first.setdefault(key, i), i)
+
+    for sigs in fields:
+        pairs = _candidate_pairs(sigs)
+        if not len(pairs):
+            continue
+        similarity = (sigs[pairs[:, 0]] == sigs[pairs[:, 1]]).mean(axis=1)
+        for i, j in pairs[similarity >= threshold]:
+            union(int(i), int(j))
+    return [find(i) for i in range(n)]
+
+
+def _field_text(value: Optional[str], stopwords: Sequence[str]) -> str:
+    """서명용 정규화 텍스트 - 자리표시 제목이나 정규화 후 SHINGLE_SIZE 미만이면 "" (서명 없음)"""
+    if not value or value.strip() == EVENT_TITLE_PLACEHOLDER:
+        return ""
+    text = normalize_text(value, stopwords)
+    return text if len(text) >= SHINGLE_SIZE else ""
+
+
+def event_signatures(items: Sequence[Dict[str, Any]], area: Optional[str] = None) -> List[np.ndarray]:
+    """
+    이벤트 [{"title", "snippet"}, ...] → [제목 서명, 스니펫 서명] (지역명은 비교에서 제외)
+
+    빈 필드/자리표시 제목은 서명이 없어 그 필드로는 어떤 항목과도 묶이지 않습니다.
+    """
+    stopwords = [area, area[:-1] if area and area.endswith("동") else None] if area else []
+    stopwords = [w for w in stopwords if w]
+    return [
+        minhash_signatures([_field_text(it.get("title"), stopwords) for it in items]),
+        minhash_signatures([_field_text(it.get("snippet"), stopwords) for it in items]),
+    ]
+
+
+def event_duplicate_labels(items: Sequence[Dict[str, Any]], area: Optional[str] = None,
+                           threshold: float = NEAR_DUP_THRESHOLD,
+                           keys: Optional[Sequence[str]] = None) -> List[int]:
+    """이벤트 목록의 근사 중복 대표 인덱스 (제목 또는 스니펫 유사, 또는 같은 정규화 URL)"""
+    if not items:
+        return []
+    return near_duplicate_labels(event_signatures(items, area), threshold, keys)
+
+
+__all__ = [
+    "NEAR_DUP_THRESHOLD",
+    "EVENT_TITLE_PLACEHOLDER",
+    "normalize_text",
+    "minhash_signatures",
+    "near_duplicate_labels",
+    "event_signatures",
+    "event_duplicate_labels",
+]
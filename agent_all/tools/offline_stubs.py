@@ -0,0 +1,108 @@
+# tools/offline_stubs.py
+"""
+외부 API 오프라인 스텁 (MARKETING_TOOLS_BACKEND=offline)
+- open_meteo_forecast: Open-Meteo forecast 응답과 같은 hourly/daily 구조의 합성 데이터
+- open_meteo_archive: Open-Meteo archive(과거 관측) 응답과 같은 hourly 구조의 합성 데이터
+- FakeTavilySearch: TavilySearchResults.invoke(q)와 같은 형식의 고정 검색 결과
+
+입력(좌표/기간/쿼리)만으로 결과가 결정되므로 벤치마크 실행마다 동일한 신호가 생성됩니다.
+"""
+from __future__ import annotations
+import datetime as dt
+import hashlib
+import random
+from typing import Any, Dict, List
+
+
+def _rng(*parts: Any) -> random.Random:
+    seed = hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:16]
+    return random.Random(int(seed, 16))
+
+
+def open_meteo_forecast(lat: float, lon: float, start: str, end: str) -> Dict[str, Any]:
+    """Open-Meteo /v1/forecast 응답 형식의 결정적 합성 데이터"""
+    s, e = dt.date.fromisoformat(start), dt.date.fromisoformat(end)
+    days = [s + dt.timedelta(days=i) for i in range((e - s).days + 1)]
+    rng = _rng(round(lat, 2), round(lon, 2), start, end)
+
+    hourly = {"time": [], "precipitation_probability": [], "precipitation": [], "temperature_2m": []}
+    daily = {"time": [], "temperature_2m_max": [], "temperature_2m_min": [], "precipitation_sum": []}
+    for d in days:
+        # 월별 평균기온(서울 기준 근사) + 일별 변동
+        base = [-2.5, 0.5, 6.0, 12.5, 18.0, 22.5, 25.5, 26.5, 21.5, 14.5, 7.0, 0.5][d.month - 1]
+        rainy = rng.random() < 0.3
+        temps, rains = [], []
+        for h in range(24):
+            temp = round(base + rng.uniform(-3, 3) + 4 * (1 - abs(h - 14) / 14), 1)
+            pop = rng.randint(55, 95) if rainy else rng.randint(0, 30)
+            rain = round(rng.uniform(0.2, 2.5), 1) if rainy and pop >= 60 else 0.0
+            hourly["time"].append(f"{d.isoformat()}T{h:02d}:00")
+            hourly["precipitation_probability"].append(pop)
+            hourly["precipitation"].append(rain)
+            hourly["temperature_2m"].append(temp)
+            temps.append(temp)
+            rains.append(rain)
+        daily["time"].append(d.isoformat())
+        daily["temperature_2m_max"].append(max(temps))
+        daily["temperature_2m_min"].append(min(temps))
+        daily["precipitation_sum"].append(round(sum(rains), 1))
+
+    return {
+        "latitude": lat, "longitude": lon, "timezone": "Asia/Seoul",
+        "hourly": hourly, "daily": daily,
+    }
+
+
+def open_meteo_archive(lat: float, lon: float, start: str, end: str) -> Dict[str, Any]:
+    """Open-Meteo /v1/archive 응답 형식의 결정적 합성 데이터 (날짜별 시드 → 수집 기간과 무관하게 같은 값)"""
+    s, e = dt.date.fromisoformat(start), dt.date.fromisoformat(end)
+    hourly: Dict[str, List[Any]] = {
+        "time": [], "temperature_2m": [], "precipitation": [],
+        "relative_humidity_2m": [], "wind_speed_10m": [], "sunshine_duration": [],
+    }
+    for i in range((e - s).days + 1):
+        d = s + dt.timedelta(days=i)
+        rng = _rng("archive", round(lat, 2), round(lon, 2), d.isoformat())
+        base = [-2.5, 0.5, 6.0, 12.5, 18.0, 22.5, 25.5, 26.5, 21.5, 14.5, 7.0, 0.5][d.month - 1]
+        rainy = rng.random() < 0.3
+        for h in range(24):
+            rain = round(rng.uniform(0.2, 2.5), 1) if rainy and rng.random() < 0.5 else 0.0
+            daylight = 6 <= h <= 18
+            hourly["time"].append(f"{d.isoformat()}T{h:02d}:00")
+            hourly["temperature_2m"].append(round(base + rng.uniform(-3, 3) + 4 * (1 - abs(h - 14) / 14), 1))
+            hourly["precipitation"].append(rain)
+            hourly["relative_humidity_2m"].append(rng.randint(70, 98) if rainy else rng.randint(30, 75))
+            hourly["wind_speed_10m"].append(round(rng.uniform(0.5, 5.0), 1))
+            hourly["sunshine_duration"].append(0.0 if rainy or not daylight else round(rng.uniform(0, 3600), 0))
+
+    return {"latitude": lat, "longitude": lon, "timezone": "Asia/Seoul", "hourly": hourly}
+
+
+_EVENT_TEMPLATES = [
+    ("{area} 팝업스토어 오픈 - 브랜드 한정판 굿즈", "주말 방문객 약 {n}만명 예상"),
+    ("{area} 플리마켓 & 야시장 개최", "지역 상인 40여 팀 참여, {n}천명 방문 예상"),
+    ("{area} 전시 공연 일정 안내", "갤러리 특별전 및 거리 공연"),
+]
+
+
+class FakeTavilySearch:
+    """TavilySearchResults 대체 (invoke(query) → [{title, url, content}])"""
+
+    def __init__(self, max_results: int = 3):
+        self.max_results = max_results
+
+    def invoke(self, query: str) -> List[Dict[str, Any]]:
+        rng = _rng("tavily", query)
+        area = query.split()[0] if query else "지역"
+        results = []
+        for i, (title, answer) in enumerate(_EVENT_TEMPLATES[:self.max_results]):
+            n = rng.randint(2, 9)
+            results.append({
+                "title": title.format(area=area),
+                "url": f"https://offline.example/{hashlib.sha1(f'{area}-{i}'.encode('utf-8')).hexdigest()[:10]}",
+                "content": answer.format(n=n),
+            })
+        return results
+
+
+__all__ = ["open_meteo_forecast", "FakeTavilySearch"]
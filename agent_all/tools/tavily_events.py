@@ -1,15 +1,34 @@
 # tools/tavily_events.py 
 from __future__ import annotations
-import os, re, logging, datetime as dt
+import os, re, logging, contextvars, datetime as dt
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Tuple, Optional, Callable
 from dotenv import load_dotenv
 from langchain_community.tools.tavily_search import TavilySearchResults
+from langchain_community.utilities.tavily_search import TAVILY_API_URL, TavilySearchAPIWrapper
 from langchain.tools import StructuredTool
 from pydantic import BaseModel, Field
 
+from tools.event_store import get_event_store, month_periods, normalize_title, normalize_url
+from tools.http_client import get_http_client
+from tools.near_dup import EVENT_TITLE_PLACEHOLDER, event_duplicate_labels
+
+try:
+    from agents.tracing import span, payload_size
+except ImportError:  # 단독 실행 시 트레이싱 비활성
+    from contextlib import nullcontext
+    def span(*args, **kwargs): return nullcontext({})
+    def payload_size(value): return 0
+
+try:
+    from agents.backends import is_offline_tools
+except ImportError:
+    def is_offline_tools(): return False
+
 # ── ENV & Tool ──────────────────────────────────────────────────────────────
 load_dotenv()
-assert os.getenv("TAVILY_API_KEY"), "TAVILY_API_KEY가 .env에 없습니다!"
+# 오프라인 도구 모드에서는 Tavily 키 없이 FakeTavilySearch 사용
+assert is_offline_tools() or os.getenv("TAVILY_API_KEY"), "TAVILY_API_KEY가 .env에 없습니다!"
 # (선택) 다른 곳에서 쓸 수 있으므로 강제 미검증
 # os.getenv("KCISA_SERVICE_KEY")
 
@@ -19,7 +38,37 @@ if not LOGGER.handlers:
     # 환경변수 TAVILY_EVENTS_LOG=DEBUG/INFO/WARNING 로 조절 가능 (기본 WARNING)
     logging.basicConfig(level=os.getenv("TAVILY_EVENTS_LOG", "WARNING").upper(), format="%(levelname)s: %(message)s")
 
-_tavily = TavilySearchResults(max_results=5, include_answer=True, include_raw_content=False)
+TAVILY_TIMEOUT_S = float(os.getenv("TAVILY_TIMEOUT_S", "20"))
+# 쿼리 동시 실행 수 (Tavily 호스트 동시성은 http_client의 호스트 제한으로 추가 제한)
+TAVILY_MAX_PARALLEL = int(os.getenv("TAVILY_MAX_PARALLEL", "5"))
+
+class PooledTavilyAPIWrapper(TavilySearchAPIWrapper):
+    """Tavily 검색 요청을 공용 HTTP 클라이언트(연결 풀 / 재시도 / 호스트 동시성 제한)로 전송"""
+
+    def raw_results(self, query: str, max_results: Optional[int] = 5, search_depth: Optional[str] = "advanced",
+                    include_domains: Optional[List[str]] = [], exclude_domains: Optional[List[str]] = [],
+                    include_answer: Optional[bool] = False, include_raw_content: Optional[bool] = False,
+                    include_images: Optional[bool] = False) -> Dict:
+        params = {
+            "api_key": self.tavily_api_key.get_secret_value(),
+            "query": query,
+            "max_results": max_results,
+            "search_depth": search_depth,
+            "include_domains": include_domains,
+            "exclude_domains": exclude_domains,
+            "include_answer": include_answer,
+            "include_raw_content": include_raw_content,
+            "include_images": include_images,
+        }
+        # 검색은 부작용이 없으므로 POST지만 재시도 허용
+        response = get_http_client().post(f"{TAVILY_API_URL}/search", json=params,
+                                          timeout=TAVILY_TIMEOUT_S, idempotent=True)
+        response.raise_for_status()
+        return response.json()
+
+_tavily = None if is_offline_tools() else TavilySearchResults(
+    max_results=5, include_answer=True, include_raw_content=False, api_wrapper=PooledTavilyAPIWrapper()
+)
 
 # ── 최소 지역 별칭(없으면 market_locator로 대체) ─────────────────────────────
 MARKET_ALIAS: Dict[str, Tuple[float, float, str]] = {
@@ -36,6 +85,8 @@ def _area_name(market_id: str, market_locator: Optional[Callable[[str], Tuple[fl
 def _queries(area: str, start: str, end: str, user_query: Optional[str]) -> List[str]:
     s, e = dt.date.fromisoformat(start), dt.date.fromisoformat(end)
     month = f"{s.year} {s.month}월"; week = f"{s:%Y-%m-%d}~{e:%Y-%m-%d}"
+    if (s.year, s.month) != (e.year, e.month):   # 여러 달 기간은 쿼리 1벌에 전체 월 표기
+        month += f"~{e.month}월" if s.year == e.year else f"~{e.year} {e.month}월"
     base = [
         f"{area} 팝업스토어 {month}",
         f"{area} 행사 {month}",
@@ -64,6 +115,11 @@ def _month_bias(text: str, y: int, m: int) -> float:
     except Exception:
         return 0.0
 
+def _item_months(text: str, months: List[str]) -> List[str]:
+    """결과가 언급한 월 (YYYY-MM 중 'M월' 표기) - 언급이 없으면 전체 월"""
+    hinted = [m for m in months if re.search(rf"(?<!\d){int(m[5:])}\s*월", text or "")]
+    return hinted or months
+
 # ── Core: 입력(JSON 계약) → Situation JSON(event signals) ──────────────────
 def search_event_signals(
     input_json: Dict[str, Any],
@@ -84,58 +140,128 @@ def search_event_signals(
         }
 
     area = _area_name(mid, market_locator)
-    qs = _queries(area, start, end, input_json.get("user_query"))
+    user_query = input_json.get("user_query")
     tool = tavily or _tavily
+    if tool is None or (tavily is None and is_offline_tools()):
+        from tools.offline_stubs import FakeTavilySearch
+        tool = FakeTavilySearch()
 
     # 월 가점 계산을 위해 시작/끝 파싱
     s_date, e_date = dt.date.fromisoformat(start), dt.date.fromisoformat(end)
 
-    signals, citations, seen = [], [], set()
-    for q in qs:
+    # 저장소: 수집된 (지역, 월)은 저장 이벤트로 응답, 미수집 월 구간만 쿼리 1벌로 Tavily 질의 후 월별로 저장
+    # (월마다 쿼리를 보내지 않으므로 여러 달 기간도 Tavily 호출 수는 한 달 기간과 같음)
+    # (tavily를 직접 주입한 호출은 저장소를 거치지 않음)
+    event_store = get_event_store() if tavily is None else None
+    source = "offline" if is_offline_tools() else "live"
+    missing: List[str] = []
+    if event_store:
+        periods = month_periods(start, end)
+        covered = event_store.covered_months(area, [m for m, _, _ in periods], source)
+        pending = [(m, ms, me) for m, ms, me in periods if m not in covered]
+        missing = [m for m, _, _ in pending]
+        jobs = _queries(area, pending[0][1], pending[-1][2], user_query) if pending else []
+    else:
+        jobs = _queries(area, start, end, user_query)
+
+    def search(q: str):
         try:
-            res = tool.invoke(q)
+            with span("tavily.search", cat="http", cache_hit=False, request_bytes=payload_size(q)) as attrs:
+                res = tool.invoke(q)
+                attrs["response_bytes"] = payload_size(res)
+            return res
         except Exception as e:
             LOGGER.warning("[tavily_events] Tavily 쿼리 실패: '%s' (%s)", q, e)
+            return None
+
+    # 쿼리는 동시에 보내고, 병합은 쿼리 순서대로 → 중복 제거/signal_id가 순차 실행과 동일
+    responses = []
+    if jobs:
+        with ThreadPoolExecutor(max_workers=max(1, min(TAVILY_MAX_PARALLEL, len(jobs)))) as executor:
+            futures = [executor.submit(contextvars.copy_context().run, search, q) for q in jobs]
+            responses = [f.result() for f in futures]
+
+    items: List[Dict[str, Any]] = []
+    fetched: List[Dict[str, Any]] = []
+    failed = False
+    for q, res in zip(jobs, responses):
+        if res is None:
+            failed = True
             continue
         if not isinstance(res, list):
+            failed = True
             LOGGER.warning("[tavily_events] 예기치 않은 반환형: %s (query=%s)", type(res).__name__, q)
             continue
-
         for it in res:
-            title, url, snip = it.get("title") or "지역 이벤트", it.get("url"), it.get("answer") or ""
-            key = (title, url)
-            if key in seen:
-                continue
-            seen.add(key)
-            if url and url not in citations:
-                citations.append(url)
-
-            exp = _visitors(title + " " + snip)
-            rel = (
-                0.5
-                + (0.2 if re.search(r"(팝업|행사|이벤트|전시|마켓|야시장|페스티벌|콘서트)", title) else 0.0)
-                + (0.15 if exp and exp >= 5000 else 0.0)
-                # ── NEW: 요청 월/연도와 일치하면 소폭 가점
-                + _month_bias((title or "") + " " + snip, s_date.year, s_date.month)
-            )
-            rel = min(rel, 0.95)
-
-            signals.append({
-                "signal_id": f"EV-{start.replace('-','')}-{len(signals)+1}",
-                "signal_type": "event",
-                "description": title,
-                "details": {
-                    "area_name": area,
-                    "expected_visitors": exp,
-                    "distance_km": None,  # 지오코딩 붙일 때 채우기
-                    "url": url,
-                    "period_hint": {"start": start, "end": end},
-                    "snippet": snip,
-                },
-                "relevance": rel,
-                "valid": True,
-                "reason": "지역/기간 키워드 매칭 및 스니펫 근거",
-            })
+            # TavilySearchResults 결과는 {"url", "content"} - 제목은 있을 때만, 본문은 content
+            fetched.append({"title": it.get("title") or EVENT_TITLE_PLACEHOLDER, "url": it.get("url"),
+                            "snippet": it.get("content") or it.get("answer") or "", "query": q})
+
+    if event_store:
+        with span("event-store.lookup", cat="data", area=area, months=len(periods),
+                  covered=len(covered), queries=len(jobs)) as attrs:
+            # 결과는 언급한 월에 저장 (월 언급이 없으면 기간의 모든 월에, 이미 수집된 월은 제외)
+            by_month: Dict[str, List[Dict[str, Any]]] = {}
+            for it in fetched:
+                for month in _item_months(f"{it['title']} {it['snippet']}", [m for m, _, _ in periods]):
+                    if month in missing:
+                        by_month.setdefault(month, []).append(it)
+            # 쿼리가 모두 성공해야 수집 완료로 기록 (지난 달은 만료가 없으므로 일부 실패가 굳지 않도록)
+            # 일부만 성공하면 받은 이벤트만 저장하고 다음 요청에서 전체 쿼리를 다시 질의
+            for month in missing:
+                if month in by_month or not failed:
+                    event_store.put(area, month, by_month.get(month, []), source, complete=not failed)
+            attrs["partial_months"] = len(missing) if failed else 0
+            months = [m for m, _, _ in periods if m in covered or m in by_month]
+            items = event_store.events(area, months, source)
+            if user_query and items:
+                # 사용자 질의와 맞는 저장 이벤트를 앞으로 (전문 검색 순위)
+                ranked = event_store.search(user_query, area=area, months=months, source=source, limit=len(items))
+                order = {r["id"]: i for i, r in enumerate(ranked)}
+                items.sort(key=lambda r: order.get(r["id"], len(order)))
+            attrs["events"] = len(items)
+    else:
+        items = fetched
+
+    # 같은 행사가 URL/제목만 조금 다르게 여러 번 나오면 가장 앞의 항목 하나만 신호로 사용
+    # (정확 일치 키 + 제목/스니펫 MinHash 근사 중복, 월이 다른 저장 이벤트 사이도 포함)
+    labels = event_duplicate_labels(items, area, keys=[normalize_url(it.get("url")) for it in items])
+    signals, citations, seen = [], [], set()
+    for i, it in enumerate(items):
+        title, url, snip = it["title"], it.get("url"), it.get("snippet") or ""
+        key = (normalize_title(title), normalize_url(url))
+        if key in seen or labels[i] != i:
+            continue
+        seen.add(key)
+        if url and url not in citations:
+            citations.append(url)
+
+        exp = _visitors(title + " " + snip)
+        rel = (
+            0.5
+            + (0.2 if re.search(r"(팝업|행사|이벤트|전시|마켓|야시장|페스티벌|콘서트)", title) else 0.0)
+            + (0.15 if exp and exp >= 5000 else 0.0)
+            # ── NEW: 요청 월/연도와 일치하면 소폭 가점
+            + _month_bias((title or "") + " " + snip, s_date.year, s_date.month)
+        )
+        rel = min(rel, 0.95)
+
+        signals.append({
+            "signal_id": f"EV-{start.replace('-','')}-{len(signals)+1}",
+            "signal_type": "event",
+            "description": title,
+            "details": {
+                "area_name": area,
+                "expected_visitors": exp,
+                "distance_km": None,  # 지오코딩 붙일 때 채우기
+                "url": url,
+                "period_hint": {"start": start, "end": end},
+                "snippet": snip,
+            },
+            "relevance": rel,
+            "valid": True,
+            "reason": "지역/기간 키워드 매칭 및 스니펫 근거",
+        })
 
     summary = f"{area} {start}~{end}: " + (f"{len(signals)}건의 이벤트 단서" if signals else "이벤트 단서 없음")
     return {
@@ -0,0 +1,456 @@
+# tools/weather_archive.py
+"""
+상권별 과거 날씨 로컬 아카이브 (컬럼형 .npz)
+- 수집(ingest): Open-Meteo archive API에서 상권 좌표별 시간 단위 관측값을 받아
+  (상권, 시간) float32 배열로 저장하고 일 단위 집계 배열을 함께 기록
+  기존 아카이브가 있으면 상권/기간을 합쳐서 다시 저장 (겹치는 구간은 새 값 우선)
+- 조회: 과거 기간(종료일 < 오늘) 요청은 네트워크 없이 배열 슬라이싱으로 응답
+  forecast_like()는 Open-Meteo forecast와 같은 hourly/daily 구조를 반환 → weather_signals._om이 그대로 사용
+  (과거 관측에는 강수확률이 없으므로 강수 ≥ RAIN_HOUR_MM 시간은 100%, 나머지는 0%로 대체)
+- 날씨 영향 재계산: monthly_frame()의 월별 날씨 + 월별 가맹점 지표 → compute_weather_impact()
+  (data/상권별·업종별·업종+상권별_날씨_영향.csv와 같은 형식)
+
+    python -m tools.weather_archive ingest --start 2023-01-01 --end 2024-12-31
+    python -m tools.weather_archive ingest --start 2024-06-01 --end 2024-06-30 --markets 성수,왕십리
+    python -m tools.weather_archive impact --business monthly_metrics.csv --out-dir ../data
+
+pyarrow가 없는 환경에서도 동작하도록 numpy .npz(압축)를 사용합니다.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import os
+import threading
+import warnings
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from agents.tracing import span
+except ImportError:  # 단독 실행 시 트레이싱 비활성
+    from contextlib import nullcontext
+    def span(*args, **kwargs): return nullcontext({})
+
+try:
+    from agents.backends import is_offline_tools
+except ImportError:
+    def is_offline_tools(): return False
+
+from tools.http_client import http_get
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data")
+WEATHER_ARCHIVE_PATH = os.getenv("MARKETING_WEATHER_ARCHIVE_PATH", os.path.join(DATA_DIR, "weather_archive.npz"))
+OPEN_METEO_ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+# 수집 요청 1건에 담는 좌표 수 (archive API도 쉼표 구분 다중 좌표 지원)
+ARCHIVE_MAX_LOCATIONS = int(os.getenv("MARKETING_WEATHER_ARCHIVE_MAX_LOCATIONS", "20"))
+
+HOURLY_VARS = ("temperature_2m", "precipitation", "relative_humidity_2m", "wind_speed_10m", "sunshine_duration")
+DAILY_VARS = ("temperature_2m_mean", "temperature_2m_max", "temperature_2m_min", "precipitation_sum",
+              "relative_humidity_2m_mean", "wind_speed_10m_mean", "sunshine_hours")
+# 과거 기간 강수확률 대용 기준 (시간 강수량 mm)
+RAIN_HOUR_MM = 0.1
+
+# 날씨 영향 분석 변수 → (일 변수, 월 집계 방식)
+IMPACT_WEATHER_VARS: Dict[str, Tuple[str, str]] = {
+    "평균기온": ("temperature_2m_mean", "mean"),
+    "평균최고기온": ("temperature_2m_max", "mean"),
+    "평균풍속": ("wind_speed_10m_mean", "mean"),
+    "일조시간": ("sunshine_hours", "sum"),
+    "평균습도": ("relative_humidity_2m_mean", "mean"),
+    "강수량": ("precipitation_sum", "sum"),
+}
+IMPACT_COLUMNS = ["날씨변수", "비즈니스변수", "고조건 평균", "저조건 평균", "차이(고-저)", "변화율(%)",
+                  "샘플수(고)", "샘플수(저)"]
+IMPACT_TOP_K = 5
+IMPACT_MIN_SAMPLES = 100
+# 가맹점 월별 데이터의 결측 표기값
+MISSING_SENTINEL = -999999.9
+
+
+def _daily_from_hourly(hourly: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """(M, D*24) 시간 배열 → (M, D) 일 배열 (해당 일 값이 전부 결측이면 NaN)"""
+    def days(var: str) -> np.ndarray:
+        a = hourly[var]
+        return a.reshape(a.shape[0], -1, 24)
+
+    def nansum(a: np.ndarray) -> np.ndarray:
+        return np.where(np.isnan(a).all(axis=2), np.nan, np.nansum(a, axis=2))
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # 전부 NaN인 날
+        daily = {
+            "temperature_2m_mean": np.nanmean(days("temperature_2m"), axis=2),
+            "temperature_2m_max": np.nanmax(days("temperature_2m"), axis=2),
+            "temperature_2m_min": np.nanmin(days("temperature_2m"), axis=2),
+            "precipitation_sum": nansum(days("precipitation")),
+            "relative_humidity_2m_mean": np.nanmean(days("relative_humidity_2m"), axis=2),
+            "wind_speed_10m_mean": np.nanmean(days("wind_speed_10m"), axis=2),
+            "sunshine_hours": nansum(days("sunshine_duration")) / 3600,
+        }
+    return {k: v.astype(np.float32) for k, v in daily.items()}
+
+
+def _round_list(a: np.ndarray, ndigits: int = 1) -> List[Optional[float]]:
+    return [None if np.isnan(v) else round(float(v), ndigits) for v in a]
+
+
+class WeatherArchive:
+    """상권 × 시간 날씨 배열 (hourly: (M, D*24), daily: (M, D), 시작일 기준 연속 구간)"""
+
+    def __init__(self, markets: Sequence[str], lat: Sequence[float], lon: Sequence[float], start: dt.date,
+                 hourly: Dict[str, np.ndarray], daily: Optional[Dict[str, np.ndarray]] = None):
+        self.markets = list(markets)
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.start = start
+        self.hourly = {var: np.asarray(hourly[var], dtype=np.float32) for var in HOURLY_VARS}
+        self.daily = daily if daily is not None else _daily_from_hourly(self.hourly)
+        self._market_index = {m: i for i, m in enumerate(self.markets)}
+        # 반올림 좌표 → 상권 행 목록 (같은 좌표 상권은 같은 관측값이지만 수집 기간은 다를 수 있음)
+        self._point_index: Dict[Tuple[float, float], List[int]] = {}
+        for i, (la, lo) in enumerate(zip(self.lat, self.lon)):
+            self._point_index.setdefault((round(float(la), 2), round(float(lo), 2)), []).append(i)
+
+    @property
+    def days(self) -> int:
+        return self.hourly["temperature_2m"].shape[1] // 24
+
+    @property
+    def end(self) -> dt.date:
+        return self.start + dt.timedelta(days=self.days - 1)
+
+    # ── 저장 / 로드 ────────────────────────────────────────────────────────
+    @classmethod
+    def load(cls, path: str = WEATHER_ARCHIVE_PATH) -> "WeatherArchive":
+        with np.load(path, allow_pickle=False) as z:
+            return cls(
+                markets=[str(m) for m in z["markets"]], lat=z["lat"], lon=z["lon"],
+                start=dt.date.fromisoformat(str(z["start"])),
+                hourly={var: z[f"hourly_{var}"] for var in HOURLY_VARS},
+                daily={var: z[f"daily_{var}"] for var in DAILY_VARS},
+            )
+
+    def save(self, path: str = WEATHER_ARCHIVE_PATH):
+        arrays = {"markets": np.array(self.markets), "lat": self.lat, "lon": self.lon,
+                  "start": np.array(self.start.isoformat())}
+        arrays.update({f"hourly_{var}": a for var, a in self.hourly.items()})
+        arrays.update({f"daily_{var}": a for var, a in self.daily.items()})
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:  # 파일 객체로 저장 (np.savez가 .npz 확장자를 덧붙이지 않도록)
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp_path, path)
+
+    def merged(self, other: "WeatherArchive") -> "WeatherArchive":
+        """두 아카이브의 상권/기간 합집합 (겹치는 구간은 other의 결측 아닌 값 우선, 빈 구간은 NaN)"""
+        markets = self.markets + [m for m in other.markets if m not in self._market_index]
+        start = min(self.start, other.start)
+        days = (max(self.end, other.end) - start).days + 1
+        lat, lon = np.zeros(len(markets)), np.zeros(len(markets))
+        hourly = {var: np.full((len(markets), days * 24), np.nan, dtype=np.float32) for var in HOURLY_VARS}
+        for src in (self, other):
+            rows = [markets.index(m) for m in src.markets]
+            hours = slice((src.start - start).days * 24, (src.start - start).days * 24 + src.days * 24)
+            lat[rows], lon[rows] = src.lat, src.lon
+            for var in HOURLY_VARS:
+                current = hourly[var][rows, hours]
+                hourly[var][rows, hours] = np.where(np.isnan(src.hourly[var]), current, src.hourly[var])
+        return WeatherArchive(markets, lat, lon, start, hourly)
+
+    # ── 조회 ──────────────────────────────────────────────────────────────
+    def day_slice(self, start: str, end: str) -> Optional[slice]:
+        """[start, end] 일 구간 슬라이스 - 아카이브 기간 밖이면 None"""
+        s, e = dt.date.fromisoformat(start), dt.date.fromisoformat(end)
+        if s < self.start or e > self.end or e < s:
+            return None
+        return slice((s - self.start).days, (e - self.start).days + 1)
+
+    def row(self, lat: float, lon: float, start: str, end: str) -> Optional[int]:
+        """좌표의 상권 행 중 기간 전체에 결측이 없는 첫 행 (없으면 None)"""
+        days = self.day_slice(start, end)
+        if days is None:
+            return None
+        temps = self.hourly["temperature_2m"][:, days.start * 24:days.stop * 24]
+        for i in self._point_index.get((round(lat, 2), round(lon, 2)), []):
+            if not np.isnan(temps[i]).any():
+                return i
+        return None
+
+    def covers(self, lat: float, lon: float, start: str, end: str) -> bool:
+        return self.row(lat, lon, start, end) is not None
+
+    def forecast_like(self, lat: float, lon: float, start: str, end: str) -> Optional[Dict[str, Any]]:
+        """Open-Meteo forecast 응답 형식 (hourly/daily) - 아카이브가 기간을 덮지 못하면 None"""
+        i = self.row(lat, lon, start, end)
+        if i is None:
+            return None
+        days = self.day_slice(start, end)
+        hours = slice(days.start * 24, days.stop * 24)
+        rain = self.hourly["precipitation"][i, hours]
+        dates = [(self.start + dt.timedelta(days=d)).isoformat() for d in range(days.start, days.stop)]
+        return {
+            "latitude": float(self.lat[i]), "longitude": float(self.lon[i]), "timezone": "Asia/Seoul",
+            "hourly": {
+                "time": [f"{d}T{h:02d}:00" for d in dates for h in range(24)],
+                "precipitation_probability": [100 if v >= RAIN_HOUR_MM else 0 for v in rain],
+                "precipitation": _round_list(rain),
+                "temperature_2m": _round_list(self.hourly["temperature_2m"][i, hours]),
+            },
+            "daily": {
+                "time": dates,
+                "temperature_2m_max": _round_list(self.daily["temperature_2m_max"][i, days]),
+                "temperature_2m_min": _round_list(self.daily["temperature_2m_min"][i, days]),
+                "precipitation_sum": _round_list(self.daily["precipitation_sum"][i, days]),
+            },
+        }
+
+    def daily_frame(self, markets: Optional[Sequence[str]] = None):
+        """상권 × 일 long 형식 DataFrame (상권, date, DAILY_VARS...)"""
+        import pandas as pd
+
+        rows = [self._market_index[m] for m in (markets or self.markets) if m in self._market_index]
+        dates = pd.date_range(self.start, periods=self.days, freq="D")
+        frame = pd.DataFrame({
+            "상권": np.repeat([self.markets[i] for i in rows], self.days),
+            "date": np.tile(dates, len(rows)),
+        })
+        for var in DAILY_VARS:
+            frame[var] = self.daily[var][rows].reshape(-1)
+        return frame
+
+    def monthly_frame(self, markets: Optional[Sequence[str]] = None):
+        """상권 × 월 날씨 (상권, 기준년월(YYYYMM), 평균기온 / 평균최고기온 / 평균풍속 / 일조시간 / 평균습도 / 강수량)"""
+        daily = self.daily_frame(markets)
+        daily["기준년월"] = daily["date"].dt.year * 100 + daily["date"].dt.month
+        grouped = daily.groupby(["상권", "기준년월"], sort=True)
+        monthly = grouped.agg(**{
+            name: (var, how) for name, (var, how) in IMPACT_WEATHER_VARS.items() if how == "mean"
+        })
+        # 합계 변수는 결측일이 있는 달이면 NaN (일부 일만 더한 값이 작게 나오지 않도록)
+        for name, (var, how) in IMPACT_WEATHER_VARS.items():
+            if how == "sum":
+                monthly[name] = grouped[var].sum(min_count=1).where(grouped[var].count() == grouped[var].size())
+        return monthly[list(IMPACT_WEATHER_VARS)].reset_index()
+
+
+# ── 수집 ──────────────────────────────────────────────────────────────────
+def _fetch_archive(points: List[Tuple[float, float]], start: str, end: str) -> List[Dict[str, Any]]:
+    """좌표 목록 → 좌표별 archive 응답 (ARCHIVE_MAX_LOCATIONS개씩 묶어 요청)"""
+    offline = is_offline_tools()
+    out: List[Dict[str, Any]] = []
+    for i in range(0, len(points), ARCHIVE_MAX_LOCATIONS):
+        chunk = points[i:i + ARCHIVE_MAX_LOCATIONS]
+        with span("open-meteo.archive", cat="http", offline=offline, locations=len(chunk)) as attrs:
+            if offline:
+                from tools.offline_stubs import open_meteo_archive
+                out += [open_meteo_archive(lat, lon, start, end) for lat, lon in chunk]
+                continue
+            r = http_get(OPEN_METEO_ARCHIVE_URL, params={
+                "latitude": ",".join(f"{lat:.2f}" for lat, _ in chunk),
+                "longitude": ",".join(f"{lon:.2f}" for _, lon in chunk),
+                "timezone": "Asia/Seoul", "hourly": ",".join(HOURLY_VARS), "wind_speed_unit": "ms",
+                "start_date": start, "end_date": end,
+            }, timeout=60)
+            attrs["status"] = r.status_code
+            attrs["response_bytes"] = len(r.content)
+            r.raise_for_status()
+            body = r.json()
+            out += body if isinstance(body, list) else [body]  # 좌표 1개면 단일 객체
+    return out
+
+
+def ingest(start: str, end: str, markets: Optional[Sequence[str]] = None,
+           market_locator: Optional[Callable[[str], Tuple[float, float, str]]] = None,
+           path: str = WEATHER_ARCHIVE_PATH) -> WeatherArchive:
+    """
+    상권별 [start, end] 시간 단위 과거 날씨 수집 → 아카이브 파일에 병합 저장
+
+    Args:
+        markets: 상권 이름 목록 (기본: MARKET_COORDINATES 전체, 별칭 ID "M45" 제외)
+        market_locator: 상권 → (위도, 경도, 한글명) (기본: agents.market_coordinates.get_coordinates)
+    """
+    from agents.market_coordinates import MARKET_COORDINATES, get_coordinates
+
+    locate = market_locator or get_coordinates
+    if markets is None:
+        markets = [m for m, (_, _, name) in MARKET_COORDINATES.items() if m == name]
+    markets = list(dict.fromkeys(markets))
+    located = {m: locate(m)[:2] for m in markets}
+    points = list(dict.fromkeys((round(lat, 2), round(lon, 2)) for lat, lon in located.values()))
+    days = (dt.date.fromisoformat(end) - dt.date.fromisoformat(start)).days + 1
+
+    by_point = {}
+    for p, data in zip(points, _fetch_archive(points, start, end)):
+        hourly = data.get("hourly") or {}
+        by_point[p] = {}
+        for var in HOURLY_VARS:
+            values = np.array([np.nan if v is None else v for v in (hourly.get(var) or [])], dtype=np.float32)
+            if len(values) != days * 24:
+                raise ValueError(f"{p} {var}: 시간 값 {len(values)}개 (예상 {days * 24}개)")
+            by_point[p][var] = values
+
+    rows = [(round(lat, 2), round(lon, 2)) for lat, lon in located.values()]
+    archive = WeatherArchive(
+        markets, [lat for lat, _ in located.values()], [lon for _, lon in located.values()],
+        dt.date.fromisoformat(start),
+        {var: np.stack([by_point[p][var] for p in rows]) for var in HOURLY_VARS},
+    )
+    if os.path.exists(path):
+        archive = WeatherArchive.load(path).merged(archive)
+    archive.save(path)
+    print(f"🗄️  날씨 아카이브 저장: 상권 {len(archive.markets)}개, "
+          f"{archive.start}~{archive.end} ({archive.days}일) → {path}")
+    return archive
+
+
+_WEATHER_ARCHIVE: Optional[WeatherArchive] = None
+_WEATHER_ARCHIVE_MTIME = 0.0
+_WEATHER_ARCHIVE_LOCK = threading.Lock()
+
+
+def get_weather_archive(path: str = WEATHER_ARCHIVE_PATH) -> Optional[WeatherArchive]:
+    """프로세스 공용 아카이브 (파일이 없으면 None, 다시 수집되면 재로드)"""
+    global _WEATHER_ARCHIVE, _WEATHER_ARCHIVE_MTIME
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    with _WEATHER_ARCHIVE_LOCK:
+        if _WEATHER_ARCHIVE is None or mtime > _WEATHER_ARCHIVE_MTIME:
+            try:
+                _WEATHER_ARCHIVE = WeatherArchive.load(path)
+                _WEATHER_ARCHIVE_MTIME = mtime
+            except Exception as e:
+                print(f"⚠️  날씨 아카이브 로드 실패 ({path}): {e}")
+                return None
+        return _WEATHER_ARCHIVE
+
+
+# ── 날씨 영향 재계산 ──────────────────────────────────────────────────────
+def compute_weather_impact(business, weather, group_cols: Sequence[str] = ("상권",),
+                           business_vars: Optional[Sequence[str]] = None,
+                           top_k: int = IMPACT_TOP_K, min_samples: int = IMPACT_MIN_SAMPLES):
+    """
+    월별 가맹점 지표 × 월별 날씨 → 그룹별 날씨 영향 표
+
+    그룹(예: 상권 / 업종 / 상권+업종)마다 날씨 변수의 중앙값으로 고/저 조건을 나누고
+    비즈니스 변수의 조건별 평균 차이와 변화율(= 차이 / 저조건 평균 × 100)을 계산합니다.
+    양쪽 샘플이 min_samples 이상이고 변화율이 양수인 조합 중 그룹별 상위 top_k개를 남깁니다.
+
+    Args:
+        business: 상권, 기준년월(YYYYMM) (+ 업종 등 group_cols) + 수치 지표 컬럼 DataFrame
+        weather: WeatherArchive.monthly_frame() 결과
+        business_vars: 분석할 지표 컬럼 (기본: 키 컬럼을 뺀 수치 컬럼 전체)
+    Returns:
+        [*group_cols, 날씨변수, 비즈니스변수, 고조건 평균, 저조건 평균, 차이(고-저), 변화율(%), 샘플수(고), 샘플수(저)]
+    """
+    import pandas as pd
+
+    group_cols = list(group_cols)
+    keys = ["상권", "기준년월"]
+    business = business.copy()
+    business["기준년월"] = business["기준년월"].astype(int)
+    if business_vars is None:
+        business_vars = [c for c in business.select_dtypes("number").columns if c not in keys + group_cols]
+    business_vars = list(business_vars)
+    weather_vars = [v for v in IMPACT_WEATHER_VARS if v in weather.columns]
+
+    frame = business[list(dict.fromkeys(keys + group_cols)) + business_vars].merge(
+        weather[keys + weather_vars], on=keys, how="inner")
+    values = frame[business_vars].to_numpy(dtype=np.float64, copy=True)
+    values[values <= MISSING_SENTINEL] = np.nan
+
+    records = []
+    for group, idx in frame.groupby(group_cols, sort=False).indices.items():
+        group = group if isinstance(group, tuple) else (group,)
+        b = values[idx]                                                  # (n, 지표)
+        for wvar in weather_vars:
+            w = frame[wvar].to_numpy(dtype=np.float64)[idx]
+            valid = ~np.isnan(w)
+            if not valid.any():
+                continue
+            median = np.median(w[valid])
+            hi, lo = valid & (w > median), valid & (w <= median)
+            n_hi = (~np.isnan(b[hi])).sum(axis=0)
+            n_lo = (~np.isnan(b[lo])).sum(axis=0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean_hi = np.nansum(b[hi], axis=0) / n_hi
+                mean_lo = np.nansum(b[lo], axis=0) / n_lo
+                pct = (mean_hi - mean_lo) / mean_lo * 100
+            keep = (n_hi >= min_samples) & (n_lo >= min_samples) & np.isfinite(pct) & (pct > 0)
+            for j in np.flatnonzero(keep):
+                records.append(group + (wvar, business_vars[j], mean_hi[j], mean_lo[j], mean_hi[j] - mean_lo[j],
+                                        pct[j], int(n_hi[j]), int(n_lo[j])))
+
+    result = pd.DataFrame(records, columns=group_cols + IMPACT_COLUMNS)
+    result = result.sort_values("변화율(%)", ascending=False, kind="stable")
+    result = result.groupby(group_cols, sort=False).head(top_k)
+    return result.reset_index(drop=True)
+
+
+IMPACT_TABLES = {
+    "상권별_날씨_영향.csv": ("상권",),
+    "업종별_날씨_영향.csv": ("업종",),
+    "업종+상권별_날씨_영향.csv": ("상권", "업종"),
+}
+
+
+def recompute_impact_tables(business, archive: Optional[WeatherArchive] = None,
+                            out_dir: str = DATA_DIR) -> Dict[str, Any]:
+    """아카이브 월별 날씨로 날씨 영향 CSV 3종 재계산 (업종 컬럼이 없으면 상권별만)"""
+    archive = archive or get_weather_archive()
+    if archive is None:
+        raise FileNotFoundError(f"날씨 아카이브 없음: {WEATHER_ARCHIVE_PATH} (먼저 ingest 실행)")
+    weather = archive.monthly_frame()
+    tables = {}
+    for filename, group_cols in IMPACT_TABLES.items():
+        if not set(group_cols) <= set(business.columns):
+            continue
+        table = compute_weather_impact(business, weather, group_cols)
+        table.to_csv(os.path.join(out_dir, filename))
+        tables[filename] = table
+        print(f"📊 {filename}: {len(table)}행")
+    return tables
+
+
+def _main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="상권별 과거 날씨 아카이브")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_ingest = sub.add_parser("ingest", help="Open-Meteo archive에서 과거 날씨 수집")
+    p_ingest.add_argument("--start", required=True, help="시작일 YYYY-MM-DD")
+    p_ingest.add_argument("--end", required=True, help="종료일 YYYY-MM-DD")
+    p_ingest.add_argument("--markets", default="", help="쉼표 구분 상권 (기본: 전체)")
+    p_ingest.add_argument("--path", default=WEATHER_ARCHIVE_PATH)
+    p_impact = sub.add_parser("impact", help="날씨 영향 CSV 재계산")
+    p_impact.add_argument("--business", required=True, help="월별 가맹점 지표 CSV (상권, 기준년월, [업종], 지표...)")
+    p_impact.add_argument("--encoding", default="utf-8")
+    p_impact.add_argument("--out-dir", default=DATA_DIR)
+    p_impact.add_argument("--path", default=WEATHER_ARCHIVE_PATH)
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        markets = [m.strip() for m in args.markets.split(",") if m.strip()] or None
+        ingest(args.start, args.end, markets, path=args.path)
+        return
+
+    import pandas as pd
+    business = pd.read_csv(args.business, encoding=args.encoding)
+    recompute_impact_tables(business, WeatherArchive.load(args.path), args.out_dir)
+
+
+if __name__ == "__main__":
+    _main()
+
+
+__all__ = [
+    "WeatherArchive",
+    "WEATHER_ARCHIVE_PATH",
+    "IMPACT_WEATHER_VARS",
+    "ingest",
+    "get_weather_archive",
+    "compute_weather_impact",
+    "recompute_impact_tables",
+]
@@ -0,0 +1,201 @@
+# tools/weather_impact.py
+"""
+날씨 영향 표 조회 (data/업종별·상권별·업종+상권별_날씨_영향.csv)
+- 세 표를 한 번 읽어 컬럼 배열 + (수준, 상권, 업종, 날씨변수) → 행 번호 배열 색인으로 컴파일
+- 날씨 신호(우천/폭염/한파/쾌적) → 관련 날씨변수와 방향(고/저 조건)으로 조회
+  가장 구체적인 수준부터: 업종+상권 → 상권 → 업종
+- 방향이 "high"면 표의 변화율/차이 그대로, "low"(한파 등 저조건)면 고조건 대비 저조건 변화
+  (= (저 - 고) / 고 × 100)로 환산 - 여러 신호의 행을 모아 배열 연산 한 번으로 계산
+- attach_weather_impact(): 날씨 신호 details["expected_impact"]에 정량 예상 변화를 붙인 사본 반환
+  → 전술 카드 프롬프트/표에 수치를 그대로 넣어 LLM이 영향을 추정하지 않도록
+
+표는 tools.weather_archive.recompute_impact_tables()로 다시 만들 수 있습니다.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data")
+WEATHER_IMPACT_DIR = os.getenv("MARKETING_WEATHER_IMPACT_DIR", DATA_DIR)
+
+# 조회 수준 → 파일 (앞일수록 구체적)
+IMPACT_LEVELS: Tuple[Tuple[str, str], ...] = (
+    ("업종+상권", "업종+상권별_날씨_영향.csv"),
+    ("상권", "상권별_날씨_영향.csv"),
+    ("업종", "업종별_날씨_영향.csv"),
+)
+# 날씨 신호 종류(signal_id 접두어) → [(날씨변수, 방향)]
+SIGNAL_WEATHER_VARS: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "WX-": (("강수량", "high"),),
+    "WXH-": (("평균최고기온", "high"), ("평균기온", "high")),
+    "WXC-": (("평균기온", "low"), ("평균최고기온", "low")),
+    "WXG-": (("일조시간", "high"),),
+}
+IMPACT_MAX_ROWS = 3       # 신호당 예상 변화 항목 수
+
+
+def _market_names(market: Optional[str]) -> List[str]:
+    """상권 이름 후보 ("성수동" → ["성수동", "성수"])"""
+    if not market:
+        return []
+    names = [market]
+    if market.endswith("동") and len(market) > 2:
+        names.append(market[:-1])
+    return names
+
+
+class WeatherImpactIndex:
+    """세 날씨 영향 표의 컴파일된 조회 색인 (읽기 전용, 스레드 안전)"""
+
+    def __init__(self, data_dir: str = WEATHER_IMPACT_DIR):
+        import pandas as pd
+
+        frames = []
+        for level, filename in IMPACT_LEVELS:
+            path = os.path.join(data_dir, filename)
+            if not os.path.exists(path):
+                continue
+            df = pd.read_csv(path, index_col=0)
+            df["수준"] = level
+            for col in ("상권", "업종"):
+                if col not in df.columns:
+                    df[col] = ""
+            frames.append(df)
+        if not frames:
+            raise FileNotFoundError(f"날씨 영향 표 없음: {data_dir}")
+        table = pd.concat(frames, ignore_index=True)
+
+        self.business_var = table["비즈니스변수"].astype(str).to_numpy()
+        self.high = table["고조건 평균"].to_numpy(dtype=np.float64)
+        self.low = table["저조건 평균"].to_numpy(dtype=np.float64)
+        self.samples = (table["샘플수(고)"] + table["샘플수(저)"]).to_numpy(dtype=np.int64)
+        # 키별 행 번호 (표 순서 = 변화율 내림차순 유지)
+        keys = zip(table["수준"], table["상권"].fillna("").astype(str), table["업종"].fillna("").astype(str),
+                   table["날씨변수"].astype(str))
+        index: Dict[Tuple[str, str, str, str], List[int]] = {}
+        for i, key in enumerate(keys):
+            index.setdefault(key, []).append(i)
+        self._index = {k: np.array(v, dtype=np.int64) for k, v in index.items()}
+
+    def rows(self, market: Optional[str], industry: Optional[str], weather_var: str) -> Tuple[Optional[str], np.ndarray]:
+        """가장 구체적인 수준의 행 번호 (수준, 행 배열) - 없으면 (None, 빈 배열)"""
+        markets = _market_names(market)
+        candidates = [("업종+상권", m, industry or "") for m in markets] if industry else []
+        candidates += [("상권", m, "") for m in markets]
+        if industry:
+            candidates.append(("업종", "", industry))
+        for level, m, ind in candidates:
+            found = self._index.get((level, m, ind, weather_var))
+            if found is not None:
+                return level, found
+        return None, np.empty(0, dtype=np.int64)
+
+    def lookup_many(self, requests: Sequence[Tuple[Optional[str], Optional[str], str, str]],
+                    limit: int = IMPACT_MAX_ROWS) -> List[List[Dict[str, Any]]]:
+        """
+        [(상권, 업종, 날씨변수, 방향), ...] → 요청별 예상 변화 목록
+
+        Returns:
+            [[{"level", "weather_var", "business_var", "direction", "change_pct", "diff",
+               "baseline", "expected", "samples"}, ...], ...]
+        """
+        found = [self.rows(market, industry, var) for market, industry, var, _ in requests]
+        picked = [r[:limit] for _, r in found]
+        if not any(len(r) for r in picked):
+            return [[] for _ in requests]
+        rows = np.concatenate(picked)
+        low_dir = np.concatenate([np.full(len(r), d == "low") for r, (*_, d) in zip(picked, requests)])
+        # 방향별 기준(현재 조건의 반대) → 예상(해당 조건) 평균
+        baseline = np.where(low_dir, self.high[rows], self.low[rows])
+        expected = np.where(low_dir, self.low[rows], self.high[rows])
+        diff = expected - baseline
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pct = np.where(baseline != 0, diff / baseline * 100, np.nan)
+
+        out, pos = [], 0
+        for (level, _), r, (_, _, var, direction) in zip(found, picked, requests):
+            items = []
+            for k in range(pos, pos + len(r)):
+                items.append({
+                    "level": level,
+                    "weather_var": var,
+                    "business_var": str(self.business_var[rows[k]]),
+                    "direction": direction,
+                    "change_pct": None if np.isnan(pct[k]) else round(float(pct[k]), 1),
+                    "diff": round(float(diff[k]), 3),
+                    "baseline": round(float(baseline[k]), 3),
+                    "expected": round(float(expected[k]), 3),
+                    "samples": int(self.samples[rows[k]]),
+                })
+            out.append(items)
+            pos += len(r)
+        return out
+
+    def signal_impact(self, signals: Sequence[Dict[str, Any]], market: Optional[str],
+                      industry: Optional[str], limit: int = IMPACT_MAX_ROWS) -> List[List[Dict[str, Any]]]:
+        """신호별 예상 변화 (날씨변수 후보 중 처음 찾은 것, 비날씨 신호는 빈 목록)"""
+        requests, owners = [], []
+        for i, sig in enumerate(signals):
+            prefix = str(sig.get("signal_id", "")).split("-")[0] + "-"
+            if sig.get("signal_type") != "weather":
+                continue
+            for var, direction in SIGNAL_WEATHER_VARS.get(prefix, ()):
+                requests.append((market, industry, var, direction))
+                owners.append(i)
+        out: List[List[Dict[str, Any]]] = [[] for _ in signals]
+        for i, items in zip(owners, self.lookup_many(requests, limit)):
+            if not out[i] and items:
+                out[i] = items
+        return out
+
+
+_WEATHER_IMPACT: Optional[WeatherImpactIndex] = None
+_WEATHER_IMPACT_LOADED = False
+_WEATHER_IMPACT_LOCK = threading.Lock()
+
+
+def get_weather_impact_index() -> Optional[WeatherImpactIndex]:
+    """프로세스 공용 색인 (표가 없으면 None)"""
+    global _WEATHER_IMPACT, _WEATHER_IMPACT_LOADED
+    with _WEATHER_IMPACT_LOCK:
+        if not _WEATHER_IMPACT_LOADED:
+            _WEATHER_IMPACT_LOADED = True
+            try:
+                _WEATHER_IMPACT = WeatherImpactIndex()
+            except Exception as e:
+                print(f"⚠️  날씨 영향 표 로드 실패: {e}")
+        return _WEATHER_IMPACT
+
+
+def attach_weather_impact(situation: Optional[Dict[str, Any]], market: Optional[str],
+                          industry: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    날씨 신호마다 details["expected_impact"]를 붙인 상황 JSON 사본 반환
+
+    원본(상황 캐시에 보관된 객체)은 바꾸지 않습니다. 표가 없거나 해당 상권/업종 행이 없으면 원본 그대로.
+    """
+    index = get_weather_impact_index()
+    if not index or not isinstance(situation, dict) or not situation.get("signals"):
+        return situation
+    signals = situation["signals"]
+    impacts = index.signal_impact(signals, market, industry)
+    if not any(impacts):
+        return situation
+    new_signals = []
+    for sig, items in zip(signals, impacts):
+        if items:
+            sig = {**sig, "details": {**(sig.get("details") or {}), "expected_impact": items}}
+        new_signals.append(sig)
+    return {**situation, "signals": new_signals}
+
+
+__all__ = [
+    "WeatherImpactIndex",
+    "SIGNAL_WEATHER_VARS",
+    "get_weather_impact_index",
+    "attach_weather_impact",
+]
@@ -1,7 +1,34 @@
 # tools/weather_signals.py 
 from __future__ import annotations
-import requests
-from typing import Dict, Any, Tuple, Optional, Callable
+import datetime as dt
+import os
+import warnings
+from typing import Dict, Any, List, Tuple, Optional, Callable
+
+import numpy as np
+
+try:
+    from agents.tracing import span
+except ImportError:  # 단독 실행 시 트레이싱 비활성
+    from contextlib import nullcontext
+    def span(*args, **kwargs): return nullcontext({})
+
+try:
+    from agents.backends import is_offline_tools
+except ImportError:
+    def is_offline_tools(): return False
+
+from tools.http_client import http_get
+
+try:
+    from tools.forecast_cache import forecast_key, get_forecast_cache
+except ImportError:  # 캐시 없이 매번 요청
+    forecast_key, get_forecast_cache = None, None
+
+try:
+    from tools.weather_archive import get_weather_archive
+except ImportError:  # 과거 기간도 API로 조회
+    get_weather_archive = None
 
 MARKET_ALIAS = {"M45": (37.5446, 127.0559, "성수동")}
 # 임계값 완화: 더 많은 날씨 변화 감지
@@ -15,15 +42,100 @@ def _locate(mid: str, locator: Optional[Callable[[str], Tuple[float,float,str]]]
     if mid in MARKET_ALIAS: return MARKET_ALIAS[mid]
     raise ValueError(f"market_id '{mid}' 위치 미정")
 
+OPEN_METEO_URL = "https://api.open-meteo.com/v1/forecast"
+HOURLY_VARS = "precipitation_probability,precipitation,temperature_2m"
+DAILY_VARS = "temperature_2m_max,temperature_2m_min,precipitation_sum"
+# 일괄 조회 시 요청 1건에 담는 좌표 수 (Open-Meteo는 쉼표 구분 다중 좌표 지원)
+OPEN_METEO_MAX_LOCATIONS = int(os.getenv("MARKETING_OPEN_METEO_MAX_LOCATIONS", "50"))
+
+def _archived(lat: float, lon: float, start: str, end: str) -> Optional[Dict[str, Any]]:
+    """지난 기간(종료일 < 오늘)이고 로컬 아카이브가 기간을 덮으면 아카이브 응답, 아니면 None"""
+    if get_weather_archive is None or dt.date.fromisoformat(end) >= dt.date.today():
+        return None
+    archive = get_weather_archive()
+    return archive.forecast_like(lat, lon, start, end) if archive else None
+
 def _om(lat: float, lon: float, start: str, end: str) -> Dict[str, Any]:
-    r = requests.get("https://api.open-meteo.com/v1/forecast", params={
-        "latitude": lat, "longitude": lon, "timezone": "Asia/Seoul",
-        "hourly": "precipitation_probability,precipitation,temperature_2m",
-        "daily": "temperature_2m_max,temperature_2m_min,precipitation_sum",
-        "start_date": start, "end_date": end
-    }, timeout=30)
-    r.raise_for_status()
-    return r.json()
+    # 약 1km 격자로 반올림 → 같은 상권의 가맹점은 같은 예보를 공유
+    lat, lon = round(lat, 2), round(lon, 2)
+    offline = is_offline_tools()
+
+    def fetch(timeout: float, retries: Optional[int] = None) -> Dict[str, Any]:
+        if offline:
+            from tools.offline_stubs import open_meteo_forecast
+            return open_meteo_forecast(lat, lon, start, end)
+        r = http_get(OPEN_METEO_URL, params={
+            "latitude": lat, "longitude": lon, "timezone": "Asia/Seoul",
+            "hourly": HOURLY_VARS, "daily": DAILY_VARS,
+            "start_date": start, "end_date": end
+        }, timeout=timeout, retries=retries)
+        attrs["status"] = r.status_code
+        attrs["response_bytes"] = len(r.content)
+        r.raise_for_status()
+        return r.json()
+
+    with span("open-meteo.forecast", cat="http", offline=offline) as attrs:
+        archived = _archived(lat, lon, start, end)
+        if archived is not None:
+            attrs.update(cache_hit=True, source="archive")
+            return archived
+        if get_forecast_cache is None:
+            attrs["cache_hit"] = False
+            return fetch(30)
+        data, info = get_forecast_cache().get_or_fetch(
+            lat, lon, start, end, f"{HOURLY_VARS}|{DAILY_VARS}", fetch,
+            source="offline" if offline else "live")
+        attrs.update(info)
+        return data
+
+def _forecast_stats(forecasts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    예보 응답 N개 → 상권별 통계 (시간/일 배열을 (N, T) 행렬로 만들어 한 번에 계산)
+
+    결측(None)은 NaN으로 두고 nan-집계를 사용하므로 값이 없는 상권은 None/0으로 채워집니다.
+    """
+    def matrix(section: str, var: str) -> np.ndarray:
+        rows = [[np.nan if v is None else v for v in ((f.get(section) or {}).get(var) or [])] for f in forecasts]
+        width = max((len(r) for r in rows), default=0)
+        out = np.full((len(rows), width), np.nan)
+        for i, r in enumerate(rows):
+            out[i, :len(r)] = r
+        return out
+
+    pop = matrix("hourly", "precipitation_probability")
+    rain = matrix("hourly", "precipitation")
+    tmax = matrix("daily", "temperature_2m_max")
+    tmin = matrix("daily", "temperature_2m_min")
+
+    has_pop = (~np.isnan(pop)).any(axis=1)
+    has_rain = (~np.isnan(rain)).any(axis=1)
+    has_tmax = (~np.isnan(tmax)).any(axis=1)
+    has_tmin = (~np.isnan(tmin)).any(axis=1)
+    with np.errstate(invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # 전부 NaN인 행 (has_* 로 걸러냄)
+        pop_mean = np.nanmean(pop, axis=1)
+        pop_max = np.nanmax(pop, axis=1, initial=-np.inf)
+        tmax_overall = np.nanmax(tmax, axis=1, initial=-np.inf)
+        tmin_overall = np.nanmin(tmin, axis=1, initial=np.inf)
+        pop60h = (pop >= 60).sum(axis=1)
+        heat2d = (tmax >= HEAT_2D).sum(axis=1)
+        cold2d = (tmin <= COLD_2D).sum(axis=1)
+    rain_sum = np.nansum(rain, axis=1)
+
+    stats = []
+    for i in range(len(forecasts)):
+        pmax = float(pop_max[i]) if has_pop[i] else None
+        stats.append({
+            "pop_mean": round(float(pop_mean[i]), 2) if has_pop[i] else None,
+            "pop_max": int(pmax) if pmax is not None and pmax.is_integer() else pmax,
+            "rain_sum": round(float(rain_sum[i]), 2) if has_rain[i] else 0.0,
+            "pop60h": int(pop60h[i]),
+            "tmax_overall": float(tmax_overall[i]) if has_tmax[i] else None,
+            "tmin_overall": float(tmin_overall[i]) if has_tmin[i] else None,
+            "heat2d": int(heat2d[i]),
+            "cold2d": int(cold2d[i]),
+        })
+    return stats
 
 def detect_weather_signals(input_json: Dict[str, Any],
                            market_locator: Optional[Callable[[str], Tuple[float,float,str]]] = None) -> Dict[str, Any]:
@@ -34,22 +146,14 @@ def detect_weather_signals(input_json: Dict[str, Any],
 
     lat, lon, area = _locate(mid, market_locator)
     data = _om(lat, lon, start, end)
-    hourly, daily = data.get("hourly", {}), data.get("daily", {})
-
-    pop = [p for p in (hourly.get("precipitation_probability") or []) if p is not None]
-    rain = [x for x in (hourly.get("precipitation") or []) if x is not None]
-    pop_mean = round(sum(pop)/len(pop), 2) if pop else None
-    pop_max  = max(pop) if pop else None
-    rain_sum = round(sum(rain), 2) if rain else 0.0
-    pop60h   = sum(1 for p in pop if p >= 60)
-
-    tmax = daily.get("temperature_2m_max") or []
-    tmin = daily.get("temperature_2m_min") or []
-    tmax_overall = max(tmax) if tmax else None
-    tmin_overall = min(tmin) if tmin else None
-
-    heat = (tmax_overall is not None) and (tmax_overall >= HEAT_1D or sum(1 for v in tmax if v >= HEAT_2D) >= 2)
-    cold = (tmin_overall is not None) and (tmin_overall <= COLD_1D or sum(1 for v in tmin if v <= COLD_2D) >= 2)
+    return _signals_from_stats(area, start, end, _forecast_stats([data])[0])
+
+def _signals_from_stats(area: str, start: str, end: str, st: Dict[str, Any]) -> Dict[str, Any]:
+    pop_mean, pop_max, rain_sum, pop60h = st["pop_mean"], st["pop_max"], st["rain_sum"], st["pop60h"]
+    tmax_overall, tmin_overall = st["tmax_overall"], st["tmin_overall"]
+
+    heat = (tmax_overall is not None) and (tmax_overall >= HEAT_1D or st["heat2d"] >= 2)
+    cold = (tmin_overall is not None) and (tmin_overall <= COLD_1D or st["cold2d"] >= 2)
     rain_sig = (rain_sum >= RAIN_MM) or (pop60h >= POP_HOURS)
 
     signals = []
@@ -115,4 +219,101 @@ def detect_weather_signals(input_json: Dict[str, Any],
         "citations": ["Open-Meteo API"],
         "assumptions": ["POP≥60% 시간 누적 또는 강수합≥10mm이면 우천 영향 가정", "폭염/한파 임계는 상단 상수 사용"],
         "contract_version": "situation.v1",
-    }
\ No newline at end of file
+    }
+
+# ── 다중 상권 일괄 계산 (스케줄러용) ────────────────────────────────────────
+def _om_bulk(points: List[Tuple[float, float]], start: str, end: str) -> Dict[Tuple[float, float], Optional[Dict[str, Any]]]:
+    """
+    반올림 좌표 목록 → 좌표별 예보 (캐시 적중분 제외, 나머지는 좌표 OPEN_METEO_MAX_LOCATIONS개씩 묶어 1회 요청)
+
+    요청이 실패한 좌표는 만료 캐시가 있으면 그 예보, 없으면 None.
+    """
+    offline = is_offline_tools()
+    source = "offline" if offline else "live"
+    variables = f"{HOURLY_VARS}|{DAILY_VARS}"
+    cache = get_forecast_cache() if get_forecast_cache else None
+    key = lambda p: forecast_key(p[0], p[1], start, end, variables, source)
+
+    out: Dict[Tuple[float, float], Optional[Dict[str, Any]]] = {}
+    with span("open-meteo.forecast.bulk", cat="http", offline=offline, locations=len(points)) as attrs:
+        missing, archived = [], 0
+        for p in points:
+            data = _archived(p[0], p[1], start, end)
+            if data is not None:
+                archived += 1
+            elif cache:
+                data = cache.lookup(key(p))
+            if data is None:
+                missing.append(p)
+            else:
+                out[p] = data
+        attrs["cache_hits"] = len(points) - len(missing) - archived
+        attrs["archive_hits"] = archived
+
+        fetched, upstream_requests = [], 0
+        for i in range(0, len(missing), OPEN_METEO_MAX_LOCATIONS):
+            chunk = missing[i:i + OPEN_METEO_MAX_LOCATIONS]
+            try:
+                if offline:
+                    from tools.offline_stubs import open_meteo_forecast
+                    datas = [open_meteo_forecast(lat, lon, start, end) for lat, lon in chunk]
+                else:
+                    upstream_requests += 1
+                    r = http_get(OPEN_METEO_URL, params={
+                        "latitude": ",".join(f"{lat:.2f}" for lat, _ in chunk),
+                        "longitude": ",".join(f"{lon:.2f}" for _, lon in chunk),
+                        "timezone": "Asia/Seoul", "hourly": HOURLY_VARS, "daily": DAILY_VARS,
+                        "start_date": start, "end_date": end
+                    }, timeout=30)
+                    r.raise_for_status()
+                    body = r.json()
+                    datas = body if isinstance(body, list) else [body]  # 좌표 1개면 단일 객체
+            except Exception as e:
+                print(f"⚠️  Open-Meteo 일괄 조회 실패 ({len(chunk)}개 좌표): {type(e).__name__}: {e}")
+                for p in chunk:
+                    out[p] = cache.lookup(key(p), allow_stale=True) if cache else None
+                continue
+            for p, data in zip(chunk, datas):
+                out[p] = data
+                fetched.append((key(p), data))
+
+        if cache and fetched:
+            cache.put_many(fetched, end)
+            cache.record_misses(len(fetched))
+        attrs["fetched"] = len(fetched)
+        attrs["upstream_requests"] = upstream_requests
+    return out
+
+def detect_weather_signals_bulk(market_ids: List[str], start: str, end: str,
+                                market_locator: Optional[Callable[[str], Tuple[float,float,str]]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    여러 상권 × 같은 기간의 날씨 신호 일괄 계산
+
+    - 상권 좌표를 반올림해 중복 제거 후 예보를 묶어서 조회 (_om_bulk)
+    - 통계는 전체 좌표를 (좌표, 시간) 배열로 한 번에 계산 (_forecast_stats)
+
+    Returns:
+        {market_id: detect_weather_signals와 같은 Situation JSON} - 위치/예보가 없는 상권은 has_valid_signal=False
+    """
+    def failed(summary: str) -> Dict[str, Any]:
+        return {"has_valid_signal": False, "summary": summary, "signals": [], "citations": [], "assumptions": [],
+                "contract_version": "situation.v1"}
+
+    market_ids = list(dict.fromkeys(market_ids))
+    results: Dict[str, Dict[str, Any]] = {}
+    located: Dict[str, Tuple[Tuple[float, float], str]] = {}
+    for mid in market_ids:
+        try:
+            lat, lon, area = _locate(mid, market_locator)
+        except Exception as e:
+            results[mid] = failed(f"날씨 수집 실패: {e}")
+            continue
+        located[mid] = ((round(lat, 2), round(lon, 2)), area)
+
+    forecasts = _om_bulk(list(dict.fromkeys(p for p, _ in located.values())), start, end)
+    points = [p for p, data in forecasts.items() if data is not None]
+    stats = dict(zip(points, _forecast_stats([forecasts[p] for p in points])))
+
+    for mid, (p, area) in located.items():
+        results[mid] = _signals_from_stats(area, start, end, stats[p]) if p in stats else failed("날씨 수집 실패: 예보 없음")
+    return {mid: results[mid] for mid in market_ids}